@@ -1,19 +1,25 @@
-import onnx_asr
 from onnx_asr.loader import load_vad
 import sounddevice as sd
 import numpy as np
-import scipy.io.wavfile as wav
 from pynput import keyboard
-import tempfile
 import subprocess
 import sys
-import threading
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "python"))
+
+from transcriber import SpeechGate, audio_level, recognize_audio, to_waveform
+from audio import AudioCapture
+from ort_session import load_asr_model
+from jobs import TranscriptionQueue
+from daemon_client import connect
 
 # Audio settings
 SAMPLE_RATE = 16000
 CHANNELS = 1
 DEVICE_ID = None  # Will be set by user or default
 USE_VAD = False   # Enable VAD for segmentation
+MODEL_NAME = "nemo-parakeet-tdt-0.6b-v3"
 
 # macOS system sounds for feedback
 SOUND_START = "/System/Library/Sounds/Pop.aiff"      # Recording started
@@ -23,78 +29,72 @@ SOUND_ERROR = "/System/Library/Sounds/Basso.aiff"    # Error occurred
 
 # State
 recording = False
-transcribing = False  # Prevent overlapping transcriptions
-audio_data = []
+capture = None  # AudioCapture of the current recording
 model = None
 vad_model = None
+daemon = None  # DaemonClient when a backend daemon already serves the model
+jobs = None  # TranscriptionQueue: recordings are transcribed while the next one is captured
+gate = SpeechGate()  # Skips silent recordings and trims silence before inference
 
 def play_sound(sound_path):
     """Play a system sound asynchronously."""
     subprocess.Popen(["afplay", sound_path], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
 
 def start_recording():
-    global recording, transcribing, audio_data
+    global recording, capture
     if recording:
         return
-    if transcribing:
-        print("⏳ Please wait, still transcribing...")
-        return
     recording = True
-    audio_data = []
     play_sound(SOUND_START)
     print("🎙️  Recording... (release Right ⌘ to stop)")
     
-    def callback(indata, frames, time, status):
-        if recording:
-            audio_data.append(indata.copy())
-    
-    # Start recording in a stream
-    global stream
-    stream = sd.InputStream(samplerate=SAMPLE_RATE, channels=CHANNELS, device=DEVICE_ID, callback=callback)
-    stream.start()
+    # Start recording into a preallocated int16 buffer
+    capture = AudioCapture(device_id=DEVICE_ID, sample_rate=SAMPLE_RATE, channels=CHANNELS)
+    capture.start()
 
-def do_transcription(audio_int16):
-    """Run transcription in background thread."""
-    global transcribing, model, vad_model, USE_VAD
+def do_transcription(audio):
+    """Transcribe one recording (runs on a job queue worker)."""
+    global model, vad_model, USE_VAD
     
-    try:
-        # Check audio level
-        audio_level = np.abs(audio_int16).mean()
-        duration = len(audio_int16) / SAMPLE_RATE
-        print(f"   Audio: {duration:.1f}s, level: {audio_level:.0f}")
-        
-        if audio_level < 100:
-            play_sound(SOUND_ERROR)
-            print("⚠️  Audio too quiet - check your microphone!")
-            return
-        
-        # Save to temp file
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as f:
-            wav.write(f.name, SAMPLE_RATE, audio_int16)
-            
-            if USE_VAD and vad_model is not None:
-                # Use VAD to segment and transcribe
-                result = do_vad_transcription(f.name, audio_int16)
-            else:
-                # Standard transcription without VAD
-                result = model.recognize(f.name)
-            
-            if result and result.strip():
-                play_sound(SOUND_DONE)
-                print(f"\n📝 Transcription:\n{result}\n")
-            else:
-                play_sound(SOUND_ERROR)
-                print("⚠️  No speech detected in audio.")
-    finally:
-        transcribing = False
+    # Check audio level (in int16 units)
+    level = audio_level(audio)
+    duration = len(audio) / SAMPLE_RATE
+    print(f"   Audio: {duration:.1f}s, level: {level:.0f}")
+    
+    bounds = gate.detect(audio, DEVICE_ID)
+    if bounds is None:
+        raise ValueError("No speech detected - check your microphone!")
+    audio = audio[bounds[0]:bounds[1]]
+    
+    if USE_VAD and vad_model is not None:
+        # Use VAD to segment and transcribe
+        return do_vad_transcription(to_waveform(audio))
+    if daemon is not None:
+        result = daemon.transcribe(audio, SAMPLE_RATE, model=MODEL_NAME, gated=True)
+        if "text" in result:
+            return result["text"]
+        if result.get("error") == "No speech detected":
+            return ""
+        raise RuntimeError(result.get("error", "Daemon transcription failed"))
+    # Standard transcription without VAD, straight from memory
+    return recognize_audio(model, audio, SAMPLE_RATE)
+
+def on_transcription_done(job):
+    """Print a finished recording's text (called in recording order)."""
+    if job.error is not None:
+        play_sound(SOUND_ERROR)
+        print(f"⚠️  [#{job.id}] {job.error}")
+    elif job.result and job.result.strip():
+        play_sound(SOUND_DONE)
+        print(f"\n📝 Transcription [#{job.id}] ({job.transcription_time:.1f}s):\n{job.result}\n")
+    else:
+        play_sound(SOUND_ERROR)
+        print(f"⚠️  [#{job.id}] No speech detected in audio.")
 
-def do_vad_transcription(filepath, audio_int16):
+def do_vad_transcription(audio_float):
     """Transcribe using VAD segmentation for better accuracy on long audio."""
     global model, vad_model
     
-    # Convert to float32 for VAD (normalized -1 to 1)
-    audio_float = audio_int16.astype(np.float32) / 32767.0
-    
     # Prepare batch format for VAD
     waveforms = audio_float.reshape(1, -1)  # Shape: (1, samples)
     waveforms_len = np.array([len(audio_float)], dtype=np.int64)
@@ -116,48 +116,37 @@ def do_vad_transcription(filepath, audio_int16):
         print(f"   VAD found {len(segments)} speech segment(s)")
         
         for i, (start, end) in enumerate(segments):
-            # Extract segment audio
-            segment_audio = audio_int16[start:end]
+            # Extract segment audio (a view into the converted waveform)
+            segment_audio = audio_float[start:end]
             if len(segment_audio) < SAMPLE_RATE * 0.1:  # Skip very short segments (< 0.1s)
                 continue
             
-            # Save segment to temp file and transcribe
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as seg_f:
-                wav.write(seg_f.name, SAMPLE_RATE, segment_audio)
-                result = model.recognize(seg_f.name)
-                if result and result.strip():
-                    all_texts.append(result.strip())
+            result = recognize_audio(model, segment_audio, SAMPLE_RATE)
+            if result and result.strip():
+                all_texts.append(result.strip())
     
     return " ".join(all_texts)
 
 def stop_recording_and_transcribe():
-    global recording, transcribing, audio_data, stream
+    global recording
     if not recording:
         return
-    if transcribing:
-        print("⏳ Still transcribing previous recording...")
-        return
     
     recording = False
-    stream.stop()
-    stream.close()
+    # O(1): a view of the int16 capture buffer, converted once by the model input path
+    audio = capture.stop()
     play_sound(SOUND_STOP)
-    print("⏹️  Stopped recording. Transcribing...")
     
-    if not audio_data:
+    if audio is None:
         play_sound(SOUND_ERROR)
         print("No audio recorded.")
         return
     
-    # Combine audio chunks
-    audio = np.concatenate(audio_data, axis=0)
-    # Convert float32 to int16 PCM format (required by onnx_asr)
-    audio_int16 = (audio * 32767).astype(np.int16)
-    
-    # Run transcription in background thread so keyboard listener stays responsive
-    transcribing = True
-    thread = threading.Thread(target=do_transcription, args=(audio_int16,), daemon=True)
-    thread.start()
+    # Queue for transcription so the keyboard listener (and the next recording) stay responsive
+    job_id = jobs.submit(audio)
+    queued = jobs.pending - 1
+    waiting = f" ({queued} ahead)" if queued else ""
+    print(f"⏹️  Stopped recording. Transcribing [#{job_id}]...{waiting}")
 
 # Use Right Command key (⌘) to record - hold to start, release to stop
 # This avoids character artifacts in the terminal
@@ -213,7 +202,7 @@ def select_microphone():
         sys.exit(1)
 
 def main():
-    global model, vad_model, DEVICE_ID, USE_VAD
+    global model, vad_model, daemon, jobs, DEVICE_ID, USE_VAD
     
     # Parse all arguments
     args = sys.argv[1:]
@@ -257,9 +246,16 @@ def main():
         vad_model = load_vad("silero", providers=["CPUExecutionProvider"])
         print("✅ VAD enabled (audio will be segmented)")
     
-    print("Loading Parakeet TDT v3 model...")
-    model = onnx_asr.load_model("nemo-parakeet-tdt-0.6b-v3", providers=["CPUExecutionProvider"])
-    print("✅ Model loaded!")
+    # Share the model of a running backend daemon instead of loading another copy
+    daemon = None if USE_VAD else connect()
+    if daemon is not None:
+        print("✅ Using the running SuperWhisper daemon")
+    else:
+        print("Loading Parakeet TDT v3 model...")
+        model = load_asr_model(MODEL_NAME)
+        print("✅ Model loaded!")
+    
+    jobs = TranscriptionQueue(transcribe=do_transcription, on_result=on_transcription_done)
     
     vad_status = " [VAD ON]" if USE_VAD else ""
     print(f"\n🎤 Hold Right ⌘ (Command) to record, release to transcribe.{vad_status}")
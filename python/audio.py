@@ -1,95 +1,581 @@
 """Audio capture and processing for SuperWhisper."""
 
+import math
+import os
+import tempfile
 import numpy as np
 import sounddevice as sd
-from typing import Optional, Callable, List, Dict, Any
+from typing import Optional, Callable, List, Dict, Any, Union
 import threading
 
 SAMPLE_RATE = 16000
 CHANNELS = 1
+METER_RATE_HZ = 10.0  # Level readings per second
+METER_BINS = 24  # Envelope columns (one per overlay bar)
+DBFS_FLOOR = -96.0  # Quietest level an int16 signal can express
+CONVERT_INTERVAL = 0.05  # Seconds between resampling passes during native-rate capture
+RING_SECONDS = 2.0  # Native-rate audio buffered for the converter thread
+RESERVE_SECONDS = 5.0  # Capture buffer headroom kept ahead of the writer
+RESERVE_INTERVAL = 0.25  # Seconds between headroom checks
 
 
-class AudioRecorder:
-    """Handles audio recording with real-time level monitoring."""
+class CaptureBuffer:
+    """Preallocated, growable int16 buffer that the audio callback writes into.
     
-    def __init__(self, device_id: Optional[int] = None, sample_rate: int = SAMPLE_RATE):
-        self.device_id = device_id
-        self.sample_rate = sample_rate
-        self.recording = False
-        self.audio_data: List[np.ndarray] = []
-        self.stream: Optional[sd.InputStream] = None
-        self.on_audio_level: Optional[Callable[[float, List[float]], None]] = None
+    Writes only copy each block into capacity that already exists; they
+    never allocate. Capacity is grown ahead of the writer by reserve(),
+    called from a non-realtime thread: it doubles the buffer (amortized
+    O(1)), copying the samples outside the lock and only the last few
+    blocks, plus the swap, under it. Should the writer still run out of
+    room, the frames that do not fit are dropped and counted. Readers get
+    zero-copy views of what has been written so far.
+    
+    With ``ram_limit`` set, growth past that many frames moves the samples
+    to a memory-mapped temporary PCM file in ``spill_dir``; from then on the
+    buffer (and its views) live in the page cache rather than process memory.
+    """
+    
+    def __init__(
+        self,
+        capacity: int,
+        channels: int = CHANNELS,
+        ram_limit: Optional[int] = None,
+        spill_dir: Optional[str] = None
+    ):
+        if ram_limit is not None:
+            capacity = min(capacity, ram_limit)
+        self._data = np.empty((max(1, capacity), channels), dtype=np.int16)
+        self._length = 0
+        self.ram_limit = ram_limit
+        self.spill_dir = spill_dir
+        self.dropped = 0
+        self._file = None
+        # Held by writes and by the swap to grown storage (never during the bulk copy)
         self._lock = threading.Lock()
     
-    def _audio_callback(self, indata: np.ndarray, frames: int, time_info: Any, status: Any):
-        """Callback for audio stream."""
-        if self.recording:
+    def write(self, block: np.ndarray):
+        """Append a block of frames (audio thread; never allocates)."""
+        with self._lock:
+            start = self._length
+            end = min(start + len(block), len(self._data))
+            self._data[start:end] = block[:end - start]
+            self.dropped += len(block) - (end - start)
+            # Publish the new length only after the samples are in place
+            self._length = end
+    
+    def reserve(self, frames: int):
+        """Make room for `frames` more frames ahead of the writer (non-realtime thread)."""
+        capacity = len(self._data)
+        if capacity - self._length >= frames:
+            return
+        capacity = max(self._length + frames, 2 * capacity)
+        channels = self._data.shape[1]
+        
+        if self._file is not None:
+            # Extend the file and map it again; the old and new maps share
+            # the file, so writes made meanwhile are already in place
+            self._file.truncate(capacity * channels * 2)
+            grown = np.memmap(self._file, dtype=np.int16, mode="r+", shape=(capacity, channels))
             with self._lock:
-                self.audio_data.append(indata.copy())
-            
-            # Calculate audio level and waveform for UI
-            if self.on_audio_level:
-                level = float(np.abs(indata).mean())
-                # Downsample waveform for visualization (take every Nth sample)
-                waveform = indata[::100, 0].tolist() if len(indata) > 100 else indata[:, 0].tolist()
-                self.on_audio_level(level, waveform)
+                self._data = grown
+            return
+        
+        if self.ram_limit is not None and capacity > self.ram_limit:
+            grown = self._spill_file(capacity, channels)
+        else:
+            grown = np.empty((capacity, channels), dtype=np.int16)
+        copied = self._length
+        grown[:copied] = self._data[:copied]
+        with self._lock:
+            # Only what the writer added during the bulk copy
+            grown[copied:self._length] = self._data[copied:self._length]
+            self._data = grown
     
-    def start(self) -> bool:
-        """Start recording."""
-        if self.recording:
-            return False
+    def _spill_file(self, capacity: int, channels: int) -> np.ndarray:
+        """Create the memory-mapped temporary file the samples move to."""
+        if self.spill_dir:
+            os.makedirs(self.spill_dir, exist_ok=True)
+        # Anonymous file: removed by the OS once closed and no longer mapped
+        spill_file = tempfile.TemporaryFile(prefix="capture-", suffix=".pcm", dir=self.spill_dir)
+        spill_file.truncate(capacity * channels * 2)
+        mapped = np.memmap(spill_file, dtype=np.int16, mode="r+", shape=(capacity, channels))
+        self._file = spill_file
+        return mapped
+    
+    @property
+    def spilled(self) -> bool:
+        """Whether the samples live in a memory-mapped file."""
+        return self._file is not None
+    
+    def view(self, start: int = 0, end: Optional[int] = None) -> np.ndarray:
+        """Zero-copy mono view of frames [start, end) (all written frames by default)."""
+        # Read the length before the array: grown storage holds at least as much
+        length = self._length if end is None else min(end, self._length)
+        data = self._data
+        if data.shape[1] == 1:
+            return data[start:length, 0]
+        return data[start:length]
+    
+    def __len__(self) -> int:
+        return self._length
+
+
+class PcmRing:
+    """Fixed-size single-producer/single-consumer int16 ring.
+    
+    The audio callback writes; the converter thread reads everything written
+    since its previous read. Frames that would overwrite unread audio are
+    dropped and counted.
+    """
+    
+    def __init__(self, capacity: int, channels: int = CHANNELS):
+        self._data = np.empty((max(1, capacity), channels), dtype=np.int16)
+        self._written = 0
+        self._read = 0
+        self.dropped = 0
+    
+    def write(self, block: np.ndarray):
+        """Append a block of frames (audio thread)."""
+        capacity = len(self._data)
+        frames = len(block)
+        if self._written + frames - self._read > capacity:
+            self.dropped += frames
+            return
+        position = self._written % capacity
+        first = min(frames, capacity - position)
+        self._data[position:position + first] = block[:first]
+        self._data[:frames - first] = block[first:]
+        self._written += frames
+    
+    def read(self) -> np.ndarray:
+        """Copy out the unread frames (consumer thread)."""
+        written = self._written
+        capacity = len(self._data)
+        start = self._read % capacity
+        end = start + written - self._read
+        if end <= capacity:
+            block = self._data[start:end].copy()
+        else:
+            block = np.concatenate((self._data[start:], self._data[:end - capacity]))
+        self._read = written
+        return block
+
+
+class PreRoll:
+    """Keeps the most recent frames of an armed stream (audio thread only)."""
+    
+    def __init__(self, capacity: int, channels: int = CHANNELS):
+        self._data = np.zeros((max(1, capacity), channels), dtype=np.int16)
+        self._written = 0
+    
+    def write(self, block: np.ndarray):
+        """Append a block, overwriting the oldest frames."""
+        capacity = len(self._data)
+        block = block[-capacity:]
+        frames = len(block)
+        position = self._written % capacity
+        first = min(frames, capacity - position)
+        self._data[position:position + first] = block[:first]
+        self._data[:frames - first] = block[first:]
+        self._written += frames
+    
+    def drain_into(self, sink) -> int:
+        """Write the held frames, oldest first, to sink and empty the pre-roll."""
+        capacity = len(self._data)
+        frames = min(self._written, capacity)
+        start = (self._written - frames) % capacity
+        end = start + frames
+        if end <= capacity:
+            sink.write(self._data[start:end])
+        else:
+            sink.write(self._data[start:])
+            sink.write(self._data[:end - capacity])
+        self._written = 0
+        return frames
+
+
+class StreamingResampler:
+    """Polyphase resampler that converts a stream block by block.
+    
+    Uses the same Kaiser-windowed FIR as ``scipy.signal.resample_poly`` and
+    keeps just enough input history between blocks for the filter, so the
+    concatenated output matches resampling the whole recording at once.
+    Plain NumPy: importing scipy.signal would delay the first recording.
+    """
+    
+    def __init__(self, rate: int, target_rate: int = SAMPLE_RATE):
+        g = math.gcd(rate, target_rate)
+        self.up = target_rate // g
+        self.down = rate // g
+        self._history: Optional[np.ndarray] = None
+        self._offset = 0  # input index of _history[0]
+        self._next = 0  # next output index to produce
+        self._channels = CHANNELS
+        if self.up == self.down:
+            self._phases = None
+            return
         
-        self.recording = True
-        self.audio_data = []
+        # Low-pass at the lower Nyquist rate (firwin with a Kaiser window, beta 5)
+        half_len = 10 * max(self.up, self.down)
+        n = np.arange(-half_len, half_len + 1)
+        cutoff = 1.0 / max(self.up, self.down)
+        taps = cutoff * np.sinc(cutoff * n) * np.kaiser(len(n), 5.0)
+        taps *= self.up / taps.sum()
+        self._delay = half_len  # in input samples of the upsampled signal
         
-        try:
-            self.stream = sd.InputStream(
-                samplerate=self.sample_rate,
-                channels=CHANNELS,
-                device=self.device_id,
-                callback=self._audio_callback
-            )
-            self.stream.start()
-            return True
-        except Exception as e:
-            self.recording = False
-            raise e
+        # Split into up phases: output centred at upsampled position c uses
+        # taps[c % up + up * t] against input sample c // up - t
+        self._taps_per_phase = -(-len(taps) // self.up)
+        padded = np.zeros(self._taps_per_phase * self.up)
+        padded[:len(taps)] = taps
+        self._phases = padded.reshape(self._taps_per_phase, self.up).T.astype(np.float32)
     
-    def stop(self) -> Optional[np.ndarray]:
-        """Stop recording and return audio data."""
-        if not self.recording:
-            return None
+    def process(self, block: np.ndarray) -> np.ndarray:
+        """Resample a block of (frames, channels) audio; returns what is complete so far."""
+        block = np.asarray(block, dtype=np.float32)
+        self._channels = block.shape[1]
+        if self._phases is None:
+            return block
+        self._history = block if self._history is None else np.concatenate((self._history, block))
+        received = self._offset + len(self._history)
+        # Outputs whose filter window lies entirely within the received input
+        return self._emit(((received - 1) * self.up - self._delay) // self.down + 1)
+    
+    def flush(self) -> np.ndarray:
+        """Resample the end of the stream (input beyond it counts as silence)."""
+        if self._history is None:
+            return np.empty((0, self._channels), dtype=np.float32)
+        received = self._offset + len(self._history)
+        return self._emit(-(-received * self.up // self.down))
+    
+    def _emit(self, stop: int) -> np.ndarray:
+        channels = self._channels
+        if stop <= self._next:
+            return np.empty((0, channels), dtype=np.float32)
         
-        self.recording = False
+        centres = np.arange(self._next, stop) * self.down + self._delay
+        phases = centres % self.up
+        # Input indices relative to the history, padded with silence on both sides
+        taps = self._taps_per_phase
+        indices = (centres // self.up - self._offset + taps)[:, None] - np.arange(taps)
+        signal = np.concatenate((
+            np.zeros((taps, channels), dtype=np.float32),
+            self._history,
+            np.zeros((taps, channels), dtype=np.float32)
+        ))
+        out = np.einsum("nt,ntc->nc", self._phases[phases], signal[indices])
+        self._next = stop
         
+        # Drop input no future output depends on
+        needed = (self._next * self.down + self._delay) // self.up - (taps - 1)
+        keep_from = max(self._offset, needed)
+        self._history = self._history[keep_from - self._offset:]
+        self._offset = keep_from
+        return out
+
+
+def native_rate(device_id: Optional[int] = None) -> int:
+    """Default sample rate of an input device (the system default input if None)."""
+    return int(sd.query_devices(device_id, "input")["default_samplerate"])
+
+
+class AudioCapture:
+    """Records an input device as int16 into a CaptureBuffer.
+    
+    The PortAudio callback only copies samples into preallocated memory
+    (a reserve thread grows it ahead of the callback);
+    stop() returns a view of the recording, so it costs the same however
+    long the recording was. Levels for the UI are measured from the buffer
+    on a separate metering thread and passed to ``on_level``.
+    
+    ``ram_limit_mb`` bounds the memory a recording holds before it spills to
+    disk; after ``max_seconds`` capture stops by itself and ``on_limit`` is
+    called (the audio is still returned by stop()).
+    
+    The device is opened at ``capture_rate`` (its default rate when None).
+    When that differs from ``sample_rate`` the callback copies into a small
+    ring instead, and a converter thread resamples it into the buffer as the
+    recording goes, so little conversion is left for stop().
+    
+    Once armed, the stream stays open between recordings: start() and stop()
+    only mark where a recording begins and ends, and each recording begins
+    with the last ``pre_roll_s`` seconds heard before start().
+    """
+    
+    def __init__(
+        self,
+        device_id: Optional[int] = None,
+        sample_rate: int = SAMPLE_RATE,
+        channels: int = CHANNELS,
+        initial_seconds: float = 60.0,
+        on_level: Optional[Callable[[Dict[str, Any]], None]] = None,
+        meter_rate_hz: float = METER_RATE_HZ,
+        meter_bins: int = METER_BINS,
+        ram_limit_mb: Optional[float] = None,
+        spill_dir: Optional[str] = None,
+        max_seconds: Optional[float] = None,
+        on_limit: Optional[Callable[[], None]] = None,
+        capture_rate: Optional[int] = None,
+        pre_roll_s: float = 0.3,
+        blocksize: int = 0,
+        latency: Union[str, float, None] = None
+    ):
+        self.device_id = device_id
+        self.sample_rate = sample_rate
+        self.capture_rate = capture_rate
+        self.channels = channels
+        self.initial_seconds = initial_seconds
+        self.on_level = on_level
+        self.meter_rate_hz = meter_rate_hz
+        self.meter_bins = meter_bins
+        self.ram_limit_mb = ram_limit_mb
+        self.spill_dir = spill_dir
+        self.max_seconds = max_seconds
+        self.on_limit = on_limit
+        self.pre_roll_s = pre_roll_s
+        self.blocksize = blocksize
+        self.latency = latency
+        self.armed = False
+        self.limit_reached = False
+        self.buffer: Optional[CaptureBuffer] = None
+        self.stream: Optional[sd.InputStream] = None
+        self.recording = False
+        self.overflows = 0
+        self.stream_rate = sample_rate  # rate the device is actually opened at
+        self._read_position = 0
+        self._captured = 0
+        self._max_frames: Optional[int] = None
+        self._ring: Optional[PcmRing] = None
+        self._resampler: Optional[StreamingResampler] = None
+        self._pre_roll: Optional[PreRoll] = None
+        self._pre_roll_pending = False
+        # Held by the callback while it writes, so start()/stop() mark exact block boundaries
+        self._lock = threading.Lock()
+        self._limit_hit = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._threads_stop = threading.Event()
+    
+    def _callback(self, indata: np.ndarray, frames: int, time_info: Any, status: Any):
+        with self._lock:
+            if not self.recording or self.limit_reached:
+                if self._pre_roll is not None:
+                    self._pre_roll.write(indata)
+                return
+            if status:
+                self.overflows += 1
+            sink = self._ring if self._ring is not None else self.buffer
+            if self._pre_roll_pending:
+                self._captured += self._pre_roll.drain_into(sink)
+                self._pre_roll_pending = False
+            if self._max_frames is not None and self._captured + len(indata) >= self._max_frames:
+                sink.write(indata[:max(0, self._max_frames - self._captured)])
+                self._captured = self._max_frames
+                self.limit_reached = True
+                self._limit_hit.set()
+                if not self.armed:
+                    raise sd.CallbackStop
+                return
+            sink.write(indata)
+            self._captured += len(indata)
+    
+    def _open_stream(self):
+        self.stream_rate = self.capture_rate or native_rate(self.device_id)
+        self._pre_roll = PreRoll(int(self.pre_roll_s * self.stream_rate), self.channels) if self.armed else None
+        stream = sd.InputStream(
+            samplerate=self.stream_rate,
+            channels=self.channels,
+            dtype="int16",
+            device=self.device_id,
+            blocksize=self.blocksize,
+            latency=self.latency,
+            callback=self._callback
+        )
+        stream.start()
+        self.stream = stream
+    
+    def _close_stream(self):
         if self.stream:
             self.stream.stop()
             self.stream.close()
             self.stream = None
+        self._pre_roll = None
+    
+    def arm(self):
+        """Open the input stream now and keep it open between recordings."""
+        self.armed = True
+        if self.stream is None:
+            try:
+                self._open_stream()
+            except Exception:
+                self.armed = False
+                raise
+        elif self._pre_roll is None:
+            # Armed mid-recording: the stream stays open from here on
+            self._pre_roll = PreRoll(int(self.pre_roll_s * self.stream_rate), self.channels)
+    
+    def disarm(self):
+        """Go back to opening the stream per recording (closes it if idle)."""
+        self.armed = False
+        if not self.recording:
+            self._close_stream()
+    
+    def start(self):
+        """Start filling a fresh buffer (opening the input stream unless armed)."""
+        if self.recording:
+            return
+        
+        # A new buffer per recording: views of the previous one may still be in use
+        frame_bytes = 2 * self.channels
+        ram_limit = int(self.ram_limit_mb * 1024 * 1024 / frame_bytes) if self.ram_limit_mb else None
+        self.buffer = CaptureBuffer(
+            int(self.initial_seconds * self.sample_rate),
+            self.channels,
+            ram_limit=ram_limit,
+            spill_dir=self.spill_dir
+        )
+        if self.stream is None:
+            self._open_stream()
+        if self.stream_rate != self.sample_rate:
+            self._ring = PcmRing(int(RING_SECONDS * self.stream_rate), self.channels)
+            self._resampler = StreamingResampler(self.stream_rate, self.sample_rate)
+        else:
+            self._ring = None
+            self._resampler = None
         
         with self._lock:
-            if not self.audio_data:
-                return None
-            
-            # Combine audio chunks
-            audio = np.concatenate(self.audio_data, axis=0)
-            # Convert float32 to int16 PCM format
-            audio_int16 = (audio * 32767).astype(np.int16)
-            return audio_int16
+            self._max_frames = int(self.max_seconds * self.stream_rate) if self.max_seconds else None
+            self._captured = 0
+            self._read_position = 0
+            self.overflows = 0
+            self.limit_reached = False
+            self._limit_hit.clear()
+            self._pre_roll_pending = self._pre_roll is not None
+            self.recording = True
+        
+        self._threads_stop.clear()
+        self._threads = [threading.Thread(target=self._run_reserve, name="buffer-reserve", daemon=True)]
+        if self._ring is not None:
+            self._threads.append(threading.Thread(target=self._run_converter, name="resampler", daemon=True))
+        if self.on_level:
+            self._threads.append(threading.Thread(target=self._run_meter, args=(self.buffer,), name="level-meter", daemon=True))
+        if self._max_frames is not None:
+            self._threads.append(threading.Thread(target=self._run_limit_watch, name="capture-limit", daemon=True))
+        for thread in self._threads:
+            thread.start()
     
-    def get_duration(self) -> float:
-        """Get current recording duration in seconds."""
+    def _run_reserve(self):
+        """Grow (or spill) the buffer ahead of the audio thread, which only writes."""
+        headroom = int(RESERVE_SECONDS * self.sample_rate)
+        buffer = self.buffer
+        buffer.reserve(headroom)
+        while not self._threads_stop.wait(RESERVE_INTERVAL):
+            buffer.reserve(headroom)
+    
+    def _run_converter(self):
+        """Resample native-rate audio from the ring into the buffer as it arrives."""
+        while not self._threads_stop.wait(CONVERT_INTERVAL):
+            self._convert(self._resampler.process(self._ring.read()))
+        # Nothing is written to the ring any more: drain it and the filter tail
+        self._convert(self._resampler.process(self._ring.read()))
+        self._convert(self._resampler.flush())
+        self.overflows += self._ring.dropped
+    
+    def _convert(self, resampled: np.ndarray):
+        if len(resampled):
+            self.buffer.write(np.clip(np.rint(resampled), -32768, 32767).astype(np.int16))
+    
+    def _run_meter(self, buffer: CaptureBuffer):
+        """Measure the audio captured since the previous reading, at meter_rate_hz."""
+        interval = 1.0 / max(self.meter_rate_hz, 0.1)
+        position = 0
+        while not self._threads_stop.wait(interval):
+            end = len(buffer)
+            if end == position:
+                continue
+            reading = measure_levels(buffer.view(position, end), self.meter_bins)
+            position = end
+            self.on_level(reading)
+    
+    def _run_limit_watch(self):
+        """Report a max-duration stop off the audio thread."""
+        self._limit_hit.wait()
+        if self.limit_reached and self.on_limit:
+            self.on_limit()
+    
+    def stop(self) -> Optional[np.ndarray]:
+        """Stop recording; returns a zero-copy int16 view of the audio (None if empty).
+        
+        An armed stream keeps running and goes back to filling the pre-roll.
+        """
+        if not self.recording:
+            return None
+        
         with self._lock:
-            if not self.audio_data:
-                return 0.0
-            total_samples = sum(len(chunk) for chunk in self.audio_data)
-            return total_samples / self.sample_rate
+            self.recording = False
+        if not self.armed:
+            self._close_stream()
+        self._threads_stop.set()
+        self._limit_hit.set()
+        for thread in self._threads:
+            if thread is not threading.current_thread():
+                thread.join()
+        self._threads = []
+        # Frames the buffer had no room for (its reserve thread fell behind)
+        self.overflows += self.buffer.dropped
+        
+        if not len(self.buffer):
+            return None
+        return self.buffer.view()
+    
+    def close(self):
+        """Stop any recording and close the stream, armed or not."""
+        self.stop()
+        self.disarm()
+    
+    def read_new(self) -> Optional[np.ndarray]:
+        """Zero-copy view of the audio captured since the previous call."""
+        if self.buffer is None:
+            return None
+        end = len(self.buffer)
+        if end == self._read_position:
+            return None
+        audio = self.buffer.view(self._read_position, end)
+        self._read_position = end
+        return audio
+    
+    @property
+    def duration(self) -> float:
+        return len(self.buffer) / self.sample_rate if self.buffer is not None else 0.0
     
     @property
     def is_recording(self) -> bool:
         return self.recording
 
 
+class AudioRecorder(AudioCapture):
+    """Handles audio recording with real-time level monitoring."""
+    
+    def __init__(self, device_id: Optional[int] = None, sample_rate: int = SAMPLE_RATE, **capture_options):
+        super().__init__(device_id=device_id, sample_rate=sample_rate, on_level=self._on_level, **capture_options)
+        self.on_audio_level: Optional[Callable[[Dict[str, Any]], None]] = None
+    
+    def _on_level(self, reading: Dict[str, Any]):
+        """Forward meter readings (runs on the metering thread)."""
+        if self.on_audio_level:
+            self.on_audio_level(reading)
+    
+    def start(self) -> bool:
+        """Start recording."""
+        if self.recording:
+            return False
+        super().start()
+        return True
+    
+    def get_duration(self) -> float:
+        """Get current recording duration in seconds."""
+        return self.duration
+
+
 def list_devices() -> List[Dict[str, Any]]:
     """List all available input devices."""
     devices = sd.query_devices()
@@ -117,6 +603,45 @@ def get_default_device_id() -> Optional[int]:
         return None
 
 
+def _dbfs(amplitude: float) -> float:
+    """Amplitude as a fraction of full scale, in dBFS (one decimal)."""
+    if amplitude <= 0:
+        return DBFS_FLOOR
+    # "or 0.0" turns a rounded -0.0 into 0.0
+    return max(DBFS_FLOOR, round(20 * math.log10(amplitude), 1)) or 0.0
+
+
+def measure_levels(audio_int16: np.ndarray, bins: int = METER_BINS) -> Dict[str, Any]:
+    """Level reading for a stretch of int16 audio.
+    
+    Returns the overlay level (``audio_level``, 0-1), RMS and peak in dBFS,
+    and a min/max envelope of ``bins`` columns as uint8 values (128 = silence),
+    flattened as [min0, max0, min1, max1, ...].
+    """
+    if audio_int16.ndim > 1:
+        audio_int16 = audio_int16[:, 0]
+    samples = audio_int16.astype(np.int32)
+    
+    magnitude = np.abs(samples)
+    peak = int(magnitude.max()) / 32768
+    rms = float(np.sqrt(np.mean(np.square(samples, dtype=np.float64)))) / 32768
+    level = float(magnitude.mean()) / 32768
+    
+    # Pad to a whole number of columns by repeating the last sample
+    per_bin = -(-len(samples) // bins)
+    padded = np.pad(samples, (0, per_bin * bins - len(samples)), mode="edge").reshape(bins, per_bin)
+    envelope = np.empty((bins, 2), dtype=np.uint8)
+    envelope[:, 0] = (padded.min(axis=1) >> 8) + 128
+    envelope[:, 1] = (padded.max(axis=1) >> 8) + 128
+    
+    return {
+        "audio_level": min(1.0, level * 50),
+        "rms_db": _dbfs(rms),
+        "peak_db": _dbfs(peak),
+        "envelope": envelope.ravel().tolist()
+    }
+
+
 def get_audio_level(audio_int16: np.ndarray) -> float:
     """Calculate average audio level."""
     return float(np.abs(audio_int16).mean())
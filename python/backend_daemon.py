@@ -3,41 +3,124 @@
 Persistent backend daemon for SuperWhisper.
 Keeps the model loaded in memory for fast transcription.
 
-Communication via stdin/stdout JSON.
+Communication via stdin/stdout JSON, served by an asyncio loop. With
+--socket the same protocol is also served to any number of clients on a
+Unix domain socket, all sharing the loaded models (see daemon_client.py).
+Every command may carry an "id"; it is echoed on every event the command
+produces. Loads, transcriptions and downloads run as cancellable tasks.
+A command with a "bytes" field is followed by exactly that many raw bytes
+(little-endian PCM for feed_audio / transcribe_buffer; every client has its own
+buffers, dropped when it disconnects).
+"arm" keeps the input stream open between recordings so each one starts
+with a short pre-roll from before start_recording (armed_capture in the
+config arms it at startup). In hands-free mode the VAD ends each utterance
+after a trailing silence and transcription starts by itself
+("utterance_ended").
+With "routing" in the config, each utterance may go to another loaded model
+by its length and the machine's load ("route" in the result); the models
+routing may pick are loaded in the background while the cache has room.
 Commands:
-  {"cmd": "load_model", "model": "nemo-parakeet-tdt-0.6b-v3"}
-  {"cmd": "start_recording", "device": 2}
+  {"cmd": "load_model", "model": "nemo-parakeet-tdt-0.6b-v3", "warmup": true, "id": 1}
+  {"cmd": "list_loaded"}
+  {"cmd": "evict", "model": "whisper-base"}
+  {"cmd": "start_recording", "device": 2, "incremental": true}
   {"cmd": "stop_recording"}
+  {"cmd": "arm", "device": 2}
+  {"cmd": "disarm"}
+  {"cmd": "start_hands_free", "device": 2, "silence": 0.8, "output": "clipboard"}
+  {"cmd": "stop_hands_free"}
   {"cmd": "transcribe", "output": "clipboard"}
+  {"cmd": "feed_audio", "buffer": "b1", "format": "int16", "sample_rate": 16000, "bytes": 3200}
+  {"cmd": "transcribe_buffer", "buffer": "b1", "output": "json", "model": "whisper-base", "device": 2}
+  {"cmd": "transcribe_buffer", "buffer": "b1", "gated": true}  (already trimmed by the client)
+  {"cmd": "transcribe_files", "input": "recordings/", "output": "results.jsonl", "workers": 4}
+  {"cmd": "cancel", "target": 1}
   {"cmd": "quit"}
 """
 
 import sys
 import json
 import os
-import tempfile
 import time
+import contextvars
+import functools
 import threading
 import signal
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-import numpy as np
-import sounddevice as sd
-import scipy.io.wavfile as wav
+# NumPy, sounddevice (PortAudio) and the ASR stack are imported where they are
+# used (asyncio too), so one-shot modes start without paying for them
+from config import Config, CAPTURE_SPILL_DIR, DAEMON_SOCKET, NOISE_FLOOR_FILE
 
 # Global state
-recording = False
-audio_data = []
-stream = None
+capture = None  # AudioCapture of the current (or last) recording
 current_model = None
 current_model_name = None
+model_cache = None  # ModelCache of loaded models, created on first use
+speech_gate = None  # SpeechGate with per-device noise floors, created on first use
+router = None  # ModelRouter picking a model per utterance (config "routing"), created on first use
+load_lock = threading.Lock()  # one model load at a time
+load_cond = threading.Condition()  # guards the model swap and pending_loads
+load_generation = 0  # bumped by every load request; the newest one wins
+pending_loads = set()  # generations of loads still in progress
+transcription_lock = None  # asyncio.Lock: transcriptions complete in submission order
+operations = set()  # running Operations (cancellable tasks)
+shutdown_event = None  # asyncio.Event set by quit (or a signal in socket-only mode)
+event_loop = None
+vad_model = None
+incremental = None  # IncrementalTranscriber for the current recording
+hands_free = None  # UtteranceEndpointer while hands-free mode is on
+fed_buffers = {}  # audio pushed with feed_audio, by (client sink, buffer name)
+last_utterance = 0  # number of the last utterance submitted for transcription
 SAMPLE_RATE = 16000
+MAX_FRAME_BYTES = 64 * 1024 * 1024  # largest binary payload accepted after a command
+PCM_FORMATS = {"int16": "<i2", "float32": "<f4"}  # little-endian NumPy dtypes
+
+# Id of the command being handled and the client it came from (None = stdout);
+# tasks and worker threads inherit both
+current_request = contextvars.ContextVar("current_request", default=None)
+current_output = contextvars.ContextVar("current_output", default=None)
+_stdout_lock = threading.Lock()
+
+
+class SocketSink:
+    """Writes a socket client's events; safe to call from any thread."""
+    
+    def __init__(self, writer):
+        import asyncio
+        
+        self.writer = writer
+        self.loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+    
+    def write(self, line):
+        data = (line + "\n").encode()
+        if threading.get_ident() == self._loop_thread:
+            self._write(data)
+            return
+        try:
+            self.loop.call_soon_threadsafe(self._write, data)
+        except RuntimeError:
+            pass  # loop already closed
+    
+    def _write(self, data):
+        if not self.writer.is_closing():
+            self.writer.write(data)
 
 
 def send_response(data):
-    """Send JSON response to stdout."""
-    print(json.dumps(data), flush=True)
+    """Send JSON response to the current client, tagged with the command's id."""
+    request_id = current_request.get()
+    if request_id is not None and "id" not in data:
+        data = {**data, "id": request_id}
+    line = json.dumps(data)
+    sink = current_output.get()
+    if sink is not None:
+        sink.write(line)
+        return
+    with _stdout_lock:
+        print(line, flush=True)
 
 
 def send_error(message):
@@ -45,151 +128,770 @@ def send_error(message):
     send_response({"error": message})
 
 
-def load_model(model_name):
-    """Load ASR model into memory."""
+class Operation:
+    """A long-running command executing as an asyncio task."""
+    
+    def __init__(self, kind, request_id, sink):
+        self.kind = kind
+        self.request_id = request_id
+        self.sink = sink  # client that started it
+        self.task = None
+        self.utterance = None  # transcriptions: the utterance number
+        self.created_at = time.time()
+        self.started_at = None  # set once the work actually runs (not while queued)
+        self.cancelled = threading.Event()  # checked by worker threads before producing output
+        self.cancel_reason = None
+    
+    def cancel(self, reason="requested"):
+        self.cancel_reason = reason
+        self.cancelled.set()
+        self.task.cancel()
+
+
+def spawn(kind, work, *args):
+    """Run work(op, *args) as a cancellable task under the current command's id."""
+    import asyncio
+    
+    op = Operation(kind, current_request.get(), current_output.get())
+    op.task = asyncio.get_running_loop().create_task(work(op, *args))
+    op.task.add_done_callback(functools.partial(_operation_done, op))
+    operations.add(op)
+    return op
+
+
+def _operation_done(op, task):
+    """Report how an operation ended (also when cancelled before it started)."""
+    operations.discard(op)
+    if task.cancelled():
+        op.cancelled.set()
+        event = {"status": "cancelled", "operation": op.kind, "reason": op.cancel_reason}
+        if op.utterance is not None:
+            event["utterance"] = op.utterance
+        send_response(event)
+    elif task.exception() is not None:
+        send_error(f"{op.kind} failed: {task.exception()}")
+
+
+def cancel_operations(target=None, everywhere=False):
+    """Cancel the current client's operation started by command `target` (all when None)."""
+    sink = current_output.get()
+    cancelled = []
+    for op in list(operations):
+        if not everywhere and op.sink is not sink:
+            continue
+        if target is None or op.request_id == target:
+            op.cancel()
+            cancelled.append(op.request_id)
+    return cancelled
+
+
+def abandon_stale_transcriptions():
+    """Cancel transcriptions submitted too long ago to still be wanted.
+    
+    A running one releases the transcription lock at once, so the next
+    recording does not wait behind it; its inference finishes in the
+    background and its output is dropped (the client gets "cancelled" with
+    the utterance number).
+    """
+    limit = Config.load().stale_transcription_s
+    if not limit:
+        return
+    now = time.time()
+    for op in list(operations):
+        if op.kind == "transcribe" and now - op.created_at > limit:
+            op.cancel("stale")
+
+
+def _load_onnx_model(model_name):
+    from ort_session import load_asr_model
+    return load_asr_model(model_name)
+
+
+def get_model_cache():
+    """Return the model cache, creating it from the config on first use."""
+    global model_cache
+    
+    if model_cache is None:
+        from model_cache import ModelCache
+        model_cache = ModelCache(_load_onnx_model, budget_mb=Config.load().model_cache_mb)
+    return model_cache
+
+
+def get_speech_gate():
+    """Return the speech gate, creating it from the config on first use."""
+    global speech_gate
+    
+    if speech_gate is None:
+        from transcriber import SpeechGate
+        config = Config.load()
+        speech_gate = SpeechGate(
+            margin_db=config.gate_margin_db,
+            padding_s=config.trim_padding_s,
+            path=NOISE_FLOOR_FILE
+        )
+    return speech_gate
+
+
+def get_router():
+    """Return the model router, creating it from the config on first use."""
+    global router
+    
+    if router is None:
+        from routing import ModelRouter
+        config = Config.load()
+        router = ModelRouter(
+            short_model=config.route_short_model or None,
+            short_max_s=config.route_short_max_s,
+            fallback_model=config.route_fallback_model or None,
+            max_queue=config.route_max_queue,
+            max_cpu_load=config.route_max_cpu_load,
+            latency_budget_s=config.route_latency_budget_s,
+            is_available=_model_cached
+        )
+    return router
+
+
+def _model_cached(model_name):
+    """Routing only picks loaded models: an utterance never waits for a load or a download."""
+    return model_name in get_model_cache()
+
+
+def warm_route_models():
+    """Load the models routing may pick in the background (on the event loop)."""
+    if any(op.kind == "warm_routes" for op in operations):
+        return
+    missing = [
+        name for name in dict.fromkeys([get_router().short_model, get_router().fallback_model])
+        if name and name not in get_model_cache()
+    ]
+    if missing:
+        # Not part of the command that noticed it; events go to stdout
+        contextvars.Context().run(spawn, "warm_routes", _warm_routes_op, missing)
+
+
+async def _warm_routes_op(op, model_names):
+    """Load downloaded route models that fit the cache without evicting another model."""
+    import asyncio
+    from model_manager import check_model
+    
+    op.started_at = time.time()
+    warmup = Config.load().warmup
+    for model_name in model_names:
+        status = await asyncio.to_thread(check_model, model_name)
+        if not status.get("downloaded") or status.get("size_bytes", 0) > get_model_cache().headroom():
+            continue
+        model, _ = await asyncio.to_thread(get_model_cache().get, model_name)
+        response = {"status": "route_model_ready", "model": model_name}
+        if warmup:
+            from transcriber import warm_up
+            stats = await asyncio.to_thread(warm_up, model)
+            get_router().observe_rtf(model_name, stats.get("rtf"))
+            response["rtf"] = stats.get("rtf")
+        send_response(response)
+
+
+def load_model(model_name, warmup=None):
+    """Start loading an ASR model as a task (or switch to a cached one).
+    
+    The command loop keeps answering while the model loads. The previous model
+    keeps serving until the new one is ready and is then swapped atomically;
+    if several loads are requested, the most recent one wins. Freshly loaded
+    models are warmed up (unless disabled) and the cold/warm latency and
+    real-time factor are reported in the model_loaded event.
+    """
+    global load_generation
+    
+    with load_cond:
+        if current_model_name == model_name and current_model is not None and not pending_loads:
+            send_response({"status": "model_already_loaded", "model": model_name})
+            return True
+        load_generation += 1
+        generation = load_generation
+        pending_loads.add(generation)
+    
+    spawn("load_model", _load_model_op, model_name, warmup, generation)
+    return True
+
+
+async def _load_model_op(op, model_name, warmup, generation):
+    global load_generation
+    import asyncio
+    
+    op.started_at = time.time()
+    try:
+        await asyncio.to_thread(_load_model_worker, model_name, warmup, generation)
+    except asyncio.CancelledError:
+        # The load itself cannot be interrupted; make sure it is never swapped in
+        with load_cond:
+            if generation == load_generation:
+                load_generation += 1
+            pending_loads.discard(generation)
+            load_cond.notify_all()
+        raise
+
+
+def _load_model_worker(model_name, warmup, generation):
+    """Load a model next to the active one, then swap it in."""
+    global current_model, current_model_name, pending_loads
+    
+    try:
+        with load_lock:
+            if generation != load_generation:
+                send_response({"status": "load_superseded", "model": model_name})
+                return
+            
+            config = Config.load()
+            if warmup is None:
+                warmup = config.warmup
+            
+            cache = get_model_cache()
+            if model_name not in cache:
+                send_response({"status": "loading_model", "model": model_name})
+            model, cached = cache.get(model_name)
+            response = {"status": "model_loaded", "model": model_name, "cached": cached}
+            if warmup and not cached:
+                from transcriber import warm_up
+                send_response({"status": "warming_up", "model": model_name})
+                response["warmup"] = warm_up(model)
+                if config.routing:
+                    get_router().observe_rtf(model_name, response["warmup"].get("rtf"))
+            
+            with load_cond:
+                if generation != load_generation:
+                    send_response({"status": "load_superseded", "model": model_name})
+                    return
+                current_model = model
+                current_model_name = model_name
+            send_response(response)
+    except Exception as e:
+        send_error(f"Failed to load model: {e}")
+    finally:
+        with load_cond:
+            pending_loads.discard(generation)
+            load_cond.notify_all()
+
+
+def wait_for_model(timeout=None):
+    """Block until no model load is in progress; return the active model."""
+    with load_cond:
+        if pending_loads:
+            send_response({"status": "waiting_for_model"})
+            load_cond.wait_for(lambda: not pending_loads, timeout)
+        return current_model
+
+
+def list_loaded():
+    """Report the models held in the cache with their memory use."""
+    from model_cache import process_rss, MB
+    
+    cache = get_model_cache()
+    send_response({
+        "loaded": cache.list_loaded(),
+        "active": current_model_name,
+        "total_rss_mb": round(cache.total_rss / MB, 1),
+        "process_rss_mb": round(process_rss() / MB, 1),
+        "budget_mb": round(cache.budget / MB)
+    })
+
+
+def evict_model(model_name):
+    """Drop a model from the cache (including the active one)."""
     global current_model, current_model_name
     
-    if current_model_name == model_name and current_model is not None:
-        send_response({"status": "model_already_loaded", "model": model_name})
-        return True
+    if model_name == current_model_name:
+        current_model = None
+        current_model_name = None
     
+    if get_model_cache().evict(model_name):
+        send_response({"status": "evicted", "model": model_name})
+    else:
+        send_error(f"Model not loaded: {model_name}")
+
+
+def load_vad_model():
+    """Load the Silero VAD used for incremental transcription (once)."""
+    global vad_model
+    
+    if vad_model is None:
+        from onnx_asr.loader import load_vad
+        vad_model = load_vad("silero", providers=["CPUExecutionProvider"])
+    return vad_model
+
+
+def start_incremental(capture):
+    """Start transcribing finished speech segments while recording continues."""
+    global incremental
+    from streaming import IncrementalTranscriber
+    
+    # Partial results are sent from the worker thread under the command's id
+    context = contextvars.copy_context()
+    
+    def on_partial(text, segments):
+        context.run(send_response, {"partial_text": text, "segments": segments})
+    
+    def on_error(error):
+        # The rest is transcribed when the recording stops
+        context.run(send_response, {"status": "partial_failed", "message": str(error)})
+    
+    try:
+        incremental = IncrementalTranscriber(
+            current_model,
+            load_vad_model(),
+            capture.read_new,
+            on_partial=on_partial,
+            on_error=on_error,
+            sample_rate=SAMPLE_RATE
+        )
+        incremental.start()
+    except Exception as e:
+        incremental = None
+        send_error(f"Incremental transcription unavailable: {e}")
+
+
+def cancel_incremental():
+    """Abandon the incremental transcription of the current recording, if any."""
+    global incremental
+    
+    if incremental is not None:
+        incremental.cancel()
+        incremental = None
+
+
+def configure_capture(device_id, config):
+    """Return the capture for device_id with the current config applied.
+    
+    An armed capture on the same device is kept (its stream is already
+    open); otherwise a new one is made, armed again if the old one was.
+    """
+    global capture
+    from audio import AudioCapture
+    
+    if capture is None or not capture.armed or capture.device_id != device_id:
+        rearm = capture is not None and capture.armed
+        if capture is not None:
+            capture.close()
+        capture = AudioCapture(
+            device_id=device_id,
+            sample_rate=SAMPLE_RATE,
+            spill_dir=str(CAPTURE_SPILL_DIR),
+            capture_rate=config.capture_rate or None,
+            pre_roll_s=config.pre_roll_s,
+            blocksize=config.blocksize,
+            latency=config.latency
+        )
+        if rearm:
+            capture.arm()
+    
+    # Per-recording settings apply even to a stream that is already open
+    capture.meter_rate_hz = config.meter_rate_hz
+    capture.meter_bins = config.meter_bins
+    capture.ram_limit_mb = config.capture_ram_mb
+    capture.max_seconds = config.max_recording_s
+    return capture
+
+
+def arm_capture(device_id=None):
+    """Keep the input stream open so recordings start instantly, with pre-roll."""
+    if capture is not None and capture.is_recording:
+        send_error("Already recording")
+        return False
+    
+    config = Config.load()
     try:
-        import onnx_asr
-        send_response({"status": "loading_model", "model": model_name})
-        current_model = onnx_asr.load_model(model_name, providers=["CPUExecutionProvider"])
-        current_model_name = model_name
-        send_response({"status": "model_loaded", "model": model_name})
+        configure_capture(device_id, config).arm()
+        send_response({
+            "status": "armed",
+            "device": device_id,
+            "capture_rate": capture.stream_rate,
+            "pre_roll": capture.pre_roll_s
+        })
         return True
     except Exception as e:
-        send_error(f"Failed to load model: {e}")
+        send_error(f"Failed to arm capture: {e}")
         return False
 
 
-def start_recording(device_id=None):
+def disarm_capture():
+    """Close the armed input stream (recordings open their own again)."""
+    if capture is not None:
+        capture.disarm()
+    send_response({"status": "disarmed"})
+
+
+def start_recording(device_id=None, incremental_mode=False):
     """Start recording audio."""
-    global recording, audio_data, stream
-    
-    if recording:
+    if capture is not None and capture.is_recording:
         send_error("Already recording")
         return False
     
-    recording = True
-    audio_data = []
-    last_level_time = [0]
+    cancel_incremental()
+    abandon_stale_transcriptions()
+    config = Config.load()
+    context = contextvars.copy_context()
     
-    def callback(indata, frames, time_info, status):
-        if recording:
-            audio_data.append(indata.copy())
-            
-            # Send audio level every 100ms
-            current_time = time.time()
-            if current_time - last_level_time[0] > 0.1:
-                level = float(np.abs(indata).mean())
-                normalized = min(1.0, level * 50)
-                send_response({"audio_level": normalized})
-                last_level_time[0] = current_time
+    def on_level(reading):
+        # Runs on the metering thread, never on the audio callback
+        context.run(send_response, reading)
+    
+    def on_limit():
+        # Capture has stopped; the next stop_recording still returns the audio
+        context.run(send_response, {
+            "status": "recording_limit_reached",
+            "max_duration": config.max_recording_s
+        })
     
     try:
-        stream = sd.InputStream(
-            samplerate=SAMPLE_RATE,
-            channels=1,
-            device=device_id,
-            callback=callback
-        )
-        stream.start()
-        send_response({"status": "recording_started", "device": device_id})
+        configure_capture(device_id, config)
+        capture.on_level = on_level
+        capture.on_limit = on_limit
+        capture.start()
+        if incremental_mode and current_model is not None:
+            start_incremental(capture)
+        send_response({
+            "status": "recording_started",
+            "device": device_id,
+            "capture_rate": capture.stream_rate,
+            "armed": capture.armed,
+            "incremental": incremental is not None
+        })
         return True
     except Exception as e:
-        recording = False
         send_error(f"Failed to start recording: {e}")
         return False
 
 
 def stop_recording():
-    """Stop recording and return audio data."""
-    global recording, audio_data, stream
-    
-    if not recording:
+    """Stop recording and return audio data (a view of the int16 capture buffer)."""
+    if hands_free is not None:
+        send_error("Hands-free mode is on")
+        return None
+    if capture is None or not capture.is_recording:
         send_error("Not recording")
         return None
     
-    recording = False
+    audio = capture.stop()
+    if audio is None:
+        cancel_incremental()
+        return None
     
-    if stream:
-        stream.stop()
-        stream.close()
-        stream = None
+    duration = len(audio) / SAMPLE_RATE
+    send_response({
+        "status": "recording_stopped",
+        "duration": duration,
+        "spilled": capture.buffer.spilled
+    })
     
-    if not audio_data:
-        return None
+    return audio
+
+
+def start_hands_free(device_id=None, silence=None, output_mode="json"):
+    """Listen continuously; each utterance is transcribed as soon as the VAD hears it end.
+    
+    The capture is armed, so cutting one utterance and starting the next
+    loses no audio; recordings without speech are dropped.
+    """
+    global hands_free
+    from streaming import UtteranceEndpointer
+    
+    if hands_free is not None:
+        send_error("Hands-free mode is already on")
+        return False
+    if capture is not None and capture.is_recording:
+        send_error("Already recording")
+        return False
+    
+    config = Config.load()
+    silence = silence or config.hands_free_silence_s
+    context = contextvars.copy_context()
+    
+    # Callbacks come from several threads at once, and a context can only be
+    # entered by one of them at a time: each call runs in its own copy
+    def on_level(reading):
+        context.copy().run(send_response, reading)
+    
+    def on_endpoint(speech):
+        # Worker thread: cut the recording on the event loop
+        event_loop.call_soon_threadsafe(context.copy().run, end_utterance, speech, output_mode, config.routing)
     
-    # Combine audio chunks
-    audio = np.concatenate(audio_data, axis=0)
-    audio_int16 = (audio * 32767).astype(np.int16)
+    def on_limit():
+        # Capture has stopped writing: end the utterance here and start a new one
+        context.copy().run(send_response, {
+            "status": "recording_limit_reached",
+            "max_duration": config.max_recording_s
+        })
+        if endpointer is not None:
+            endpointer.end_now()
     
-    duration = len(audio_int16) / SAMPLE_RATE
-    send_response({"status": "recording_stopped", "duration": duration})
+    endpointer = None
+    try:
+        vad = load_vad_model()
+        configure_capture(device_id, config).arm()
+        capture.on_level = on_level
+        capture.on_limit = on_limit
+        capture.start()
+    except Exception as e:
+        send_error(f"Hands-free mode unavailable: {e}")
+        return False
     
-    return audio_int16
+    hands_free = endpointer = UtteranceEndpointer(
+        vad,
+        capture.read_new,
+        on_endpoint,
+        sample_rate=SAMPLE_RATE,
+        silence=silence
+    )
+    hands_free.start()
+    send_response({"status": "hands_free_started", "device": device_id, "silence": silence})
+    return True
 
 
-def transcribe(audio_int16, output_mode="json"):
-    """Transcribe audio using loaded model."""
-    global current_model
+def end_utterance(speech, output_mode="json", routing=False):
+    """Cut the recording at an endpoint and keep listening (on the event loop)."""
+    if hands_free is None:
+        return
+    
+    audio = capture.stop()
+    capture.start()
+    hands_free.resume()
+    if not speech or audio is None:
+        return  # nothing but silence since the last utterance
+    
+    utterance = next_utterance()
+    send_response({"status": "utterance_ended", "utterance": utterance, "duration": len(audio) / SAMPLE_RATE})
+    submit_transcription(audio, output_mode, device=capture.device_id, utterance=utterance, routing=routing)
+
+
+def stop_hands_free(output_mode="json"):
+    """Leave hands-free mode, transcribing an utterance still in progress."""
+    global hands_free
+    
+    if hands_free is None:
+        send_error("Hands-free mode is off")
+        return
+    
+    endpointer, hands_free = hands_free, None
+    endpointer.stop()
+    audio = capture.stop()
+    config = Config.load()
+    if not config.armed_capture:
+        capture.disarm()
+    send_response({"status": "hands_free_stopped"})
     
-    if current_model is None:
+    if endpointer.speech_heard and audio is not None:
+        utterance = next_utterance()
+        send_response({"status": "utterance_ended", "utterance": utterance, "duration": len(audio) / SAMPLE_RATE})
+        submit_transcription(audio, output_mode, device=capture.device_id, utterance=utterance,
+                             routing=config.routing)
+
+
+def next_utterance():
+    """Number the next utterance (reported with its events, e.g. when cancelled)."""
+    global last_utterance
+    
+    last_utterance += 1
+    return last_utterance
+
+
+def submit_transcription(audio, output_mode="json", model_name=None, device=None, utterance=None,
+                         routing=None, gate=True):
+    """Queue a transcription as a cancellable task.
+    
+    The command loop stays responsive while it runs (or waits for a model
+    that is still loading); transcriptions complete in submission order.
+    `routing` defaults to the config's setting.
+    """
+    global incremental
+    
+    if routing is None:
+        routing = Config.load().routing
+    session, incremental = incremental, None
+    op = spawn("transcribe", _transcription_op, audio, output_mode, session, model_name, device, routing, gate)
+    op.utterance = utterance if utterance is not None else next_utterance()
+
+
+async def _transcription_op(op, audio, output_mode, session, model_name, device, routing, gate):
+    import asyncio
+    
+    try:
+        async with transcription_lock:
+            op.started_at = time.time()
+            # Backlog seen by the router: transcriptions waiting behind this one
+            queued = sum(1 for other in operations if other.kind == "transcribe" and other is not op)
+            await asyncio.to_thread(
+                transcribe, audio, output_mode, session, op.cancelled, model_name, device, routing, queued,
+                gate
+            )
+    except asyncio.CancelledError:
+        # The abandoned inference finishes in the background but its output is
+        # dropped; the next transcription starts right away
+        if session is not None:
+            asyncio.get_running_loop().run_in_executor(None, session.cancel)
+        raise
+
+
+def transcribe(audio, output_mode="json", session=None, cancelled=None, model_name=None, device=None,
+               routing=False, queued=0, gate=True):
+    """Transcribe audio using the loaded model (waiting for a load in progress).
+    
+    With an incremental session only the unfinished tail is left to transcribe.
+    A named model is taken from the cache without changing the active model.
+    The speech gate skips recordings without speech and trims the silence
+    around it, judged against `device`'s noise floor; audio the client has
+    already gated is passed with `gate` off and goes to the model as is.
+    With `routing`, a recording without a named model may be sent to
+    another loaded model, by its length, the `queued` backlog and the
+    machine's load; the decision is reported as "route".
+    Nothing is sent or pasted once `cancelled` is set.
+    """
+    from transcriber import audio_level, recognize_audio
+    
+    routable = routing and not model_name and session is None
+    if model_name and model_name != current_model_name:
+        model, _ = get_model_cache().get(model_name)
+    else:
+        model = wait_for_model()
+        model_name = current_model_name
+    if model is None:
+        if session is not None:
+            session.cancel()
         send_error("No model loaded")
         return None
     
-    # Check audio level
-    audio_level = np.abs(audio_int16).mean()
-    if audio_level < 100:
-        send_response({"error": "Audio too quiet", "level": float(audio_level)})
+    # No model call at all without speech
+    bounds = get_speech_gate().detect(audio, device) if gate else (0, len(audio))
+    if bounds is None:
+        if session is not None:
+            session.cancel()
+        send_response({
+            "error": "No speech detected",
+            "level": audio_level(audio),
+            "duration": len(audio) / SAMPLE_RATE
+        })
         return None
     
+    speech_duration = (bounds[1] - bounds[0]) / SAMPLE_RATE
+    route = None
+    if routable:
+        route = get_router().route(model_name, speech_duration, queued)
+        if route.model != model_name:
+            routed_model = get_model_cache().peek(route.model)
+            if routed_model is not None:
+                model, model_name = routed_model, route.model
+            else:
+                # Evicted since the decision; never load inside the utterance
+                route.model, route.reason = model_name, "default"
+        # Reload route models the cache has dropped, off the utterance's path
+        event_loop.call_soon_threadsafe(warm_route_models)
+    
     send_response({"status": "transcribing"})
     
-    # Save to temp file
-    with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as f:
-        wav.write(f.name, SAMPLE_RATE, audio_int16)
-        temp_path = f.name
+    # Transcribe with already-loaded model (FAST!), straight from memory;
+    # only the speech span, without the silence around the key press/release
+    start_time = time.time()
+    if session is not None:
+        try:
+            result = session.finish()
+        except Exception as e:
+            # Start over on the whole recording rather than lose it
+            send_response({"status": "partial_failed", "message": str(e)})
+            session = None
+    if session is None:
+        result = recognize_audio(model, audio[bounds[0]:bounds[1]], SAMPLE_RATE)
+        if routing:
+            get_router().observe(model_name, speech_duration, time.time() - start_time)
+    elapsed = time.time() - start_time
     
-    try:
-        # Transcribe with already-loaded model (FAST!)
-        start_time = time.time()
-        result = current_model.recognize(temp_path)
-        elapsed = time.time() - start_time
+    if cancelled is not None and cancelled.is_set():
+        return None
+    
+    if result and result.strip():
+        text = result.strip()
+        response = {
+            "text": text,
+            "duration": len(audio) / SAMPLE_RATE,
+            "speech_duration": speech_duration,
+            "transcription_time": elapsed,
+            "model": model_name
+        }
+        if route is not None:
+            response["route"] = route.to_dict()
         
-        if result and result.strip():
-            text = result.strip()
-            response = {
-                "text": text,
-                "duration": len(audio_int16) / SAMPLE_RATE,
-                "transcription_time": elapsed
-            }
-            
-            # Handle output mode
-            if output_mode == 'clipboard':
-                if copy_to_clipboard(text):
-                    response['copied'] = True
-            elif output_mode == 'simulate_typing':
-                if type_text(text):
-                    response['typed'] = True
-                else:
-                    copy_to_clipboard(text)
-                    response['copied'] = True
-                    response['typing_failed'] = True
-            
-            send_response(response)
-            return text
-        else:
-            send_response({"error": "No speech detected", "duration": len(audio_int16) / SAMPLE_RATE})
-            return None
-    finally:
-        try:
-            os.unlink(temp_path)
-        except:
-            pass
+        # Handle output mode
+        if output_mode == 'clipboard':
+            if copy_to_clipboard(text):
+                response['copied'] = True
+        elif output_mode == 'simulate_typing':
+            if type_text(text):
+                response['typed'] = True
+            else:
+                copy_to_clipboard(text)
+                response['copied'] = True
+                response['typing_failed'] = True
+        
+        send_response(response)
+        return text
+    else:
+        send_response({"error": "No speech detected", "duration": len(audio) / SAMPLE_RATE})
+        return None
+
+
+def feed_audio(cmd_data, payload):
+    """Append client-supplied PCM to a named buffer.
+    
+    The buffer keeps the frames as received (no copy of the payload); they
+    are converted and resampled once, when the buffer is transcribed.
+    """
+    import numpy as np
+    
+    name = cmd_data.get('buffer', 'default')
+    fmt = cmd_data.get('format', 'int16')
+    sample_rate = int(cmd_data.get('sample_rate', SAMPLE_RATE))
+    channels = int(cmd_data.get('channels', 1))
+    
+    if fmt not in PCM_FORMATS:
+        send_error(f"Unsupported format: {fmt} (expected one of {', '.join(PCM_FORMATS)})")
+        return False
+    dtype = np.dtype(PCM_FORMATS[fmt])
+    if len(payload) % (dtype.itemsize * channels):
+        send_error(f"Payload of {len(payload)} bytes is not a whole number of {fmt} frames")
+        return False
+    
+    buffer = fed_buffers.setdefault((current_output.get(), name), {
+        "format": fmt,
+        "sample_rate": sample_rate,
+        "channels": channels,
+        "chunks": [],
+    })
+    if (buffer["format"], buffer["sample_rate"], buffer["channels"]) != (fmt, sample_rate, channels):
+        send_error(f"Buffer {name} holds {buffer['format']} at {buffer['sample_rate']} Hz "
+                   f"x{buffer['channels']}; clear it before changing the format")
+        return False
+    
+    if payload:
+        buffer["chunks"].append(np.frombuffer(payload, dtype=dtype))
+    return True
+
+
+def take_fed_audio(name):
+    """Remove one of the current client's buffers and return it as a mono 16 kHz float32 waveform."""
+    import numpy as np
+    from transcriber import resample, to_waveform
+    
+    buffer = fed_buffers.pop((current_output.get(), name), None)
+    if buffer is None or not buffer["chunks"]:
+        return None
+    
+    audio = np.concatenate(buffer["chunks"])
+    if buffer["channels"] > 1:
+        audio = audio.reshape(-1, buffer["channels"]).mean(axis=1).astype(audio.dtype)
+    waveform = to_waveform(audio)
+    return resample(waveform, buffer["sample_rate"])
+
+
+def drop_fed_buffers(sink):
+    """Forget the buffers of a client that has disconnected."""
+    for key in [key for key in fed_buffers if key[0] is sink]:
+        del fed_buffers[key]
 
 
 def copy_to_clipboard(text):
@@ -250,6 +952,7 @@ def type_text(text):
 def list_devices():
     """List available audio input devices."""
     try:
+        import sounddevice as sd
         devices = sd.query_devices()
         default_input = sd.default.device[0]
         result = []
@@ -266,91 +969,146 @@ def list_devices():
 
 
 def check_model_status(model_name):
-    """Check if a model is downloaded."""
+    """Check if a model is downloaded (from the model index shared with model_manager)."""
+    from model_manager import check_model
+    
+    status = check_model(model_name)
+    if "error" in status:
+        send_error(f"Failed to check model: {status['error']}")
+        return
+    send_response({"path": None, "size": None, **status})
+
+
+def download_model_cmd(model_name, cancelled=None):
+    """Download a model (resumable and verified), sending download_progress events."""
     try:
-        # Model name to HuggingFace repo mapping
-        model_repos = {
-            "nemo-parakeet-tdt-0.6b-v3": "onnx-community/nemo-parakeet-tdt-0.6b-v3",
-            "nemo-parakeet-tdt-1.1b-v2": "onnx-community/nemo-parakeet-tdt-1.1b-v2",
-            "whisper-tiny": "onnx-community/whisper-tiny",
-            "whisper-base": "istupakov/whisper-base-onnx",
-            "whisper-small": "onnx-community/whisper-small",
-            "whisper-medium": "onnx-community/whisper-medium",
-            "whisper-large-v3": "onnx-community/whisper-large-v3",
-            "whisper-large-v3-turbo": "onnx-community/whisper-large-v3-turbo",
-            "moonshine-tiny": "onnx-community/moonshine-tiny",
-            "moonshine-base": "onnx-community/moonshine-base",
-        }
+        from ort_session import load_asr_model
+        from model_manager import (
+            DownloadCancelled, check_model, fetch_model_files, get_snapshot_path,
+            quantize_model, read_variant_info, split_variant
+        )
+        send_response({"status": "downloading", "model": model_name})
         
-        repo_id = model_repos.get(model_name, f"onnx-community/{model_name}")
+        base_name, quantization = split_variant(model_name)
+        try:
+            fetch_model_files(base_name, on_progress=send_response, cancelled=cancelled)
+        except DownloadCancelled:
+            return  # partial files are kept; the next download resumes them
+        except OSError:
+            # Offline with the model already cached is fine
+            if get_snapshot_path(base_name) is None:
+                raise
         
-        # Check HuggingFace cache
-        cache_dir = os.path.expanduser("~/.cache/huggingface/hub")
-        repo_folder_name = "models--" + repo_id.replace("/", "--")
-        model_path = os.path.join(cache_dir, repo_folder_name)
+        # Quantized variants are produced locally from the base model, as in model_manager
+        if quantization is not None and read_variant_info(model_name) is None:
+            if cancelled is not None and cancelled.is_set():
+                return
+            quantize_model(model_name, on_progress=send_response)
         
-        if os.path.exists(model_path):
-            # Calculate size by following symlinks
-            total_size = 0
-            snapshots_dir = os.path.join(model_path, "snapshots")
-            if os.path.exists(snapshots_dir):
-                for root, dirs, files in os.walk(snapshots_dir):
-                    for f in files:
-                        file_path = os.path.join(root, f)
-                        if os.path.islink(file_path):
-                            real_path = os.path.realpath(file_path)
-                            if os.path.exists(real_path):
-                                total_size += os.path.getsize(real_path)
-                        elif os.path.isfile(file_path):
-                            total_size += os.path.getsize(file_path)
-            
-            # Format size
-            if total_size > 1024 * 1024 * 1024:
-                size_str = f"{total_size / (1024 * 1024 * 1024):.1f} GB"
-            elif total_size > 1024 * 1024:
-                size_str = f"{total_size / (1024 * 1024):.0f} MB"
-            else:
-                size_str = f"{total_size / 1024:.0f} KB"
-            
-            send_response({
-                "downloaded": True,
-                "path": model_path,
-                "size": size_str
-            })
-        else:
-            send_response({
-                "downloaded": False,
-                "path": None,
-                "size": None
-            })
+        # Fetches anything the engine left out and builds the optimized graphs
+        load_asr_model(model_name)
+        if cancelled is None or not cancelled.is_set():
+            # Re-indexes just this model, so the next status check is instant
+            send_response({"status": "download_complete", "model": model_name, **check_model(model_name)})
     except Exception as e:
-        send_error(f"Failed to check model: {e}")
+        send_error(f"Failed to download model: {e}")
 
 
-def download_model_cmd(model_name):
-    """Download a model."""
+def transcribe_files_cmd(cmd_data, cancelled=None):
+    """Batch-transcribe a directory or glob of WAV files on a process pool."""
+    from batch_transcribe import find_audio_files, transcribe_files
+    
+    pattern = cmd_data.get('input')
+    if not pattern:
+        send_error("Missing input")
+        return
+    
+    paths = find_audio_files(pattern)
+    if not paths:
+        send_error(f"No WAV files match {pattern}")
+        return
+    
+    model_name = cmd_data.get('model') or current_model_name or 'nemo-parakeet-tdt-0.6b-v3'
+    output_path = cmd_data.get('output')
+    send_response({"status": "batch_started", "files": len(paths), "model": model_name})
+    
+    start_time = time.time()
+    out = open(output_path, 'a') if output_path else None
     try:
-        import onnx_asr
-        send_response({"status": "downloading", "model": model_name})
-        onnx_asr.load_model(model_name, providers=["CPUExecutionProvider"])
-        send_response({"status": "download_complete", "model": model_name})
+        for result in transcribe_files(
+            paths,
+            model_name=model_name,
+            use_vad=cmd_data.get('vad', False),
+            workers=cmd_data.get('workers')
+        ):
+            if cancelled is not None and cancelled.is_set():
+                # Closing the generator shuts the pool down, dropping files not started yet
+                return
+            if out:
+                out.write(json.dumps(result) + "\n")
+                out.flush()
+            send_response({"file_result": result})
     except Exception as e:
-        send_error(f"Failed to download model: {e}")
+        send_error(f"Batch transcription failed: {e}")
+        return
+    finally:
+        if out:
+            out.close()
+    
+    send_response({
+        "status": "batch_complete",
+        "files": len(paths),
+        "elapsed": time.time() - start_time
+    })
 
 
-def handle_command(cmd_data):
-    """Handle a command from stdin."""
-    global audio_data
+async def _download_op(op, model_name):
+    import asyncio
     
+    op.started_at = time.time()
+    await asyncio.to_thread(download_model_cmd, model_name, op.cancelled)
+
+
+async def _transcribe_files_op(op, cmd_data):
+    import asyncio
+    
+    op.started_at = time.time()
+    await asyncio.to_thread(transcribe_files_cmd, cmd_data, op.cancelled)
+
+
+def handle_command(cmd_data, payload=b""):
+    """Handle a command from stdin (on the event loop; long work is spawned)."""
     cmd = cmd_data.get('cmd')
     
     if cmd == 'load_model':
         model = cmd_data.get('model', 'nemo-parakeet-tdt-0.6b-v3')
-        load_model(model)
+        load_model(model, cmd_data.get('warmup'))
+    
+    elif cmd == 'list_loaded':
+        list_loaded()
+    
+    elif cmd == 'evict':
+        model = cmd_data.get('model')
+        if model:
+            evict_model(model)
+        else:
+            send_error("Missing model")
     
     elif cmd == 'start_recording':
         device = cmd_data.get('device')
-        start_recording(device)
+        start_recording(device, cmd_data.get('incremental', False))
+    
+    elif cmd == 'arm':
+        arm_capture(cmd_data.get('device'))
+    
+    elif cmd == 'disarm':
+        disarm_capture()
+    
+    elif cmd == 'start_hands_free':
+        start_hands_free(cmd_data.get('device'), cmd_data.get('silence'), cmd_data.get('output', 'json'))
+    
+    elif cmd == 'stop_hands_free':
+        stop_hands_free(cmd_data.get('output', 'json'))
     
     elif cmd == 'stop_recording':
         audio = stop_recording()
@@ -363,7 +1121,7 @@ def handle_command(cmd_data):
         output_mode = cmd_data.get('output', 'json')
         audio = getattr(handle_command, '_last_audio', None)
         if audio is not None:
-            transcribe(audio, output_mode)
+            submit_transcription(audio, output_mode, device=capture.device_id)
             handle_command._last_audio = None
         else:
             send_error("No audio to transcribe")
@@ -373,7 +1131,34 @@ def handle_command(cmd_data):
         output_mode = cmd_data.get('output', 'json')
         audio = stop_recording()
         if audio is not None:
-            transcribe(audio, output_mode)
+            submit_transcription(audio, output_mode, device=capture.device_id)
+    
+    elif cmd == 'feed_audio':
+        feed_audio(cmd_data, payload)
+    
+    elif cmd == 'transcribe_buffer':
+        # Final flush: any payload is appended first, then the buffer is
+        # transcribed through the same path as a recording
+        name = cmd_data.get('buffer', 'default')
+        if payload and not feed_audio(cmd_data, payload):
+            return
+        audio = take_fed_audio(name)
+        if audio is None:
+            send_error(f"No audio in buffer {name}")
+            return
+        send_response({"status": "buffer_received", "buffer": name, "duration": len(audio) / SAMPLE_RATE})
+        # Gated against the floor of the device the client recorded from
+        # (the default input when not given), unless the client gated it itself
+        submit_transcription(
+            audio, cmd_data.get('output', 'json'), cmd_data.get('model'),
+            device=cmd_data.get('device'), gate=not cmd_data.get('gated', False)
+        )
+    
+    elif cmd == 'clear_buffer':
+        fed_buffers.pop((current_output.get(), cmd_data.get('buffer', 'default')), None)
+    
+    elif cmd == 'transcribe_files':
+        spawn("transcribe_files", _transcribe_files_op, cmd_data)
     
     elif cmd == 'list_devices':
         list_devices()
@@ -384,95 +1169,298 @@ def handle_command(cmd_data):
     
     elif cmd == 'download_model':
         model = cmd_data.get('model', 'nemo-parakeet-tdt-0.6b-v3')
-        download_model_cmd(model)
+        spawn("download_model", _download_op, model)
+    
+    elif cmd == 'cancel':
+        target = cmd_data.get('target')
+        cancelled = cancel_operations(target)
+        if target is not None and not cancelled:
+            send_error(f"No running operation with id {target}")
+        else:
+            send_response({"status": "cancel_requested", "cancelled": cancelled})
     
     elif cmd == 'ping':
-        send_response({"status": "pong", "model_loaded": current_model is not None})
+        send_response({
+            "status": "pong",
+            "model_loaded": current_model is not None,
+            "model_loading": bool(pending_loads),
+            "operations": [
+                {"operation": op.kind, "id": op.request_id, "running": op.started_at is not None}
+                for op in operations
+            ]
+        })
     
     elif cmd == 'quit':
         send_response({"status": "quitting"})
-        sys.exit(0)
+        shutdown_event.set()
     
     else:
         send_error(f"Unknown command: {cmd}")
 
 
-def main():
-    """Main loop - read commands from stdin."""
+async def open_stdin_reader():
+    """Return an asyncio StreamReader over the raw (binary) stdin."""
+    import asyncio
+    
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader(limit=2 ** 20)
+    try:
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin.buffer)
+    except (NotImplementedError, ValueError, OSError):
+        # Windows event loops and redirected regular files: pump stdin from a thread
+        def pump():
+            while True:
+                chunk = sys.stdin.buffer.read1(65536)
+                if not chunk:
+                    loop.call_soon_threadsafe(reader.feed_eof)
+                    break
+                loop.call_soon_threadsafe(reader.feed_data, chunk)
+        
+        threading.Thread(target=pump, daemon=True).start()
+    return reader
+
+
+async def read_payload(reader, cmd_data):
+    """Read the binary frame announced by a command's "bytes" field.
+    
+    Returns b"" when no frame follows and None when the frame was rejected
+    (it is still consumed so the stream stays in sync).
+    """
+    size = cmd_data.get('bytes') if isinstance(cmd_data, dict) else None
+    if size is None:
+        return b""
+    if not isinstance(size, int) or size < 0:
+        send_error(f"Invalid frame size: {size!r}")
+        return None
+    if size > MAX_FRAME_BYTES:
+        while size:
+            size -= len(await reader.readexactly(min(size, 1024 * 1024)))
+        send_error(f"Frame too large (max {MAX_FRAME_BYTES} bytes); send audio in several feed_audio frames")
+        return None
+    return await reader.readexactly(size)
+
+
+async def serve_commands(reader):
+    """Command loop for one client - handle commands without blocking running tasks."""
+    import asyncio
+    
+    while not shutdown_event.is_set():
+        line = await reader.readline()
+        if not line:
+            break
+        
+        line = line.strip()
+        if not line:
+            continue
+        
+        try:
+            cmd_data = json.loads(line)
+        except json.JSONDecodeError as e:
+            send_error(f"Invalid JSON: {e}")
+            continue
+        
+        token = current_request.set(cmd_data.get('id') if isinstance(cmd_data, dict) else None)
+        try:
+            payload = await read_payload(reader, cmd_data)
+            if payload is not None:
+                handle_command(cmd_data, payload)
+        except asyncio.IncompleteReadError:
+            send_error("Input closed in the middle of a binary frame")
+            break
+        except Exception as e:
+            send_error(f"Error: {e}")
+        finally:
+            current_request.reset(token)
+    
+    # On EOF, let the client's queued work finish (e.g. commands piped from a file)
+    sink = current_output.get()
+    pending = [op.task for op in operations if op.sink is sink]
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+
+
+async def handle_client(reader, writer):
+    """Serve one socket client; its events go back over its own connection."""
+    import asyncio
+    
+    sink = SocketSink(writer)
+    current_output.set(sink)
+    try:
+        await serve_commands(reader)
+    except ConnectionError:
+        cancel_operations()
+    except asyncio.CancelledError:
+        # Daemon shutting down
+        cancel_operations()
+        raise
+    finally:
+        drop_fed_buffers(sink)
+        writer.close()
+
+
+async def start_socket_server(path):
+    """Listen on a Unix domain socket (refusing to steal it from a live daemon)."""
+    import asyncio
+    from daemon_client import connect
+    
+    path = str(path)
+    if os.path.exists(path):
+        client = connect(path, timeout=1)
+        if client is not None:
+            client.close()
+            raise RuntimeError(f"Another daemon is already serving {path}")
+        os.unlink(path)  # stale socket from a crashed daemon
+    
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    server = await asyncio.start_unix_server(handle_client, path, limit=2 ** 20)
+    os.chmod(path, 0o600)
+    send_response({"status": "listening", "socket": path})
+    return server
+
+
+async def serve(socket_path=None, use_stdin=True):
+    """Serve stdin and/or the socket until quit (or stdin EOF when serving stdin)."""
+    global transcription_lock, shutdown_event, event_loop
+    import asyncio
+    
+    event_loop = asyncio.get_running_loop()
+    transcription_lock = asyncio.Lock()
+    shutdown_event = asyncio.Event()
+    
+    server = None
+    if socket_path:
+        server = await start_socket_server(socket_path)
+    
+    config = Config.load()
+    if config.armed_capture:
+        arm_capture(config.device_id)
+    if config.routing:
+        warm_route_models()
+    
+    waiters = [asyncio.create_task(shutdown_event.wait())]
+    if use_stdin:
+        waiters.append(asyncio.create_task(serve_commands(await open_stdin_reader())))
+    await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+    
+    if server is not None:
+        server.close()
+        try:
+            os.unlink(socket_path)
+        except OSError:
+            pass
+    if shutdown_event.is_set():
+        cancel_operations(everywhere=True)
+    pending = [op.task for op in operations]
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+    if hands_free is not None:
+        hands_free.stop()
+    if capture is not None:
+        capture.close()
+
+
+def main(socket_path=None, use_stdin=True):
+    """Main entry point - run the command loop."""
+    import asyncio
+    
     send_response({"status": "ready", "pid": os.getpid()})
     
     # Handle signals
     def signal_handler(sig, frame):
-        global recording
-        recording = False
+        if capture is not None:
+            capture.recording = False
         send_response({"status": "interrupted"})
+        if not use_stdin and event_loop is not None:
+            # Socket-only daemons have no stdin to close; a signal stops them
+            event_loop.call_soon_threadsafe(shutdown_event.set)
     
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
     
-    # Main command loop
-    while True:
-        try:
-            line = sys.stdin.readline()
-            if not line:
-                break
-            
-            line = line.strip()
-            if not line:
-                continue
-            
-            try:
-                cmd_data = json.loads(line)
-                handle_command(cmd_data)
-            except json.JSONDecodeError as e:
-                send_error(f"Invalid JSON: {e}")
-        
-        except EOFError:
-            break
-        except Exception as e:
-            send_error(f"Error: {e}")
+    try:
+        asyncio.run(serve(socket_path, use_stdin))
+    except RuntimeError as e:
+        send_error(str(e))
     
     send_response({"status": "exiting"})
 
 
+def run_on_daemon(cmd, done, timeout=None):
+    """Run a one-shot command on a running socket daemon.
+    
+    Returns the command's events, or None when no daemon is listening.
+    """
+    from daemon_client import connect
+    
+    client = connect(timeout=timeout)
+    if client is None:
+        return None
+    try:
+        with client:
+            return client.request(cmd, done)
+    except (OSError, ValueError):
+        return None
+
+
 if __name__ == '__main__':
     import argparse
+    import multiprocessing
+    
+    # Batch transcription spawns worker processes (also from a frozen sidecar)
+    multiprocessing.freeze_support()
     
     parser = argparse.ArgumentParser(description='SuperWhisper Backend Daemon')
     parser.add_argument('--list-devices', action='store_true', help='List audio devices and exit')
     parser.add_argument('--check-model', type=str, help='Check if model is downloaded and exit')
     parser.add_argument('--download-model', type=str, help='Download model and exit')
+    parser.add_argument('--socket', nargs='?', const=str(DAEMON_SOCKET), default=None,
+                        help=f'Also serve clients on a Unix socket (default: {DAEMON_SOCKET})')
+    parser.add_argument('--no-stdin', action='store_true', help='Serve only the socket (run until quit or SIGTERM)')
     
     args = parser.parse_args()
     
+    # One-shot modes ask a running daemon first and only do the work here when there is none
     if args.list_devices:
+        events = run_on_daemon({"cmd": "list_devices"}, lambda e: "devices" in e, timeout=10)
+        if events:
+            print(json.dumps(events[-1]))
+            sys.exit(0)
+        
         # One-shot mode: list devices and exit
-        try:
-            devices = sd.query_devices()
-            default_input = sd.default.device[0]
-            result = []
-            for i, dev in enumerate(devices):
-                if dev['max_input_channels'] > 0:
-                    result.append({
-                        'id': i,
-                        'name': dev['name'],
-                        'is_default': i == default_input
-                    })
-            print(json.dumps({"devices": result}))
-        except Exception as e:
-            print(json.dumps({"error": str(e)}))
+        list_devices()
         sys.exit(0)
     
     elif args.check_model:
+        events = run_on_daemon(
+            {"cmd": "check_model", "model": args.check_model},
+            lambda e: "downloaded" in e,
+            timeout=10
+        )
+        if events:
+            print(json.dumps(events[-1]))
+            sys.exit(0)
+        
         # One-shot mode: check model status
         check_model_status(args.check_model)
         sys.exit(0)
     
     elif args.download_model:
+        events = run_on_daemon(
+            {"cmd": "download_model", "model": args.download_model},
+            lambda e: e.get("status") == "download_complete"
+        )
+        if events:
+            for event in events:
+                print(json.dumps(event), flush=True)
+            sys.exit(0)
+        
         # One-shot mode: download model
         download_model_cmd(args.download_model)
         sys.exit(0)
     
+    elif args.no_stdin and not args.socket:
+        parser.error("--no-stdin requires --socket")
+    
     else:
         # Normal daemon mode
-        main()
+        main(args.socket, use_stdin=not args.no_stdin)
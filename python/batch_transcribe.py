@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Batch transcription of WAV files for SuperWhisper.
+Fans files out across a process pool (one model load per worker) and
+streams results to JSONL in completion order.
+
+Usage:
+    python batch_transcribe.py recordings/ --output results.jsonl --workers 4
+    python batch_transcribe.py "recordings/**/*.wav" --model whisper-base --vad
+"""
+
+import sys
+import json
+import os
+import glob
+import hashlib
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+SAMPLE_RATE = 16000
+DEFAULT_MODEL = "nemo-parakeet-tdt-0.6b-v3"
+CACHE_DIR = Path.home() / ".super-whisper" / "cache" / "transcripts"
+
+# Per-worker state (set by _init_worker in each pool process)
+_worker_transcriber = None
+
+
+def find_audio_files(pattern):
+    """Expand a directory, glob pattern or single file into a sorted list of WAV paths."""
+    if os.path.isdir(pattern):
+        pattern = os.path.join(pattern, "**", "*.wav")
+    if os.path.isfile(pattern):
+        return [os.path.abspath(pattern)]
+    return sorted(
+        os.path.abspath(p) for p in glob.glob(pattern, recursive=True)
+        if os.path.isfile(p)
+    )
+
+
+def hash_file(path, chunk_size=1024 * 1024):
+    """SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_key(audio_hash, model_name, use_vad):
+    """Result cache key for (audio hash, model, VAD settings)."""
+    settings = json.dumps({"model": model_name, "vad": bool(use_vad)}, sort_keys=True)
+    return hashlib.sha256(f"{audio_hash}:{settings}".encode()).hexdigest()
+
+
+def cache_get(key, cache_dir=CACHE_DIR):
+    """Return a cached result, or None."""
+    try:
+        with open(os.path.join(cache_dir, f"{key}.json"), "r") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def cache_put(key, result, cache_dir=CACHE_DIR):
+    """Store a result atomically (a crash never leaves a truncated entry)."""
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, f"{key}.json")
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(result, f)
+    os.replace(tmp_path, path)
+
+
+def _init_worker(model_name, use_vad, providers):
+    """Pool initializer: load the model once per worker process."""
+    global _worker_transcriber
+    from transcriber import Transcriber
+    
+    _worker_transcriber = Transcriber(model_name=model_name, use_vad=use_vad, providers=providers)
+    _worker_transcriber.load()
+
+
+def _transcribe_file(path):
+    """Transcribe one file in a worker process."""
+    from transcriber import read_wav
+    
+    start_time = time.time()
+    audio = read_wav(path)
+    text = _worker_transcriber.transcribe(audio)
+    return {
+        "path": path,
+        "text": text or "",
+        "duration": len(audio) / SAMPLE_RATE,
+        "transcription_time": time.time() - start_time,
+        "worker": os.getpid(),
+    }
+
+
+def transcribe_files(
+    paths,
+    model_name=DEFAULT_MODEL,
+    use_vad=False,
+    workers=None,
+    providers=None,
+    use_cache=True,
+    cache_dir=CACHE_DIR
+):
+    """Transcribe files in parallel, yielding result dicts in completion order.
+    
+    Files with a cached result for the same (audio hash, model, VAD) are
+    yielded first with "cached": True and are not sent to the pool.
+    """
+    providers = providers or ["CPUExecutionProvider"]
+    workers = workers or max(1, (os.cpu_count() or 1) // 2)
+    
+    pending = {}
+    for path in paths:
+        if not use_cache:
+            pending[path] = None
+            continue
+        key = cache_key(hash_file(path), model_name, use_vad)
+        cached = cache_get(key, cache_dir)
+        if cached is not None:
+            yield {**cached, "path": path, "cached": True}
+        else:
+            pending[path] = key
+    
+    if not pending:
+        return
+    
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(pending)),
+        mp_context=ctx,
+        initializer=_init_worker,
+        initargs=(model_name, use_vad, providers)
+    ) as pool:
+        futures = {pool.submit(_transcribe_file, path): path for path in pending}
+        try:
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    yield {"path": path, "error": str(e)}
+                    continue
+                key = pending[path]
+                if key is not None:
+                    cache_put(key, {k: v for k, v in result.items() if k != "path"}, cache_dir)
+                yield {**result, "cached": False}
+        finally:
+            # The caller stopped early: drop the files that have not started
+            pool.shutdown(cancel_futures=True)
+
+
+def main():
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Batch transcribe WAV files')
+    parser.add_argument('input', type=str, help='Directory, glob pattern or WAV file')
+    parser.add_argument('--output', type=str, default=None, help='JSONL output file (default: stdout)')
+    parser.add_argument('--model', type=str, default=DEFAULT_MODEL, help='Model name')
+    parser.add_argument('--vad', action='store_true', help='Use VAD')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: half the cores)')
+    parser.add_argument('--no-cache', action='store_true', help='Ignore and do not update the result cache')
+    
+    args = parser.parse_args()
+    
+    paths = find_audio_files(args.input)
+    if not paths:
+        print(json.dumps({"error": f"No WAV files match {args.input}"}), file=sys.stderr)
+        sys.exit(1)
+    
+    out = open(args.output, "a") if args.output else sys.stdout
+    start_time = time.time()
+    count = 0
+    try:
+        for result in transcribe_files(
+            paths,
+            model_name=args.model,
+            use_vad=args.vad,
+            workers=args.workers,
+            use_cache=not args.no_cache
+        ):
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+            count += 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    
+    print(json.dumps({"status": "done", "files": count, "elapsed": time.time() - start_time}), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    multiprocessing.freeze_support()
+    main()
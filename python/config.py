@@ -4,11 +4,15 @@ import json
 import os
 from pathlib import Path
 from dataclasses import dataclass, asdict, field
-from typing import Optional, Literal
+from typing import Optional, Literal, Union
 
 # Default config location
 CONFIG_DIR = Path.home() / ".super-whisper"
 CONFIG_FILE = CONFIG_DIR / "config.json"
+DAEMON_SOCKET = CONFIG_DIR / "daemon.sock"  # backend_daemon.py --socket
+CAPTURE_SPILL_DIR = CONFIG_DIR / "capture"  # Long recordings spilled from RAM
+NOISE_FLOOR_FILE = CONFIG_DIR / "noise-floors.json"  # Speech gate calibration, per input device
+MODEL_INDEX_FILE = CONFIG_DIR / "model-index.json"  # Downloaded models: size, file hashes, last use
 
 @dataclass
 class Config:
@@ -16,10 +20,37 @@ class Config:
     # Audio settings
     device_id: Optional[int] = None
     sample_rate: int = 16000
+    capture_rate: int = 0  # Rate the input device is opened at, resampled to sample_rate (0 = device default)
+    blocksize: int = 0  # Frames per audio callback (0 = PortAudio's choice)
+    latency: Union[str, float, None] = None  # Input latency: "low", "high" or seconds (None = PortAudio default)
+    armed_capture: bool = False  # Keep the input stream open between recordings (no open delay, pre-roll)
+    pre_roll_s: float = 0.3  # Audio from before the key press that an armed recording starts with
+    meter_rate_hz: float = 10.0  # Audio level readings per second while recording
+    meter_bins: int = 24  # Min/max envelope columns per reading (overlay bars)
+    capture_ram_mb: float = 32.0  # Recording held in RAM up to this size, then spilled to disk (0 = never)
+    max_recording_s: float = 3600.0  # Recording stops by itself after this long (0 = no limit)
     
     # Model settings
     model: str = "nemo-parakeet-tdt-0.6b-v3"
     use_vad: bool = False
+    hands_free_silence_s: float = 0.8  # Trailing silence that ends an utterance in hands-free mode
+    gate_margin_db: float = 10.0  # Speech must be this far above the input device's noise floor
+    trim_padding_s: float = 0.25  # Silence kept around the speech when trimming before inference
+    model_cache_mb: int = 3072  # Memory budget for models kept loaded by the daemon
+    warmup: bool = True  # Run the model on synthetic audio right after loading
+    transcription_workers: int = 1  # Recordings transcribed concurrently while the next one is captured
+    # VAD segments recognized at once, each on its own model replica with a share of the cores
+    # (1 = off, 0 = one per 2 cores, up to 4). Every replica is a full copy of the model in
+    # memory: 4 replicas of Parakeet take about 4x its RAM, outside the model_cache_mb budget.
+    segment_workers: int = 1
+    stale_transcription_s: float = 10.0  # A new recording abandons transcriptions submitted longer ago (0 = never)
+    routing: bool = False  # Daemon: pick a model per utterance by length and load (reported as "route")
+    route_short_model: str = "whisper-base"  # Utterances up to route_short_max_s go here
+    route_short_max_s: float = 3.0
+    route_fallback_model: str = "whisper-base"  # Used instead when the machine is under pressure
+    route_max_queue: int = 2  # Transcriptions waiting that count as a backlog
+    route_max_cpu_load: float = 1.0  # 1-minute load average per core that counts as CPU pressure
+    route_latency_budget_s: float = 2.0  # Predicted transcription time (speech x measured RTF) before falling back
     
     # Hotkey settings
     hotkey: str = "cmd_r"  # Default: Right Command
@@ -31,6 +62,15 @@ class Config:
     # Providers
     providers: list = field(default_factory=lambda: ["CPUExecutionProvider"])
     
+    # ONNX Runtime session tuning (0 threads = ONNX Runtime default)
+    intra_op_threads: int = 0
+    inter_op_threads: int = 0
+    graph_optimization: Literal["disable", "basic", "extended", "all"] = "all"
+    execution_mode: Literal["sequential", "parallel"] = "sequential"
+    enable_cpu_mem_arena: bool = True
+    enable_mem_pattern: bool = True
+    optimized_model_cache: bool = True  # Persist optimized graphs in ~/.super-whisper/ort-cache
+    
     def save(self, path: Optional[Path] = None):
         """Save configuration to JSON file."""
         config_path = path or CONFIG_FILE
@@ -69,16 +109,31 @@ AVAILABLE_MODELS = {
         "languages": ["en", "multilingual"],
         "size": "600M"
     },
+    "nemo-parakeet-tdt-0.6b-v3-int8": {
+        "name": "Parakeet TDT v3 INT8 (Fast, quantized)",
+        "languages": ["en", "multilingual"],
+        "size": "~650M"
+    },
     "whisper-base": {
         "name": "Whisper Base",
         "languages": ["multilingual"],
         "size": "74M"
     },
+    "whisper-base-int8": {
+        "name": "Whisper Base INT8 (quantized)",
+        "languages": ["multilingual"],
+        "size": "~80M"
+    },
     "onnx-community/whisper-large-v3-turbo": {
         "name": "Whisper Large v3 Turbo",
         "languages": ["multilingual"],
         "size": "1.5G"
     },
+    "onnx-community/whisper-large-v3-turbo-int8": {
+        "name": "Whisper Large v3 Turbo INT8 (quantized)",
+        "languages": ["multilingual"],
+        "size": "~800M"
+    },
     "alphacep/vosk-model-small-en-us": {
         "name": "Vosk Small EN (Lightweight)",
         "languages": ["en"],
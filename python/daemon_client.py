@@ -0,0 +1,122 @@
+"""Client for a SuperWhisper daemon serving a Unix domain socket.
+
+Only the standard library is imported here, so one-shot tools can ask a
+running daemon (with its models already loaded) before paying for NumPy,
+ONNX Runtime or a model load themselves.
+"""
+
+import itertools
+import json
+import socket
+from typing import Callable, Iterator, List, Optional
+
+from config import DAEMON_SOCKET
+
+DEFAULT_SOCKET = str(DAEMON_SOCKET)
+
+
+def _is_final(event: dict) -> bool:
+    return "error" in event or event.get("status") == "cancelled"
+
+
+class DaemonClient:
+    """One connection to the daemon; commands and events are JSON lines."""
+    
+    def __init__(
+        self,
+        path: str = DEFAULT_SOCKET,
+        timeout: Optional[float] = None,
+        connect_timeout: float = 1.0
+    ):
+        """
+        Args:
+            path: Daemon socket
+            timeout: Seconds to wait for each event (None = forever)
+            connect_timeout: Seconds to wait for the connection
+        """
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self.sock.settimeout(connect_timeout)
+            self.sock.connect(path)
+            self.sock.settimeout(timeout)
+        except OSError:
+            self.sock.close()
+            raise
+        self._events = self.sock.makefile("rb")
+        self._ids = itertools.count(1)
+    
+    def send(self, cmd: dict, payload: bytes = b"") -> int:
+        """Send a command (and its binary frame); returns the request id."""
+        request_id = next(self._ids)
+        cmd = {**cmd, "id": request_id}
+        if payload:
+            cmd["bytes"] = len(payload)
+        self.sock.sendall(json.dumps(cmd).encode() + b"\n" + payload)
+        return request_id
+    
+    def events(self, request_id: int) -> Iterator[dict]:
+        """Yield the events of one request (events of other requests are skipped)."""
+        for line in self._events:
+            event = json.loads(line)
+            if event.get("id") == request_id:
+                del event["id"]
+                yield event
+        raise ConnectionError("Daemon closed the connection")
+    
+    def request(self, cmd: dict, done: Callable[[dict], bool], payload: bytes = b"") -> List[dict]:
+        """Send a command and collect its events up to the first one matching done (or an error)."""
+        request_id = self.send(cmd, payload)
+        events = []
+        for event in self.events(request_id):
+            events.append(event)
+            if done(event) or _is_final(event):
+                break
+        return events
+    
+    def transcribe(
+        self,
+        audio,
+        sample_rate: int = 16000,
+        model: Optional[str] = None,
+        device=None,
+        gated: bool = False
+    ) -> dict:
+        """Transcribe an int16 or float32 waveform on the daemon; returns the final event.
+        
+        The daemon's speech gate judges the audio against `device`'s noise
+        floor; pass `gated` for audio the caller has already trimmed.
+        """
+        fmt, dtype = ("int16", "<i2") if audio.dtype.kind == "i" else ("float32", "<f4")
+        cmd = {
+            "cmd": "transcribe_buffer",
+            "format": fmt,
+            "sample_rate": sample_rate,
+            "output": "json",
+            "gated": gated,
+        }
+        if model:
+            cmd["model"] = model
+        if device is not None:
+            cmd["device"] = device
+        events = self.request(cmd, lambda e: "text" in e, payload=audio.astype(dtype, copy=False).tobytes())
+        return events[-1]
+    
+    def close(self):
+        self._events.close()
+        self.sock.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+
+
+def connect(path: Optional[str] = None, timeout: Optional[float] = None) -> Optional[DaemonClient]:
+    """Connect to a running daemon, or return None when there is none."""
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    try:
+        return DaemonClient(path or DEFAULT_SOCKET, timeout)
+    except OSError:
+        return None
@@ -0,0 +1,148 @@
+"""Pipelined transcription job queue for SuperWhisper."""
+
+import contextvars
+import itertools
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+class Job:
+    """One recorded utterance waiting for (or done with) transcription."""
+    
+    def __init__(self, job_id: int, audio: "np.ndarray"):
+        self.id = job_id
+        self.audio = audio
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.result: Any = None
+        self.error: Optional[Exception] = None
+        self.cancelled = False
+        # Callbacks run in the submitter's context (e.g. its request id)
+        self.context = contextvars.copy_context()
+    
+    @property
+    def wait_time(self) -> float:
+        return (self.started_at or time.time()) - self.submitted_at
+    
+    @property
+    def transcription_time(self) -> Optional[float]:
+        if self.started_at is None or self.finished_at is None:
+            return None
+        return self.finished_at - self.started_at
+
+
+class TranscriptionQueue:
+    """Transcribes recordings on worker threads while capture continues.
+    
+    Each submitted recording gets an increasing job ID. Jobs may finish out
+    of order when several workers run, but ``on_result`` is always called in
+    submission order (one call at a time), so outputs are pasted in the
+    order they were spoken. Cancelled jobs are still delivered, with
+    ``cancelled`` set and no result.
+    """
+    
+    def __init__(
+        self,
+        transcribe: Callable[["np.ndarray"], Any],
+        on_result: Callable[[Job], None],
+        on_start: Optional[Callable[[Job], None]] = None,
+        workers: int = 1
+    ):
+        self.transcribe = transcribe
+        self.on_result = on_result
+        self.on_start = on_start
+        
+        self._ids = itertools.count(1)
+        self._jobs: "queue.Queue[Optional[Job]]" = queue.Queue()
+        self._queued: Dict[int, Job] = {}
+        self._finished: Dict[int, Job] = {}
+        self._next_to_deliver = 1
+        self._submitted = 0
+        self._lock = threading.Lock()
+        self._deliver_lock = threading.Lock()
+        
+        self._workers: List[threading.Thread] = []
+        for i in range(max(1, workers)):
+            worker = threading.Thread(target=self._run, name=f"transcription-{i}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+    
+    def submit(self, audio: "np.ndarray") -> int:
+        """Queue a recording; returns its job ID."""
+        with self._lock:
+            job = Job(next(self._ids), audio)
+            self._submitted = job.id
+            self._queued[job.id] = job
+        self._jobs.put(job)
+        return job.id
+    
+    def cancel(self, job_id: int) -> bool:
+        """Cancel a job that has not been delivered yet.
+        
+        A queued job is skipped; a running one finishes in the background
+        and its result is dropped.
+        """
+        with self._lock:
+            job = self._queued.get(job_id)
+            if job is None:
+                return False
+            job.cancelled = True
+            return True
+    
+    def _run(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+            
+            if not job.cancelled:
+                job.context.run(self._process, job)
+            job.audio = None  # release the buffer as soon as possible
+            
+            with self._lock:
+                self._finished[job.id] = job
+            self._deliver()
+    
+    def _process(self, job: Job):
+        job.started_at = time.time()
+        if self.on_start:
+            self.on_start(job)
+        try:
+            job.result = self.transcribe(job.audio)
+        except Exception as e:
+            job.error = e
+        job.finished_at = time.time()
+        if job.cancelled:
+            job.result, job.error = None, None
+    
+    def _deliver(self):
+        """Hand finished jobs to on_result in submission order."""
+        with self._deliver_lock:
+            while True:
+                with self._lock:
+                    job = self._finished.pop(self._next_to_deliver, None)
+                    if job is None:
+                        return
+                    self._queued.pop(job.id, None)
+                    self._next_to_deliver += 1
+                job.context.run(self.on_result, job)
+    
+    @property
+    def pending(self) -> int:
+        """Jobs submitted but not yet delivered."""
+        with self._lock:
+            return self._submitted - (self._next_to_deliver - 1)
+    
+    def shutdown(self, wait: bool = True):
+        """Stop the workers after the queued jobs are done."""
+        for _ in self._workers:
+            self._jobs.put(None)
+        if wait:
+            for worker in self._workers:
+                worker.join()
@@ -3,18 +3,29 @@
 SuperWhisper Python Backend - JSON CLI Interface
 
 This script provides a JSON-based command interface for the Tauri frontend.
-Communication happens via stdin (commands) and stdout (events).
+Communication happens via stdin (commands) and stdout (events). A command may
+carry an "id", which is echoed on every event it produces.
 """
 
 import sys
 import json
+import contextvars
 import threading
-from typing import Optional
+from typing import Optional, TYPE_CHECKING
 
-from config import Config, get_available_models
-from audio import AudioRecorder, list_devices, get_audio_level, get_audio_duration
-from transcriber import Transcriber
-from typer import AutoTyper
+from config import Config, CAPTURE_SPILL_DIR, NOISE_FLOOR_FILE, get_available_models
+from jobs import Job, TranscriptionQueue
+
+# Audio, ASR and typing backends are imported on first use so that config
+# and model queries answer without loading NumPy, PortAudio or ONNX Runtime
+if TYPE_CHECKING:
+    from audio import AudioRecorder
+    from transcriber import Transcriber
+    from typer import AutoTyper
+
+# Id of the command being handled; threads started for it inherit it
+current_request = contextvars.ContextVar("current_request", default=None)
+_stdout_lock = threading.Lock()  # events come from several threads; one line at a time
 
 
 class SuperWhisperBackend:
@@ -22,19 +33,57 @@ class SuperWhisperBackend:
     
     def __init__(self):
         self.config = Config.load()
-        self.recorder = AudioRecorder(device_id=self.config.device_id)
-        self.transcriber: Optional[Transcriber] = None
-        self.typer = AutoTyper(
-            mode=self.config.output_mode,
-            typing_speed=self.config.typing_speed
-        )
+        self.transcriber: Optional["Transcriber"] = None
+        self._recorder: Optional["AudioRecorder"] = None
+        self._typer: Optional["AutoTyper"] = None
         self._running = True
-        self._transcription_thread: Optional[threading.Thread] = None
+        # Recording N+1 proceeds while N is transcribed; results arrive in order
+        self.jobs = TranscriptionQueue(
+            transcribe=self._do_transcription,
+            on_result=self._on_transcription_result,
+            on_start=lambda job: self.emit("transcription_started", job_id=job.id),
+            workers=self.config.transcription_workers
+        )
+    
+    @property
+    def recorder(self) -> "AudioRecorder":
+        """Audio recorder, created on first use."""
+        if self._recorder is None:
+            from audio import AudioRecorder
+            self._recorder = AudioRecorder(
+                device_id=self.config.device_id,
+                meter_rate_hz=self.config.meter_rate_hz,
+                meter_bins=self.config.meter_bins,
+                ram_limit_mb=self.config.capture_ram_mb,
+                spill_dir=str(CAPTURE_SPILL_DIR),
+                max_seconds=self.config.max_recording_s,
+                capture_rate=self.config.capture_rate or None,
+                pre_roll_s=self.config.pre_roll_s,
+                blocksize=self.config.blocksize,
+                latency=self.config.latency
+            )
+        return self._recorder
+    
+    @property
+    def typer(self) -> "AutoTyper":
+        """Auto-typer, created on first use."""
+        if self._typer is None:
+            from typer import AutoTyper
+            self._typer = AutoTyper(
+                mode=self.config.output_mode,
+                typing_speed=self.config.typing_speed
+            )
+        return self._typer
     
     def emit(self, event: str, **data):
         """Send an event to the frontend."""
         message = {"event": event, **data}
-        print(json.dumps(message), flush=True)
+        request_id = current_request.get()
+        if request_id is not None:
+            message.setdefault("id", request_id)
+        line = json.dumps(message)
+        with _stdout_lock:
+            print(line, flush=True)
     
     def handle_command(self, cmd: dict):
         """Handle a command from the frontend."""
@@ -61,6 +110,9 @@ class SuperWhisperBackend:
         elif command == "set_config":
             self._handle_set_config(cmd)
         
+        elif command == "cancel":
+            self._handle_cancel(cmd)
+        
         elif command == "quit":
             self._running = False
             self.emit("quit_ack")
@@ -69,27 +121,57 @@ class SuperWhisperBackend:
             self.emit("error", message=f"Unknown command: {command}")
     
     def _handle_init(self):
-        """Initialize the backend (load models)."""
-        try:
-            self.emit("status", message="Loading models...")
-            
-            self.transcriber = Transcriber(
-                model_name=self.config.model,
-                use_vad=self.config.use_vad,
-                providers=self.config.providers
-            )
-            
-            def on_progress(status):
-                self.emit("loading_progress", status=status)
-            
-            self.transcriber.load(on_progress=on_progress)
-            
+        """Initialize the backend (load models in the background)."""
+        from transcriber import SpeechGate, Transcriber
+        
+        self.emit("status", message="Loading models...")
+        
+        self.transcriber = Transcriber(
+            model_name=self.config.model,
+            use_vad=self.config.use_vad,
+            providers=self.config.providers,
+            warmup=self.config.warmup,
+            gate=SpeechGate(
+                margin_db=self.config.gate_margin_db,
+                padding_s=self.config.trim_padding_s,
+                path=NOISE_FLOOR_FILE
+            ),
+            segment_workers=self.config.segment_workers
+        )
+        
+        def load():
+            self.transcriber.load(on_progress=self._on_load_progress)
             self.emit("init_complete", 
                      model=self.config.model,
-                     vad_enabled=self.config.use_vad)
+                     vad_enabled=self.config.use_vad,
+                     warmup=self.transcriber.warmup_stats)
+        
+        self._run_load(load, "Init failed")
         
+        if self.config.armed_capture:
+            self._arm_recorder()
+    
+    def _arm_recorder(self):
+        """Open the input stream now and keep it open between recordings."""
+        try:
+            self.recorder.arm()
+            self.emit("capture_armed", device=self.recorder.device_id, pre_roll=self.recorder.pre_roll_s)
         except Exception as e:
-            self.emit("error", message=f"Init failed: {str(e)}")
+            self.emit("error", message=f"Failed to arm capture: {str(e)}")
+    
+    def _on_load_progress(self, status: str):
+        self.emit("loading_progress", status=status)
+    
+    def _run_load(self, load, error_prefix: str):
+        """Run a model load on a background thread so commands keep flowing."""
+        def run():
+            try:
+                load()
+            except Exception as e:
+                self.emit("error", message=f"{error_prefix}: {str(e)}")
+        
+        context = contextvars.copy_context()
+        threading.Thread(target=context.run, args=(run,), daemon=True).start()
     
     def _handle_start_recording(self):
         """Start audio recording."""
@@ -97,16 +179,22 @@ class SuperWhisperBackend:
             self.emit("error", message="Already recording")
             return
         
-        if self._transcription_thread and self._transcription_thread.is_alive():
-            self.emit("error", message="Still transcribing previous recording")
-            return
+        # Set up audio level callback (runs on the metering thread)
+        context = contextvars.copy_context()
         
-        # Set up audio level callback
-        def on_audio_level(level: float, waveform: list):
-            self.emit("audio_level", level=level, waveform=waveform)
+        def on_audio_level(reading: dict):
+            context.run(self.emit, "audio_level",
+                        level=reading["audio_level"],
+                        rms_db=reading["rms_db"],
+                        peak_db=reading["peak_db"],
+                        envelope=reading["envelope"])
         
         self.recorder.on_audio_level = on_audio_level
         
+        # Capture stops by itself at max_recording_s; stop_recording still collects it
+        self.recorder.on_limit = lambda: context.run(
+            self.emit, "recording_limit_reached", max_duration=self.config.max_recording_s)
+        
         try:
             self.recorder.start()
             self.emit("recording_started")
@@ -125,45 +213,65 @@ class SuperWhisperBackend:
             self.emit("error", message="No audio recorded")
             return
         
+        from audio import get_audio_level, get_audio_duration
+        
         duration = get_audio_duration(audio_data)
         level = get_audio_level(audio_data)
         
-        self.emit("recording_stopped", duration=duration, level=level)
+        # Queue for transcription; the recorder is free again immediately
+        job_id = self.jobs.submit(audio_data)
+        self.emit("recording_stopped", duration=duration, level=level,
+                  job_id=job_id, queued=self.jobs.pending)
+    
+    def _do_transcription(self, audio_data) -> Optional[str]:
+        """Transcribe one recording (runs on a queue worker)."""
+        if self.transcriber is None:
+            raise RuntimeError("Transcriber not initialized")
         
-        # Start transcription in background thread
-        self._transcription_thread = threading.Thread(
-            target=self._do_transcription,
-            args=(audio_data,),
-            daemon=True
-        )
-        self._transcription_thread.start()
+        # Recording may start while a model loads; wait for it here
+        if self.transcriber.is_loading:
+            self.emit("status", message="Waiting for model...")
+        if not self.transcriber.wait_until_loaded():
+            raise RuntimeError("Model not loaded")
+        
+        return self.transcriber.transcribe(audio_data, device=self.config.device_id)
     
-    def _do_transcription(self, audio_data):
-        """Run transcription in background."""
-        try:
-            self.emit("transcription_started")
-            
-            if self.transcriber is None:
-                self.emit("error", message="Transcriber not initialized")
-                return
-            
-            result = self.transcriber.transcribe(audio_data)
-            
-            if result:
-                self.emit("transcription_done", text=result)
-                
-                # Auto-type if configured
-                if self.config.output_mode != "none":
-                    success = self.typer.type_text(result)
-                    self.emit("text_typed", success=success, mode=self.config.output_mode)
-            else:
-                self.emit("transcription_done", text="", message="No speech detected")
+    def _on_transcription_result(self, job: Job):
+        """Deliver a finished job (called in recording order)."""
+        if job.cancelled:
+            self.emit("transcription_cancelled", job_id=job.id)
+            return
         
-        except Exception as e:
-            self.emit("error", message=f"Transcription failed: {str(e)}")
+        if job.error is not None:
+            self.emit("error", message=f"Transcription failed: {str(job.error)}", job_id=job.id)
+            return
+        
+        result = job.result
+        if result:
+            self.emit("transcription_done", text=result, job_id=job.id,
+                      transcription_time=job.transcription_time)
+            
+            # Auto-type if configured
+            if self.config.output_mode != "none":
+                success = self.typer.type_text(result)
+                self.emit("text_typed", success=success, mode=self.config.output_mode, job_id=job.id)
+        else:
+            self.emit("transcription_done", text="", message="No speech detected", job_id=job.id)
+    
+    def _handle_cancel(self, cmd: dict):
+        """Cancel a queued or running transcription job."""
+        job_id = cmd.get("job_id")
+        if job_id is None:
+            self.emit("error", message="Missing job_id")
+        elif not self.jobs.cancel(job_id):
+            self.emit("error", message=f"No pending job {job_id}")
+        else:
+            self.emit("cancel_requested", job_id=job_id)
     
     def _handle_get_devices(self):
         """Get list of available audio devices."""
+        from audio import list_devices
+        
         devices = list_devices()
         self.emit("devices", devices=devices)
     
@@ -191,16 +299,46 @@ class SuperWhisperBackend:
             self.config.save()
             
             # Apply changes to running components
-            if key == "device_id":
-                self.recorder.device_id = value
-            elif key == "output_mode":
-                self.typer.set_mode(value)
-            elif key == "typing_speed":
-                self.typer.set_typing_speed(value)
+            # (components not created yet pick the new value up from the config)
+            if key == "device_id" and self._recorder:
+                self._recorder.device_id = value
+                if self._recorder.armed and not self._recorder.is_recording:
+                    # Reopen the armed stream on the new device
+                    self._recorder.disarm()
+                    self._arm_recorder()
+            elif key == "armed_capture":
+                if value:
+                    self._arm_recorder()
+                elif self._recorder:
+                    self._recorder.disarm()
+            elif key in ("pre_roll_s", "blocksize", "latency") and self._recorder:
+                setattr(self._recorder, key, value)  # used when the stream next opens
+            elif key in ("meter_rate_hz", "meter_bins") and self._recorder:
+                setattr(self._recorder, key, value)
+            elif key == "capture_ram_mb" and self._recorder:
+                self._recorder.ram_limit_mb = value
+            elif key == "max_recording_s" and self._recorder:
+                self._recorder.max_seconds = value
+            elif key == "capture_rate" and self._recorder:
+                self._recorder.capture_rate = value or None
+            elif key == "output_mode" and self._typer:
+                self._typer.set_mode(value)
+            elif key == "typing_speed" and self._typer:
+                self._typer.set_typing_speed(value)
             elif key == "model" and self.transcriber:
-                self.transcriber.change_model(value)
+                # Loaded next to the current model, then swapped in
+                def change_model():
+                    self.transcriber.change_model(value, on_progress=self._on_load_progress)
+                    self.emit("model_changed", model=value)
+                self._run_load(change_model, "Failed to change model")
             elif key == "use_vad" and self.transcriber:
-                self.transcriber.set_vad(value)
+                def set_vad():
+                    self.transcriber.set_vad(value, on_progress=self._on_load_progress)
+                self._run_load(set_vad, "Failed to toggle VAD")
+            elif key == "segment_workers" and self.transcriber:
+                def set_segment_workers():
+                    self.transcriber.set_segment_workers(value, on_progress=self._on_load_progress)
+                self._run_load(set_segment_workers, "Failed to change segment workers")
             
             self.emit("config_updated", key=key, value=value)
         
@@ -222,7 +360,11 @@ class SuperWhisperBackend:
                     continue
                 
                 cmd = json.loads(line)
-                self.handle_command(cmd)
+                token = current_request.set(cmd.get("id"))
+                try:
+                    self.handle_command(cmd)
+                finally:
+                    current_request.reset(token)
             
             except json.JSONDecodeError as e:
                 self.emit("error", message=f"Invalid JSON: {str(e)}")
@@ -231,6 +373,10 @@ class SuperWhisperBackend:
             except Exception as e:
                 self.emit("error", message=f"Unexpected error: {str(e)}")
         
+        if self._recorder:
+            self._recorder.close()
+        # Let queued recordings finish so nothing dictated is lost
+        self.jobs.shutdown()
         self.emit("shutdown")
 
 
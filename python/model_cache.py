@@ -0,0 +1,167 @@
+"""LRU cache of loaded ASR models for SuperWhisper."""
+
+import gc
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Accurate RSS on every platform when available
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+MB = 1024 * 1024
+
+
+def process_rss() -> int:
+    """Current resident set size of this process, in bytes."""
+    if PSUTIL_AVAILABLE:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    # Last resort: peak RSS (KB on Linux, bytes on macOS)
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class CachedModel:
+    """A loaded model plus its bookkeeping."""
+    
+    def __init__(self, name: str, model: Any, rss: int, load_time: float):
+        self.name = name
+        self.model = model
+        self.rss = rss
+        self.load_time = load_time
+        self.loaded_at = time.time()
+        self.last_used = self.loaded_at
+    
+    def to_dict(self) -> dict:
+        return {
+            "model": self.name,
+            "rss_mb": round(self.rss / MB, 1),
+            "load_time": self.load_time,
+            "loaded_at": self.loaded_at,
+            "last_used": self.last_used,
+        }
+
+
+class ModelCache:
+    """Keeps several loaded models, evicting least recently used ones over a memory budget.
+    
+    Each model is charged the growth in process RSS measured across its load,
+    so loads run one at a time; a caller asking for a model that is already
+    loading waits for that load instead of starting another. The most
+    recently requested model is never evicted, even when it alone exceeds
+    the budget.
+    """
+    
+    def __init__(self, loader: Callable[[str], Any], budget_mb: int = 3072):
+        self.loader = loader
+        self.budget = budget_mb * MB
+        self._entries: "OrderedDict[str, CachedModel]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._load_lock = threading.Lock()  # one load at a time, so RSS growth is its own
+        self._loading: Dict[str, Future] = {}  # loads in progress, by model name
+    
+    def get(self, name: str) -> Tuple[Any, bool]:
+        """Return (model, was_cached), loading and evicting as needed.
+        
+        was_cached is False only for the call that actually loaded the model.
+        """
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None:
+                self._entries.move_to_end(name)
+                entry.last_used = time.time()
+                return entry.model, True
+            loading = self._loading.get(name)
+            if loading is None:
+                self._loading[name] = future = Future()
+        
+        if loading is not None:
+            # Raises the loader's error if that load failed
+            return loading.result(), True
+        
+        # Load outside the lock so listing/eviction stay responsive meanwhile
+        try:
+            with self._load_lock:
+                rss_before = process_rss()
+                start_time = time.time()
+                model = self.loader(name)
+                load_time = time.time() - start_time
+                rss = max(0, process_rss() - rss_before)
+        except BaseException as e:
+            with self._lock:
+                del self._loading[name]
+            future.set_exception(e)
+            raise
+        
+        with self._lock:
+            self._entries[name] = CachedModel(name, model, rss, load_time)
+            self._entries.move_to_end(name)
+            self._enforce_budget()
+            del self._loading[name]
+        future.set_result(model)
+        return model, False
+    
+    def peek(self, name: str) -> Optional[Any]:
+        """Return a cached model without loading or touching LRU order."""
+        with self._lock:
+            entry = self._entries.get(name)
+            return entry.model if entry is not None else None
+    
+    def evict(self, name: str) -> bool:
+        """Drop a model from the cache. Returns False if it was not loaded."""
+        with self._lock:
+            entry = self._entries.pop(name, None)
+        if entry is None:
+            return False
+        del entry
+        gc.collect()
+        return True
+    
+    def _enforce_budget(self) -> List[str]:
+        """Evict LRU models until the total fits the budget (keeping the newest)."""
+        evicted = []
+        while len(self._entries) > 1 and self.total_rss > self.budget:
+            name, _ = self._entries.popitem(last=False)
+            evicted.append(name)
+        if evicted:
+            gc.collect()
+        return evicted
+    
+    def set_budget(self, budget_mb: int) -> List[str]:
+        """Change the memory budget, evicting immediately if needed."""
+        with self._lock:
+            self.budget = budget_mb * MB
+            return self._enforce_budget()
+    
+    def list_loaded(self) -> List[Dict[str, Any]]:
+        """Loaded models, least recently used first."""
+        with self._lock:
+            return [entry.to_dict() for entry in self._entries.values()]
+    
+    @property
+    def total_rss(self) -> int:
+        return sum(entry.rss for entry in self._entries.values())
+    
+    def headroom(self) -> int:
+        """Bytes left in the budget before loading another model evicts one."""
+        with self._lock:
+            return self.budget - self.total_rss
+    
+    def __contains__(self, name: str) -> bool:
+        return name in self._entries
+    
+    def __len__(self) -> int:
+        return len(self._entries)
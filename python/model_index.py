@@ -0,0 +1,145 @@
+"""Persisted inventory of downloaded models for SuperWhisper."""
+
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+from config import MODEL_INDEX_FILE
+
+INDEX_VERSION = 1
+
+# Files that make a snapshot a usable model
+MODEL_FILE_SUFFIXES = (".onnx", ".bin")
+MODEL_CONFIG_FILE = "config.json"
+
+_model_index = None
+
+
+def _mtime(path: str) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def scan_snapshot(repo_dir: str, snapshot: str) -> dict:
+    """Index one snapshot: total size, per-file size and hash, and the mtimes to watch.
+    
+    Files in the HF cache are links to blobs named by their hash (SHA-256
+    for LFS files, the git object id otherwise), so hashes come for free;
+    files copied into the snapshot get no hash. A download adds blobs,
+    links files into the snapshot's directories and moves refs/main, so
+    the entry stays valid as long as none of those mtimes change.
+    """
+    files = {}
+    watched = [
+        os.path.join(repo_dir, "blobs"),
+        os.path.join(repo_dir, "snapshots"),
+        os.path.join(repo_dir, "refs", "main"),
+    ]
+    for root, dirs, names in os.walk(snapshot, followlinks=True):
+        watched.append(root)
+        for name in names:
+            path = os.path.join(root, name)
+            real_path = os.path.realpath(path)
+            try:
+                size = os.path.getsize(real_path)
+            except OSError:
+                continue  # dangling link to a blob that was removed
+            blob = os.path.basename(real_path) if real_path != os.path.abspath(path) else None
+            files[os.path.relpath(path, snapshot)] = {"size": size, "hash": blob}
+    
+    return {
+        "path": snapshot,
+        "size_bytes": sum(f["size"] for f in files.values()),
+        "files": files,
+        "has_model": any(
+            rel.endswith(MODEL_FILE_SUFFIXES) or os.path.basename(rel) == MODEL_CONFIG_FILE
+            for rel in files
+        ),
+        "mtimes": {path: _mtime(path) for path in watched},
+        "indexed_at": time.time(),
+    }
+
+
+class ModelIndex:
+    """Snapshot inventory kept in a JSON file and shared by every process.
+    
+    A model's entry is re-scanned only when it points at another snapshot
+    or one of its watched directory mtimes has changed, so a status check
+    costs a few stats per model instead of a walk over every file. Writes
+    merge into the file on disk, so a daemon and a CLI run do not
+    overwrite each other's entries.
+    """
+    
+    def __init__(self, path=MODEL_INDEX_FILE):
+        self.path = str(path)
+        self._lock = threading.Lock()
+        self._entries: Dict[str, dict] = self._read()
+    
+    def _read(self) -> Dict[str, dict]:
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            if data.get("version") == INDEX_VERSION:
+                return data.get("models", {})
+        except (OSError, ValueError, AttributeError):
+            pass
+        return {}
+    
+    def _save(self, *names: str):
+        """Merge the given entries into the file on disk (atomically)."""
+        entries = self._read()
+        for name in names:
+            entries[name] = self._entries[name]
+        self._entries = entries
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(tmp_path, "w") as f:
+                json.dump({"version": INDEX_VERSION, "models": entries}, f)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass  # the index is only a cache
+    
+    @staticmethod
+    def _is_fresh(entry: dict, snapshot: str) -> bool:
+        mtimes = entry.get("mtimes")
+        return (
+            entry.get("path") == snapshot
+            and bool(mtimes)
+            and all(_mtime(path) == mtime for path, mtime in mtimes.items())
+        )
+    
+    def entry(self, name: str, repo_dir: str, snapshot: str, refresh: bool = False) -> dict:
+        """Return the model's entry, re-scanning its snapshot if it changed."""
+        with self._lock:
+            entry = self._entries.get(name, {})
+            if refresh or not self._is_fresh(entry, snapshot):
+                entry = {**scan_snapshot(repo_dir, snapshot), "last_used": entry.get("last_used")}
+                self._entries[name] = entry
+                self._save(name)
+            return entry
+    
+    def mark_used(self, name: str):
+        """Record that a model was just loaded."""
+        with self._lock:
+            # Another process may have re-scanned the model since we read it
+            entry = self._read().get(name) or self._entries.get(name, {})
+            self._entries[name] = {**entry, "last_used": time.time()}
+            self._save(name)
+    
+    def last_used(self, name: str) -> Optional[float]:
+        with self._lock:
+            return self._entries.get(name, {}).get("last_used")
+
+
+def get_model_index() -> ModelIndex:
+    """Return the process-wide model index, reading it on first use."""
+    global _model_index
+    
+    if _model_index is None:
+        _model_index = ModelIndex()
+    return _model_index
@@ -1,17 +1,60 @@
 #!/usr/bin/env python3
-"""Model manager for SuperWhisper - check and download models."""
+"""Model manager for SuperWhisper - check, download and quantize models."""
 
 import json
 import sys
 import os
+import shutil
+import threading
+import time
+from collections import deque
 
 # Model name to HuggingFace repo mapping
+# (quantized variants live next to their base model's cache snapshot)
 MODEL_REPOS = {
     "nemo-parakeet-tdt-0.6b-v3": "istupakov/parakeet-tdt-0.6b-v3-onnx",
+    "nemo-parakeet-tdt-0.6b-v3-int8": "istupakov/parakeet-tdt-0.6b-v3-onnx",
     "whisper-base": "istupakov/whisper-base-onnx",
+    "whisper-base-int8": "istupakov/whisper-base-onnx",
     "onnx-community/whisper-large-v3-turbo": "onnx-community/whisper-large-v3-turbo",
+    "onnx-community/whisper-large-v3-turbo-int8": "onnx-community/whisper-large-v3-turbo",
 }
 
+# Model name suffix -> onnx_asr quantization tag of locally produced variants
+VARIANT_SUFFIXES = {
+    "-int8": "int8",
+}
+VARIANT_INFO = "variant.json"  # written last; marks a variant as complete
+
+# Download engine (talks to the Hub's HTTP API; HF_ENDPOINT points it at a mirror)
+DEFAULT_ENDPOINT = "https://huggingface.co"
+DOWNLOAD_PATTERNS = ("*.onnx", "*.onnx.data", "*.onnx_data", "*.json", "*.txt", "*.model", "*.yaml")
+# Precision variants onnx_asr does not load for these model names (INT8 is quantized locally)
+SKIP_PATTERNS = (
+    "*.int8.onnx*", "*_fp16.onnx*", "*_q4.onnx*", "*_q4f16.onnx*", "*_bnb4.onnx*",
+    "*_int8.onnx*", "*_uint8.onnx*", "*_quantized.onnx*",
+)
+# Repos holding several exports of one model: only the graphs onnx_asr loads
+REPO_FILE_PATTERNS = {
+    "onnx-community/whisper-large-v3-turbo": (
+        "onnx/encoder_model.onnx*", "onnx/decoder_model_merged.onnx*", "*.json", "*.txt",
+    ),
+}
+PARALLEL_MIN_BYTES = 64 * 1024 * 1024  # larger files are fetched as concurrent ranged parts
+PART_BYTES = 16 * 1024 * 1024
+DOWNLOAD_WORKERS = 4
+READ_BYTES = 1024 * 1024
+MAX_RETRIES = 5  # per request, with exponential backoff; the bytes already written are kept
+HTTP_TIMEOUT = 30
+PROGRESS_INTERVAL = 0.25
+
+def split_variant(model_name):
+    """Split a model name into (base model name, quantization or None)."""
+    for suffix, quantization in VARIANT_SUFFIXES.items():
+        if model_name.endswith(suffix):
+            return model_name[:-len(suffix)], quantization
+    return model_name, None
+
 def get_hf_cache_path(model_name):
     """Get the HuggingFace cache path for a model."""
     repo = MODEL_REPOS.get(model_name, model_name)
@@ -20,6 +63,56 @@ def get_hf_cache_path(model_name):
     cache_dir = os.path.expanduser("~/.cache/huggingface/hub")
     return os.path.join(cache_dir, safe_name)
 
+def get_variant_path(model_name):
+    """Get the directory a quantized variant is (or would be) stored in, or None."""
+    base_name, quantization = split_variant(model_name)
+    if quantization is None:
+        return None
+    base_snapshot = get_snapshot_path(base_name)
+    if base_snapshot is None:
+        return None
+    # <hf cache>/models--org--name/variants/int8/<base revision>
+    return os.path.join(
+        get_hf_cache_path(base_name), "variants", quantization, os.path.basename(base_snapshot)
+    )
+
+def read_variant_info(model_name):
+    """Return the metadata of a completed variant, or None."""
+    variant_path = get_variant_path(model_name)
+    if variant_path is None:
+        return None
+    try:
+        with open(os.path.join(variant_path, VARIANT_INFO)) as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+def get_snapshot_path(model_name):
+    """Get the local snapshot directory of a downloaded model, or None."""
+    if split_variant(model_name)[1] is not None:
+        return get_variant_path(model_name) if read_variant_info(model_name) else None
+    
+    cache_path = get_hf_cache_path(model_name)
+    snapshots_dir = os.path.join(cache_path, "snapshots")
+    if not os.path.isdir(snapshots_dir):
+        return None
+    
+    # Prefer the revision the "main" ref points to
+    try:
+        with open(os.path.join(cache_path, "refs", "main")) as f:
+            snapshot_path = os.path.join(snapshots_dir, f.read().strip())
+        if os.path.isdir(snapshot_path):
+            return snapshot_path
+    except OSError:
+        pass
+    
+    # Fall back to the most recently written snapshot
+    snapshots = [os.path.join(snapshots_dir, d) for d in os.listdir(snapshots_dir)]
+    snapshots = [d for d in snapshots if os.path.isdir(d)]
+    if not snapshots:
+        return None
+    return max(snapshots, key=os.path.getmtime)
+
 def get_dir_size(path):
     """Get total size of a directory, following symlinks."""
     total_size = 0
@@ -33,55 +126,553 @@ def get_dir_size(path):
                 pass
     return total_size
 
+def format_size(total_size):
+    """Human-readable size as shown by --list."""
+    if total_size > 1024 * 1024 * 1024:
+        return f"{total_size / (1024 * 1024 * 1024):.1f}GB"
+    return f"{total_size / (1024 * 1024):.0f}MB"
+
 def check_model(model_name):
-    """Check if a model is downloaded."""
+    """Check if a model is downloaded (answered from the model index)."""
+    from model_index import get_model_index
+    
     try:
-        cache_path = get_hf_cache_path(model_name)
+        index = get_model_index()
+        if split_variant(model_name)[1] is not None:
+            info = read_variant_info(model_name)
+            if info is None:
+                return {"downloaded": False}
+            return {
+                "downloaded": True,
+                "path": get_variant_path(model_name),
+                "size": format_size(info["size_bytes"]),
+                "size_bytes": info["size_bytes"],
+                "speedup": info.get("speedup"),
+                "last_used": index.last_used(model_name)
+            }
         
-        # Check if the model directory exists and has content
-        if os.path.exists(cache_path):
-            # Check for snapshots directory (indicates downloaded model)
-            snapshots_dir = os.path.join(cache_path, "snapshots")
-            if os.path.exists(snapshots_dir):
-                # Check if there's at least one snapshot with files
-                for snapshot in os.listdir(snapshots_dir):
-                    snapshot_path = os.path.join(snapshots_dir, snapshot)
-                    if os.path.isdir(snapshot_path):
-                        # Check for model files (including in subdirectories)
-                        has_model = False
-                        for root, dirs, files in os.walk(snapshot_path):
-                            if any(f.endswith('.onnx') or f.endswith('.bin') or f == 'config.json' for f in files):
-                                has_model = True
-                                break
-                        
-                        if has_model:
-                            # Get total size (following symlinks)
-                            total_size = get_dir_size(snapshot_path)
-                            
-                            if total_size > 1024 * 1024 * 1024:
-                                size_str = f"{total_size / (1024 * 1024 * 1024):.1f}GB"
-                            else:
-                                size_str = f"{total_size / (1024 * 1024):.0f}MB"
-                            
-                            return {
-                                "downloaded": True, 
-                                "path": snapshot_path,
-                                "size": size_str
-                            }
+        snapshot_path = get_snapshot_path(model_name)
+        if snapshot_path is None:
+            return {"downloaded": False}
         
-        return {"downloaded": False}
+        # Re-scanned only when the snapshot changed since it was last indexed
+        entry = index.entry(model_name, get_hf_cache_path(model_name), snapshot_path)
+        if not entry["has_model"]:
+            return {"downloaded": False}
+        return {
+            "downloaded": True,
+            "path": snapshot_path,
+            "size": format_size(entry["size_bytes"]),
+            "size_bytes": entry["size_bytes"],
+            "last_used": entry.get("last_used")
+        }
     except Exception as e:
         return {"downloaded": False, "error": str(e)}
 
+def _benchmark(model_name, seconds=5.0, runs=3):
+    """Median recognition latency of a model on synthetic speech (after one warm-up run)."""
+    from ort_session import load_asr_model
+    from transcriber import recognize_audio, synthetic_speech
+    
+    model = load_asr_model(model_name)
+    audio = synthetic_speech(seconds)
+    recognize_audio(model, audio)
+    timings = []
+    for _ in range(runs):
+        start_time = time.time()
+        recognize_audio(model, audio)
+        timings.append(time.time() - start_time)
+    return sorted(timings)[len(timings) // 2]
+
+def quantize_model(model_name, benchmark=True, on_progress=None):
+    """Produce a dynamically quantized INT8 variant of a downloaded model.
+    
+    Weights of every .onnx graph are quantized to INT8 and saved as
+    <name>.int8.onnx (the onnx_asr naming for int8 files); other files are
+    linked from the base snapshot. Status events go to on_progress
+    (printed as JSON lines by default).
+    """
+    report = on_progress or (lambda event: print(json.dumps(event), flush=True))
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+    
+    variant_name = model_name if split_variant(model_name)[1] else f"{model_name}-int8"
+    base_name, quantization = split_variant(variant_name)
+    
+    base_snapshot = get_snapshot_path(base_name)
+    if base_snapshot is None:
+        raise FileNotFoundError(f"Model not downloaded: {base_name}")
+    
+    variant_path = get_variant_path(variant_name)
+    tmp_path = f"{variant_path}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    
+    report({"status": "quantizing", "model": base_name, "variant": variant_name})
+    try:
+        for root, dirs, files in os.walk(base_snapshot):
+            rel_root = os.path.relpath(root, base_snapshot)
+            os.makedirs(os.path.join(tmp_path, rel_root), exist_ok=True)
+            for f in files:
+                src = os.path.join(root, f)
+                if f.endswith((".onnx.data", ".onnx_data")):
+                    continue  # external weights, read through their .onnx
+                if f.endswith(".onnx"):
+                    dst = os.path.join(tmp_path, rel_root, f"{f[:-len('.onnx')]}.{quantization}.onnx")
+                    size = sum(
+                        os.path.getsize(p) for p in (src, f"{src}.data", f"{src}_data")
+                        if os.path.exists(p)
+                    )
+                    # Protobuf caps a single file at 2 GB
+                    large = size > 1536 * 1024 * 1024
+                    quantize_dynamic(src, dst, weight_type=QuantType.QInt8, use_external_data_format=large)
+                    report({"status": "quantized", "file": os.path.normpath(os.path.join(rel_root, f))})
+                else:
+                    dst = os.path.join(tmp_path, rel_root, f)
+                    try:
+                        os.symlink(os.path.realpath(src), dst)
+                    except OSError:
+                        shutil.copy2(src, dst)
+        
+        shutil.rmtree(variant_path, ignore_errors=True)
+        os.makedirs(os.path.dirname(variant_path), exist_ok=True)
+        os.rename(tmp_path, variant_path)
+    except Exception:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        raise
+    
+    info = {
+        "base": base_name,
+        "quantization": quantization,
+        "size_bytes": get_dir_size(variant_path),
+        "base_size_bytes": get_dir_size(base_snapshot),
+        "created": time.time(),
+        "speedup": None
+    }
+    # Without the info file the variant is incomplete, so write it even if benchmarking fails
+    with open(os.path.join(variant_path, VARIANT_INFO), "w") as f:
+        json.dump(info, f, indent=2)
+    
+    if benchmark:
+        try:
+            base_latency = _benchmark(base_name)
+            variant_latency = _benchmark(variant_name)
+            info.update({
+                "base_latency": base_latency,
+                "latency": variant_latency,
+                "speedup": round(base_latency / variant_latency, 2) if variant_latency else None
+            })
+            with open(os.path.join(variant_path, VARIANT_INFO), "w") as f:
+                json.dump(info, f, indent=2)
+        except Exception as e:
+            info["benchmark_error"] = str(e)
+    
+    return {"model": variant_name, "path": variant_path, **info}
+
+class DownloadCancelled(Exception):
+    """Raised inside the download engine once its cancel event is set."""
+
+
+class RangeNotSupported(Exception):
+    """The server answered a ranged request with the whole file."""
+
+
+class FileLock:
+    """Exclusive lock on a file, shared across processes.
+    
+    The OS drops the lock when its holder exits, so a crashed download
+    never blocks the next one.
+    """
+    
+    def __init__(self, path, on_wait=None):
+        self.path = path
+        self.on_wait = on_wait
+        self._file = None
+    
+    def _try_lock(self, blocking):
+        if os.name == "nt":
+            import msvcrt
+            while True:
+                try:
+                    msvcrt.locking(self._file.fileno(), msvcrt.LK_NBLCK, 1)
+                    return True
+                except OSError:
+                    if not blocking:
+                        return False
+                    time.sleep(0.5)
+        import fcntl
+        try:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            return True
+        except BlockingIOError:
+            return False
+    
+    def __enter__(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._file = open(self.path, "a+")
+        if not self._try_lock(blocking=False):
+            if self.on_wait:
+                self.on_wait()
+            self._try_lock(blocking=True)
+        return self
+    
+    def __exit__(self, *exc):
+        if os.name == "nt":
+            import msvcrt
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        self._file.close()
+
+
+class DownloadProgress:
+    """Byte counter shared by download workers; reports at most every PROGRESS_INTERVAL."""
+    
+    def __init__(self, model_name, total, on_progress=None, window=3.0):
+        self.model_name = model_name
+        self.total = total
+        self.done = 0
+        self.file = None
+        self.on_progress = on_progress
+        self.window = window
+        self._samples = deque()  # (time, bytes fetched in this run)
+        self._fetched = 0
+        self._last_report = 0.0
+        self._lock = threading.Lock()
+    
+    def resume(self, nbytes):
+        """Count bytes already on disk (not part of the transfer rate)."""
+        with self._lock:
+            self.done += nbytes
+    
+    def add(self, nbytes, file=None):
+        with self._lock:
+            self.done += nbytes
+            self._fetched += nbytes
+            if file:
+                self.file = file
+            now = time.time()
+            if now - self._last_report < PROGRESS_INTERVAL:
+                return
+            self._last_report = now
+            event = self._event(now)
+        if self.on_progress:
+            self.on_progress(event)
+    
+    def report(self):
+        """Report the current totals right away."""
+        with self._lock:
+            event = self._event(time.time())
+        if self.on_progress:
+            self.on_progress(event)
+    
+    def _event(self, now):
+        self._samples.append((now, self._fetched))
+        while len(self._samples) > 2 and now - self._samples[0][0] > self.window:
+            self._samples.popleft()
+        start_time, start_bytes = self._samples[0]
+        elapsed = now - start_time
+        return {
+            "status": "download_progress",
+            "model": self.model_name,
+            "file": self.file,
+            "downloaded": self.done,
+            "total": self.total,
+            "percent": round(100.0 * self.done / self.total, 1) if self.total else 100.0,
+            "bytes_per_second": round((self._fetched - start_bytes) / elapsed) if elapsed > 0 else 0
+        }
+
+
+def hub_endpoint():
+    """Base URL of the Hub (HF_ENDPOINT overrides it, e.g. for a mirror)."""
+    return os.environ.get("HF_ENDPOINT", DEFAULT_ENDPOINT).rstrip("/")
+
+
+def _hub_request(url, headers=None):
+    import urllib.request
+    
+    headers = dict(headers or {})
+    token = os.environ.get("HF_TOKEN")
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    return urllib.request.Request(url, headers=headers)
+
+
+def fetch_manifest(repo, revision="main", endpoint=None):
+    """Return (commit, files) for a repo; each file has name, size, blob and hash kind."""
+    import urllib.request
+    
+    url = f"{endpoint or hub_endpoint()}/api/models/{repo}/revision/{revision}?blobs=true"
+    with urllib.request.urlopen(_hub_request(url), timeout=HTTP_TIMEOUT) as response:
+        info = json.load(response)
+    
+    files = []
+    for sibling in info.get("siblings", []):
+        lfs = sibling.get("lfs")
+        if lfs:
+            files.append({"name": sibling["rfilename"], "size": lfs["size"], "blob": lfs["sha256"], "hash": "sha256"})
+        elif sibling.get("blobId"):
+            # Plain git files are named by their git blob id
+            files.append({"name": sibling["rfilename"], "size": sibling.get("size"), "blob": sibling["blobId"], "hash": "git"})
+    return info["sha"], files
+
+
+def select_files(repo, files):
+    """The files of a repo worth downloading for onnx_asr."""
+    import fnmatch
+    
+    patterns = REPO_FILE_PATTERNS.get(repo, DOWNLOAD_PATTERNS)
+    return [
+        f for f in files
+        if any(fnmatch.fnmatch(f["name"], p) for p in patterns)
+        and not any(fnmatch.fnmatch(f["name"], p) for p in SKIP_PATTERNS)
+    ]
+
+
+def file_digest(path, kind, size):
+    """SHA-256, or the git blob id, of a file."""
+    import hashlib
+    
+    digest = hashlib.sha256() if kind == "sha256" else hashlib.sha1(f"blob {size}\0".encode())
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(READ_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _with_retries(fetch, cancelled=None):
+    """Run fetch(), retrying network errors with backoff (fetch resumes where it stopped)."""
+    import urllib.error
+    
+    for attempt in range(MAX_RETRIES + 1):
+        if cancelled is not None and cancelled.is_set():
+            raise DownloadCancelled()
+        try:
+            return fetch()
+        except (urllib.error.URLError, ConnectionError, TimeoutError) as e:
+            if isinstance(e, urllib.error.HTTPError) and e.code < 500 and e.code != 429:
+                raise
+            if attempt == MAX_RETRIES:
+                raise
+            time.sleep(min(2 ** attempt, 30))
+
+
+def _copy_stream(response, f, progress, name, cancelled, limit=None):
+    """Copy a response body into f; returns the number of bytes written."""
+    written = 0
+    while limit is None or written < limit:
+        if cancelled is not None and cancelled.is_set():
+            raise DownloadCancelled()
+        chunk = response.read(READ_BYTES if limit is None else min(READ_BYTES, limit - written))
+        if not chunk:
+            break
+        f.write(chunk)
+        written += len(chunk)
+        progress.add(len(chunk), name)
+    return written
+
+
+def _fetch_sequential(url, partial, size, progress, name, cancelled):
+    """Download to partial, resuming from its current length."""
+    import urllib.request
+    
+    def fetch():
+        offset = os.path.getsize(partial) if os.path.exists(partial) else 0
+        if offset == size:
+            return
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+        with urllib.request.urlopen(_hub_request(url, headers), timeout=HTTP_TIMEOUT) as response:
+            if offset and response.status != 206:
+                # Range ignored: start over
+                progress.resume(-offset)
+                offset = 0
+            with open(partial, "r+b" if offset else "wb") as f:
+                f.seek(offset)
+                _copy_stream(response, f, progress, name, cancelled)
+        if os.path.getsize(partial) < size:
+            raise ConnectionError("connection closed before the end of the file")
+    
+    if os.path.exists(partial):
+        if os.path.getsize(partial) > size:
+            os.remove(partial)
+        else:
+            progress.resume(os.path.getsize(partial))
+    _with_retries(fetch, cancelled)
+
+
+def _fetch_parts(url, partial, size, progress, name, cancelled, workers):
+    """Download to partial as concurrent ranged parts, resuming finished parts.
+    
+    Finished part numbers are kept in <partial>.parts. A partial file
+    without that record (a sequential download) counts as a finished prefix.
+    """
+    import urllib.request
+    from concurrent.futures import ThreadPoolExecutor
+    
+    state_path = f"{partial}.parts"
+    parts = list(range(0, size, PART_BYTES))
+    done = set()
+    try:
+        with open(state_path) as f:
+            state = json.load(f)
+        if state.get("size") == size and state.get("part_bytes") == PART_BYTES:
+            done = set(state["done"])
+    except (OSError, ValueError):
+        if os.path.exists(partial):
+            prefix = os.path.getsize(partial)
+            done = {i for i, start in enumerate(parts) if min(start + PART_BYTES, size) <= prefix}
+    
+    state_lock = threading.Lock()
+    
+    def save_state():
+        tmp_path = f"{state_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"size": size, "part_bytes": PART_BYTES, "done": sorted(done)}, f)
+        os.replace(tmp_path, state_path)
+    
+    with open(partial, "r+b" if os.path.exists(partial) else "w+b") as f:
+        f.truncate(size)
+    save_state()
+    progress.resume(sum(min(PART_BYTES, size - parts[i]) for i in done))
+    
+    def fetch_part(i):
+        start = parts[i]
+        end = min(start + PART_BYTES, size)
+        written = [0]
+        
+        def fetch():
+            offset = start + written[0]
+            headers = {"Range": f"bytes={offset}-{end - 1}"}
+            with urllib.request.urlopen(_hub_request(url, headers), timeout=HTTP_TIMEOUT) as response:
+                if response.status != 206:
+                    raise RangeNotSupported()
+                with open(partial, "r+b") as f:
+                    f.seek(offset)
+                    written[0] += _copy_stream(response, f, progress, name, cancelled, end - offset)
+            if start + written[0] < end:
+                raise ConnectionError("connection closed before the end of the part")
+        
+        _with_retries(fetch, cancelled)
+        with state_lock:
+            done.add(i)
+            save_state()
+    
+    pending = [i for i in range(len(parts)) if i not in done]
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="download") as pool:
+        for _ in pool.map(fetch_part, pending):
+            pass
+    os.remove(state_path)
+
+
+def _download_file(url, blob_path, file, progress, cancelled, workers):
+    """Fetch one file into the blob store, verified against its hash.
+    
+    A file that fails verification (e.g. a corrupt resumed part) is
+    downloaded once more from scratch before giving up.
+    """
+    partial = f"{blob_path}.incomplete"
+    for attempt in range(2):
+        done_before = progress.done
+        if file["size"] >= PARALLEL_MIN_BYTES and workers > 1:
+            try:
+                _fetch_parts(url, partial, file["size"], progress, file["name"], cancelled, workers)
+            except RangeNotSupported:
+                _remove_partial(partial)
+                progress.resume(done_before - progress.done)
+                _fetch_sequential(url, partial, file["size"], progress, file["name"], cancelled)
+        else:
+            _fetch_sequential(url, partial, file["size"], progress, file["name"], cancelled)
+        
+        digest = file_digest(partial, file["hash"], file["size"])
+        if digest == file["blob"]:
+            os.replace(partial, blob_path)
+            return
+        _remove_partial(partial)
+        progress.resume(done_before - progress.done)
+    raise ValueError(f"Checksum mismatch for {file['name']}: expected {file['blob']}, got {digest}")
+
+
+def _remove_partial(partial):
+    for path in (partial, f"{partial}.parts"):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def _link_snapshot_file(blob_path, link_path):
+    os.makedirs(os.path.dirname(link_path), exist_ok=True)
+    if os.path.lexists(link_path):
+        os.remove(link_path)
+    try:
+        os.symlink(os.path.relpath(blob_path, os.path.dirname(link_path)), link_path)
+    except OSError:
+        shutil.copy2(blob_path, link_path)
+
+
+def fetch_model_files(model_name, on_progress=None, cancelled=None, endpoint=None, workers=DOWNLOAD_WORKERS):
+    """Download a model's files into the HuggingFace cache layout; returns the snapshot path.
+    
+    Blobs already present are skipped, interrupted files resume, every
+    file is verified against the repo manifest, and only one process
+    downloads a repo at a time (others wait, then find it complete).
+    onnx_asr and huggingface_hub pick the files up from the cache as if
+    they had downloaded them.
+    """
+    import urllib.parse
+    
+    repo = MODEL_REPOS.get(model_name, model_name)
+    endpoint = (endpoint or hub_endpoint()).rstrip("/")
+    cache_path = get_hf_cache_path(model_name)
+    
+    def on_wait():
+        if on_progress:
+            on_progress({"status": "waiting_for_download", "model": model_name})
+    
+    with FileLock(os.path.join(cache_path, ".download.lock"), on_wait):
+        commit, files = fetch_manifest(repo, endpoint=endpoint)
+        files = select_files(repo, files)
+        snapshot = os.path.join(cache_path, "snapshots", commit)
+        blobs_dir = os.path.join(cache_path, "blobs")
+        os.makedirs(blobs_dir, exist_ok=True)
+        
+        progress = DownloadProgress(model_name, sum(f["size"] or 0 for f in files), on_progress)
+        for file in files:
+            blob_path = os.path.join(blobs_dir, file["blob"])
+            if os.path.exists(blob_path) and os.path.getsize(blob_path) == file["size"]:
+                progress.resume(file["size"])
+            else:
+                quoted = urllib.parse.quote(file["name"])
+                url = f"{endpoint}/{repo}/resolve/{commit}/{quoted}"
+                _download_file(url, blob_path, file, progress, cancelled, workers)
+            _link_snapshot_file(blob_path, os.path.join(snapshot, file["name"]))
+        
+        os.makedirs(os.path.join(cache_path, "refs"), exist_ok=True)
+        with open(os.path.join(cache_path, "refs", "main"), "w") as f:
+            f.write(commit)
+        
+        progress.report()
+    return snapshot
+
+
 def download_model(model_name):
-    """Download a model."""
+    """Download a model (quantized variants are downloaded as their base, then quantized)."""
     try:
-        import onnx_asr
+        from ort_session import load_asr_model
         
         print(json.dumps({"status": "downloading", "model": model_name}), flush=True)
         
-        # This will download the model if not present
-        model = onnx_asr.load_model(model_name, providers=["CPUExecutionProvider"])
+        base_name, quantization = split_variant(model_name)
+        try:
+            fetch_model_files(base_name, on_progress=lambda event: print(json.dumps(event), flush=True))
+        except OSError:
+            # Offline with the model already cached is fine
+            if get_snapshot_path(base_name) is None:
+                raise
+        
+        if quantization is not None and read_variant_info(model_name) is None:
+            quantize_model(model_name)
+        
+        # Fetches anything the engine left out and builds the optimized graphs
+        model = load_asr_model(model_name)
         
         # Verify it's now downloaded
         status = check_model(model_name)
@@ -98,12 +689,16 @@ def list_models():
     models = []
     for name, repo in MODEL_REPOS.items():
         status = check_model(name)
-        models.append({
+        entry = {
             "name": name,
             "repo": repo,
             "downloaded": status.get("downloaded", False),
             "size": status.get("size"),
-        })
+            "last_used": status.get("last_used"),
+        }
+        if split_variant(name)[1] is not None:
+            entry["speedup"] = status.get("speedup")
+        models.append(entry)
     return models
 
 def main():
@@ -112,6 +707,8 @@ def main():
     parser.add_argument("--check", type=str, help="Check if model is downloaded")
     parser.add_argument("--download", type=str, help="Download a model")
     parser.add_argument("--list", action="store_true", help="List available models")
+    parser.add_argument("--quantize", type=str, help="Create the INT8 variant of a downloaded model")
+    parser.add_argument("--no-benchmark", action="store_true", help="Skip the speedup measurement when quantizing")
     
     args = parser.parse_args()
     
@@ -122,6 +719,13 @@ def main():
         result = download_model(args.download)
         if not result.get("success"):
             sys.exit(1)
+    elif args.quantize:
+        try:
+            result = quantize_model(args.quantize, benchmark=not args.no_benchmark)
+            print(json.dumps({"status": "done", **result}), flush=True)
+        except Exception as e:
+            print(json.dumps({"status": "error", "error": str(e)}), flush=True)
+            sys.exit(1)
     elif args.list:
         models = list_models()
         print(json.dumps(models))
@@ -0,0 +1,197 @@
+"""ONNX Runtime session setup and optimized-graph cache for SuperWhisper."""
+
+import hashlib
+import json
+import os
+import platform
+import shutil
+from pathlib import Path
+from typing import List, Optional
+
+import onnxruntime as rt
+
+from config import Config, CONFIG_DIR
+
+# Optimized graphs, one directory per (model snapshot, ORT version, settings)
+ORT_CACHE_DIR = CONFIG_DIR / "ort-cache"
+
+GRAPH_OPTIMIZATION_LEVELS = {
+    "disable": rt.GraphOptimizationLevel.ORT_DISABLE_ALL,
+    "basic": rt.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+    "extended": rt.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+    "all": rt.GraphOptimizationLevel.ORT_ENABLE_ALL,
+}
+
+EXECUTION_MODES = {
+    "sequential": rt.ExecutionMode.ORT_SEQUENTIAL,
+    "parallel": rt.ExecutionMode.ORT_PARALLEL,
+}
+
+
+def session_options(
+    config: Config,
+    graph_optimization: Optional[str] = None,
+    intra_op_threads: Optional[int] = None
+) -> rt.SessionOptions:
+    """Build SessionOptions from the config (0 threads = ONNX Runtime default)."""
+    so = rt.SessionOptions()
+    
+    threads = config.intra_op_threads if intra_op_threads is None else intra_op_threads
+    if threads:
+        so.intra_op_num_threads = threads
+    if config.inter_op_threads:
+        so.inter_op_num_threads = config.inter_op_threads
+    
+    level = graph_optimization or config.graph_optimization
+    so.graph_optimization_level = GRAPH_OPTIMIZATION_LEVELS.get(
+        level, rt.GraphOptimizationLevel.ORT_ENABLE_ALL
+    )
+    so.execution_mode = EXECUTION_MODES.get(config.execution_mode, rt.ExecutionMode.ORT_SEQUENTIAL)
+    so.enable_cpu_mem_arena = config.enable_cpu_mem_arena
+    so.enable_mem_pattern = config.enable_mem_pattern
+    so.log_severity_level = 3  # errors only
+    return so
+
+
+def _cache_key(snapshot: Path, config: Config, providers: List[str]) -> str:
+    """Key an optimized graph by model snapshot, ORT version, machine and settings."""
+    key = {
+        "snapshot": snapshot.name,  # HF snapshot dirs are named by commit hash
+        "files": sorted(
+            (str(p.relative_to(snapshot)), p.stat().st_size)
+            for p in snapshot.rglob("*.onnx")
+        ),
+        "ort": rt.__version__,
+        "machine": platform.machine(),
+        "level": config.graph_optimization,
+        "providers": list(providers),
+    }
+    return hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def _is_external_data(path: Path) -> bool:
+    return path.name.endswith((".onnx.data", ".onnx_data"))
+
+
+def _build_optimized_dir(snapshot: Path, target: Path, config: Config, providers: List[str]):
+    """Write optimized copies of every .onnx file in the snapshot to target.
+    
+    Other files (config, vocab) are linked. The directory is built under a
+    temporary name and renamed into place, so a crash never leaves a
+    half-written cache entry.
+    """
+    tmp = target.with_name(f"{target.name}.tmp-{os.getpid()}")
+    shutil.rmtree(tmp, ignore_errors=True)
+    
+    try:
+        for src in snapshot.rglob("*"):
+            if not src.is_file() or _is_external_data(src):
+                continue
+            dst = tmp / src.relative_to(snapshot)
+            dst.parent.mkdir(parents=True, exist_ok=True)
+            
+            if src.suffix == ".onnx":
+                so = session_options(config)
+                so.optimized_model_filepath = str(dst)
+                # Keep weights in an external file so >2 GB graphs can be saved
+                so.add_session_config_entry(
+                    "session.optimized_model_external_initializers_file_name",
+                    f"{dst.name}.data"
+                )
+                so.add_session_config_entry(
+                    "session.optimized_model_external_initializers_min_size_in_bytes",
+                    "1024"
+                )
+                rt.InferenceSession(str(src), sess_options=so, providers=providers)
+            else:
+                try:
+                    os.symlink(src.resolve(), dst)
+                except OSError:
+                    shutil.copy2(src, dst)
+        
+        try:
+            os.rename(tmp, target)
+        except OSError:
+            # Another process finished first
+            shutil.rmtree(tmp, ignore_errors=True)
+    except Exception:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+
+
+def optimized_model_dir(model_name: str, config: Config, providers: List[str]) -> Optional[Path]:
+    """Return a directory holding optimized graphs for a downloaded model.
+    
+    Builds it on first use. Returns None when the model is not downloaded
+    yet or the graphs cannot be optimized offline; callers then load the
+    model the normal way.
+    """
+    from model_manager import get_snapshot_path
+    
+    snapshot = get_snapshot_path(model_name)
+    if snapshot is None:
+        return None
+    
+    snapshot = Path(snapshot)
+    safe_name = model_name.replace("/", "--")
+    target = ORT_CACHE_DIR / safe_name / _cache_key(snapshot, config, providers)
+    if not target.is_dir():
+        target.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            _build_optimized_dir(snapshot, target, config, providers)
+        except Exception:
+            return None
+    return target if target.is_dir() else None
+
+
+def load_asr_model(
+    model_name: str,
+    config: Optional[Config] = None,
+    providers: Optional[List[str]] = None,
+    intra_op_threads: Optional[int] = None
+):
+    """Load an onnx_asr model with the configured session options.
+    
+    Quantized variants (e.g. "whisper-base-int8") are loaded from their
+    local variant directory. When the optimized-graph cache is enabled and
+    the model is on disk, the ASR graphs are loaded from the cache with
+    graph optimization disabled, skipping the optimization pass on every
+    later load.
+    """
+    import onnx_asr
+    from model_index import get_model_index
+    from model_manager import split_variant, get_snapshot_path
+    
+    config = config or Config.load()
+    providers = providers or config.providers
+    default_options = session_options(config, intra_op_threads=intra_op_threads)
+    
+    base_name, quantization = split_variant(model_name)
+    path = None
+    if quantization is not None:
+        path = get_snapshot_path(model_name)
+        if path is None:
+            raise FileNotFoundError(
+                f"{model_name} has not been created yet (model_manager.py --quantize {base_name})"
+            )
+    
+    asr_config = None
+    if config.optimized_model_cache and config.graph_optimization != "disable":
+        optimized_path = optimized_model_dir(model_name, config, providers)
+        if optimized_path is not None:
+            path = optimized_path
+            asr_config = {
+                "sess_options": session_options(config, "disable", intra_op_threads),
+                "providers": providers,
+            }
+    
+    model = onnx_asr.load_model(
+        base_name,
+        path,
+        quantization=quantization,
+        sess_options=default_options,
+        providers=providers,
+        asr_config=asr_config
+    )
+    get_model_index().mark_used(model_name)
+    return model
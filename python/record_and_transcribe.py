@@ -11,7 +11,6 @@ Usage:
 import sys
 import json
 import os
-import tempfile
 import time
 import threading
 import signal
@@ -20,45 +19,46 @@ import signal
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 import numpy as np
-import sounddevice as sd
-import scipy.io.wavfile as wav
+
+from config import Config, CAPTURE_SPILL_DIR, NOISE_FLOOR_FILE
+from transcriber import SpeechGate, audio_level, recognize_audio
 
 # Global state
 recording = False
-audio_data = []
-stream = None
+capture = None
 SAMPLE_RATE = 16000
 
 def record_audio(device_id=None, duration=None, send_levels=True):
     """Record audio from microphone."""
-    global recording, audio_data, stream
+    global recording, capture
+    from audio import AudioCapture
     
     recording = True
-    audio_data = []
-    last_level_time = [0]  # Use list to allow modification in nested function
     
-    def callback(indata, frames, time_info, status):
-        if recording:
-            audio_data.append(indata.copy())
-            
-            # Send audio level every 100ms
-            if send_levels:
-                current_time = time.time()
-                if current_time - last_level_time[0] > 0.1:
-                    level = float(np.abs(indata).mean())
-                    # Amplify and normalize (0-1 range)
-                    normalized = min(1.0, level * 50)
-                    print(json.dumps({"audio_level": normalized}), flush=True)
-                    last_level_time[0] = current_time
+    def on_level(reading):
+        # Metering thread: overlay level, dBFS and min/max envelope
+        print(json.dumps(reading), flush=True)
+    
+    def on_limit():
+        global recording
+        print(json.dumps({"status": "recording_limit_reached"}), flush=True)
+        recording = False
     
     try:
-        stream = sd.InputStream(
-            samplerate=SAMPLE_RATE,
-            channels=1,
-            device=device_id,
-            callback=callback
+        config = Config.load()
+        capture = AudioCapture(
+            device_id=device_id,
+            sample_rate=SAMPLE_RATE,
+            on_level=on_level if send_levels else None,
+            ram_limit_mb=config.capture_ram_mb,
+            spill_dir=str(CAPTURE_SPILL_DIR),
+            max_seconds=config.max_recording_s,
+            on_limit=on_limit,
+            capture_rate=config.capture_rate or None,
+            blocksize=config.blocksize,
+            latency=config.latency
         )
-        stream.start()
+        capture.start()
         
         if duration:
             time.sleep(duration)
@@ -75,55 +75,52 @@ def record_audio(device_id=None, duration=None, send_levels=True):
 
 def stop_recording():
     """Stop recording and return audio data."""
-    global recording, audio_data, stream
+    global recording
     
     recording = False
-    
-    if stream:
-        stream.stop()
-        stream.close()
-        stream = None
-    
-    if not audio_data:
+    if capture is None:
         return None
+    if capture.is_recording:
+        capture.stop()
     
-    # Combine audio chunks
-    audio = np.concatenate(audio_data, axis=0)
-    # Convert to int16
-    audio_int16 = (audio * 32767).astype(np.int16)
-    return audio_int16
+    # int16 view of the capture buffer (converted once, by the model input path)
+    if not len(capture.buffer):
+        return None
+    return capture.buffer.view()
 
-def transcribe_audio(audio_int16, model_name="nemo-parakeet-tdt-0.6b-v3", use_vad=False):
-    """Transcribe audio using onnx_asr."""
-    import onnx_asr
+def transcribe_audio(audio, model_name="nemo-parakeet-tdt-0.6b-v3", use_vad=False, device=None):
+    """Transcribe audio using onnx_asr (on a running daemon when there is one)."""
+    from daemon_client import connect
+    from ort_session import load_asr_model
     
-    # Check audio level
-    audio_level = np.abs(audio_int16).mean()
-    if audio_level < 100:
-        return {"error": "Audio too quiet", "level": float(audio_level)}
+    # Skip recordings without speech; send only the speech span onwards
+    config = Config.load()
+    gate = SpeechGate(margin_db=config.gate_margin_db, padding_s=config.trim_padding_s, path=NOISE_FLOOR_FILE)
+    bounds = gate.detect(audio, device)
+    if bounds is None:
+        return {"error": "No speech detected", "level": audio_level(audio), "duration": len(audio) / SAMPLE_RATE}
+    duration = len(audio) / SAMPLE_RATE
+    audio = audio[bounds[0]:bounds[1]]
     
-    # Save to temp file
-    with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as f:
-        wav.write(f.name, SAMPLE_RATE, audio_int16)
-        temp_path = f.name
-    
-    try:
-        # Load model
-        model = onnx_asr.load_model(model_name, providers=["CPUExecutionProvider"])
-        
-        # Transcribe
-        result = model.recognize(temp_path)
-        
-        if result and result.strip():
-            return {"text": result.strip(), "duration": len(audio_int16) / SAMPLE_RATE}
-        else:
-            return {"error": "No speech detected", "duration": len(audio_int16) / SAMPLE_RATE}
-    finally:
-        # Clean up temp file
+    # A daemon already has the model loaded
+    client = connect()
+    if client is not None:
         try:
-            os.unlink(temp_path)
-        except:
-            pass
+            with client:
+                return client.transcribe(audio, SAMPLE_RATE, model=model_name, gated=True)
+        except (OSError, ValueError):
+            pass  # daemon went away; transcribe here instead
+    
+    # Load model
+    model = load_asr_model(model_name)
+    
+    # Transcribe straight from the captured buffer
+    result = recognize_audio(model, audio, SAMPLE_RATE)
+    
+    if result and result.strip():
+        return {"text": result.strip(), "duration": duration}
+    else:
+        return {"error": "No speech detected", "duration": duration}
 
 def copy_to_clipboard(text):
     """Copy text to clipboard."""
@@ -228,15 +225,15 @@ def main():
         thread.join(timeout=2)
     
     # Get audio data
-    audio_int16 = stop_recording()
+    audio = stop_recording()
     
-    if audio_int16 is None or len(audio_int16) == 0:
+    if audio is None or len(audio) == 0:
         result = {"error": "No audio recorded"}
     else:
-        print(json.dumps({"status": "transcribing", "duration": len(audio_int16) / SAMPLE_RATE}), flush=True)
+        print(json.dumps({"status": "transcribing", "duration": len(audio) / SAMPLE_RATE}), flush=True)
         
         # Transcribe
-        result = transcribe_audio(audio_int16, model_name=args.model, use_vad=args.vad)
+        result = transcribe_audio(audio, model_name=args.model, use_vad=args.vad, device=args.device)
     
     # Output result
     if 'text' in result:
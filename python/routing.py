@@ -0,0 +1,138 @@
+"""Per-utterance model routing for SuperWhisper."""
+
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+RTF_WEIGHT = 0.3  # Weight of each new real-time-factor measurement in the running average
+
+
+def cpu_load() -> Optional[float]:
+    """Runnable processes per core (1-minute load average); None where unavailable."""
+    try:
+        return os.getloadavg()[0] / (os.cpu_count() or 1)
+    except (AttributeError, OSError):
+        pass
+    try:
+        import psutil
+        return psutil.cpu_percent(interval=None) / 100.0
+    except ImportError:
+        return None
+
+
+class RouteDecision:
+    """The model picked for one utterance, and why."""
+    
+    def __init__(self, model: str, reason: str, duration: float, queued: int):
+        self.model = model
+        self.reason = reason  # "default", "short" or "fallback"
+        self.pressure: Optional[str] = None  # "backlog", "cpu" or "slow" when under pressure
+        self.duration = duration
+        self.queued = queued
+        self.cpu_load: Optional[float] = None
+        self.rtf: Optional[float] = None
+        self.predicted_time: Optional[float] = None
+        self.decision_time = 0.0
+    
+    def to_dict(self) -> dict:
+        return {
+            "model": self.model,
+            "reason": self.reason,
+            "pressure": self.pressure,
+            "duration": self.duration,
+            "queued": self.queued,
+            "cpu_load": self.cpu_load,
+            "rtf": self.rtf,
+            "predicted_time": self.predicted_time,
+            "decision_time": self.decision_time,
+        }
+
+
+class ModelRouter:
+    """Picks the model for each utterance from its length and the current load.
+    
+    Utterances up to ``short_max_s`` go to ``short_model``, longer ones to
+    the active model. Under pressure (``max_queue`` transcriptions waiting,
+    a load average of ``max_cpu_load`` per core, or a predicted time over
+    ``latency_budget_s`` from the model's measured real-time factor) the
+    job falls back to ``fallback_model`` when that is expected to be
+    faster. Only models for which ``is_available`` holds are picked, so
+    routing never starts a download.
+    """
+    
+    def __init__(
+        self,
+        short_model: Optional[str] = "whisper-base",
+        short_max_s: float = 3.0,
+        fallback_model: Optional[str] = "whisper-base",
+        max_queue: int = 2,
+        max_cpu_load: float = 1.0,
+        latency_budget_s: float = 2.0,
+        is_available: Callable[[str], bool] = lambda name: True
+    ):
+        self.short_model = short_model
+        self.short_max_s = short_max_s
+        self.fallback_model = fallback_model
+        self.max_queue = max_queue
+        self.max_cpu_load = max_cpu_load
+        self.latency_budget_s = latency_budget_s
+        self.is_available = is_available
+        self._rtf: Dict[str, float] = {}
+        self._lock = threading.Lock()
+    
+    def observe_rtf(self, model_name: str, rtf: Optional[float]):
+        """Fold a real-time-factor measurement (e.g. from warm-up) into the model's average."""
+        if not rtf or rtf <= 0:
+            return
+        with self._lock:
+            previous = self._rtf.get(model_name)
+            self._rtf[model_name] = rtf if previous is None else (
+                (1 - RTF_WEIGHT) * previous + RTF_WEIGHT * rtf
+            )
+    
+    def observe(self, model_name: str, duration: float, elapsed: float):
+        """Record how long a transcription of `duration` seconds of speech took."""
+        if duration > 0:
+            self.observe_rtf(model_name, elapsed / duration)
+    
+    def rtf(self, model_name: str) -> Optional[float]:
+        with self._lock:
+            return self._rtf.get(model_name)
+    
+    def predict(self, model_name: str, duration: float) -> Optional[float]:
+        """Expected transcription time, once the model has been measured."""
+        rtf = self.rtf(model_name)
+        return rtf * duration if rtf is not None else None
+    
+    def route(self, default_model: str, duration: float, queued: int = 0) -> RouteDecision:
+        """Pick the model for `duration` seconds of speech with `queued` jobs waiting."""
+        start_time = time.perf_counter()
+        decision = RouteDecision(default_model, "default", duration, queued)
+        
+        if (self.short_model and self.short_model != default_model
+                and duration <= self.short_max_s and self.is_available(self.short_model)):
+            decision.model, decision.reason = self.short_model, "short"
+        
+        decision.cpu_load = cpu_load()
+        predicted = self.predict(decision.model, duration)
+        if queued >= self.max_queue:
+            decision.pressure = "backlog"
+        elif decision.cpu_load is not None and decision.cpu_load >= self.max_cpu_load:
+            decision.pressure = "cpu"
+        elif predicted is not None and predicted > self.latency_budget_s:
+            decision.pressure = "slow"
+        
+        if (decision.pressure and self.fallback_model
+                and self.fallback_model != decision.model
+                and self.is_available(self.fallback_model)):
+            fallback_predicted = self.predict(self.fallback_model, duration)
+            # Unmeasured models are assumed lighter, as a fallback should be
+            if predicted is None or fallback_predicted is None or fallback_predicted < predicted:
+                decision.model, decision.reason = self.fallback_model, "fallback"
+                predicted = fallback_predicted
+        
+        decision.rtf = self.rtf(decision.model)
+        decision.predicted_time = predicted
+        decision.decision_time = time.perf_counter() - start_time
+        return decision
@@ -0,0 +1,268 @@
+"""Incremental transcription while recording is still in progress."""
+
+import sys
+import threading
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from transcriber import (
+    SAMPLE_RATE,
+    MIN_SEGMENT_SAMPLES,
+    recognize_many,
+    speech_segments,
+    to_waveform,
+)
+
+
+class IncrementalTranscriber:
+    """Transcribes finished speech segments in the background during recording.
+    
+    A worker thread periodically pulls newly captured audio, runs VAD over the
+    not-yet-transcribed tail and recognizes every segment that is followed by
+    enough silence to be considered finished. When recording stops, ``finish()``
+    only has the unfinished tail left to transcribe.
+    
+    The tail never grows past ``max_tail`` seconds: speech running on that
+    long without a pause is cut there, so each VAD pass covers a bounded
+    window however long the recording gets.
+    """
+    
+    def __init__(
+        self,
+        model,
+        vad_model,
+        read_new_audio: Callable[[], Optional[np.ndarray]],
+        on_partial: Optional[Callable[[str, int], None]] = None,
+        on_error: Optional[Callable[[Exception], None]] = None,
+        sample_rate: int = SAMPLE_RATE,
+        interval: float = 0.5,
+        min_silence: float = 0.6,
+        max_tail: float = 20.0
+    ):
+        """
+        Args:
+            model: Loaded onnx_asr model
+            vad_model: Loaded onnx_asr VAD (e.g. load_vad("silero"))
+            read_new_audio: Returns audio captured since the previous call, or None
+            on_partial: Called with (text so far, segment count) after each segment batch
+            on_error: Called (on the worker thread) when a pass fails; the worker then
+                stops and finish() transcribes the rest (default: print to stderr)
+            interval: Seconds between VAD passes
+            min_silence: Trailing silence (seconds) after which a segment is final
+            max_tail: Longest untranscribed tail (seconds) before speech is cut
+        """
+        self.model = model
+        self.vad_model = vad_model
+        self.read_new_audio = read_new_audio
+        self.on_partial = on_partial
+        self.on_error = on_error
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self.min_silence_samples = int(min_silence * sample_rate)
+        self.max_tail_samples = max(int(max_tail * sample_rate), self.min_silence_samples + MIN_SEGMENT_SAMPLES)
+        
+        self._pending = np.zeros(0, dtype=np.float32)
+        self._texts: List[str] = []
+        self._segments = 0
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self):
+        """Start the background worker."""
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+    
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self._step(final=False)
+            except Exception as e:
+                # Leave the remaining audio for finish()
+                if self.on_error:
+                    self.on_error(e)
+                else:
+                    print(f"Incremental transcription stopped: {e}", file=sys.stderr)
+                break
+    
+    def _pull(self) -> bool:
+        """Add newly captured audio to the pending tail; returns whether there was any."""
+        new_audio = self.read_new_audio()
+        if new_audio is None or not len(new_audio):
+            return False
+        # One copy per pass, of a tail kept to about max_tail
+        self._pending = np.concatenate((self._pending, to_waveform(new_audio)))
+        return True
+    
+    def _step(self, final: bool):
+        """Transcribe finished segments (all segments when final)."""
+        with self._lock:
+            if not self._pull() and not final:
+                return  # nothing new since the last pass
+            if len(self._pending) < MIN_SEGMENT_SAMPLES:
+                return
+            
+            segments = speech_segments(self.vad_model, self._pending, self.sample_rate)
+            if not final:
+                horizon = len(self._pending) - self.min_silence_samples
+                finished = [(start, end) for start, end in segments if end <= horizon]
+                if not finished and len(self._pending) >= self.max_tail_samples:
+                    start = segments[0][0] if segments else horizon
+                    if horizon - start >= MIN_SEGMENT_SAMPLES:
+                        # Speech without a pause for max_tail: cut it at the horizon
+                        finished = [(start, horizon)]
+                    else:
+                        # Drop the silence before the speech that is still to come
+                        self._pending = self._pending[start:].copy()
+                segments = finished
+            if not segments:
+                return
+            
+            clips = [
+                self._pending[start:end]
+                for start, end in segments
+                if end - start >= MIN_SEGMENT_SAMPLES
+            ]
+            texts = recognize_many(self.model, clips, self.sample_rate)
+            self._texts.extend(text for text in texts if text)
+            self._segments += len(clips)
+            
+            # Drop everything up to the end of the last finished segment
+            self._pending = self._pending[segments[-1][1]:].copy()
+            
+            if self.on_partial and not final:
+                self.on_partial(self.text, self._segments)
+    
+    def finish(self) -> str:
+        """Stop the worker, transcribe the remaining tail and return the full text."""
+        self.cancel()
+        self._step(final=True)
+        return self.text
+    
+    def cancel(self):
+        """Stop the worker without transcribing the tail."""
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+    
+    @property
+    def text(self) -> str:
+        return " ".join(self._texts)
+    
+    @property
+    def segment_count(self) -> int:
+        return self._segments
+
+
+class UtteranceEndpointer:
+    """Finds where each utterance ends on live audio (hands-free mode).
+    
+    A worker thread runs the VAD every ``interval`` seconds over a short
+    window of the newest audio. Once speech has been heard and is followed by
+    ``silence`` seconds without speech, ``on_endpoint(True)`` is called; after
+    ``idle`` seconds without any speech, ``on_endpoint(False)``. The worker
+    then waits for ``resume()``, so the caller can cut the recording without
+    racing it, and starts over on fresh audio. ``end_now()`` forces an
+    endpoint at the next pass (e.g. when the recording reaches its length limit).
+    """
+    
+    def __init__(
+        self,
+        vad_model,
+        read_new_audio: Callable[[], Optional[np.ndarray]],
+        on_endpoint: Callable[[bool], None],
+        sample_rate: int = SAMPLE_RATE,
+        interval: float = 0.1,
+        silence: float = 0.8,
+        idle: float = 30.0
+    ):
+        """
+        Args:
+            vad_model: Loaded onnx_asr VAD (e.g. load_vad("silero"))
+            read_new_audio: Returns audio captured since the previous call, or None
+            on_endpoint: Called with True at the end of an utterance, False when idle
+            interval: Seconds between VAD passes
+            silence: Trailing silence (seconds) that ends an utterance
+            idle: Seconds without speech after which the recording can be dropped
+        """
+        self.vad_model = vad_model
+        self.read_new_audio = read_new_audio
+        self.on_endpoint = on_endpoint
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self.silence_samples = int(silence * sample_rate)
+        self.idle_samples = int(idle * sample_rate)
+        self.window_samples = self.silence_samples + sample_rate
+        
+        self._stop = threading.Event()
+        self._resumed = threading.Event()
+        self._end_now = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._reset()
+    
+    def _reset(self):
+        self._window = np.zeros(0, dtype=np.float32)
+        self._received = 0  # samples seen since the last endpoint
+        self._speech_end: Optional[int] = None  # end of the latest speech, in received samples
+    
+    def start(self):
+        """Start the background worker."""
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+    
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            speech = self._step()
+            if speech is None:
+                continue
+            self._resumed.clear()
+            self.on_endpoint(speech)
+            self._resumed.wait()
+            if self._stop.is_set():
+                break
+            self._reset()
+    
+    def _step(self) -> Optional[bool]:
+        """Run the VAD over the newest audio; returns an endpoint if one was reached."""
+        new_audio = self.read_new_audio()
+        if new_audio is not None and len(new_audio):
+            self._window = np.concatenate((self._window, to_waveform(new_audio)))[-self.window_samples:]
+            self._received += len(new_audio)
+        
+        if self._end_now.is_set():
+            self._end_now.clear()
+            return self._speech_end is not None
+        
+        if len(self._window) >= MIN_SEGMENT_SAMPLES:
+            segments = speech_segments(self.vad_model, self._window, self.sample_rate)
+            if segments:
+                window_start = self._received - len(self._window)
+                self._speech_end = window_start + segments[-1][1]
+        
+        if self._speech_end is not None:
+            if self._received - self._speech_end >= self.silence_samples:
+                return True
+        elif self._received >= self.idle_samples:
+            return False
+        return None
+    
+    def end_now(self):
+        """End the current utterance at the next pass, whatever the VAD hears."""
+        self._end_now.set()
+    
+    def resume(self):
+        """Continue after an endpoint, on the audio captured from now on."""
+        self._resumed.set()
+    
+    def stop(self):
+        """Stop the worker."""
+        self._stop.set()
+        self._resumed.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+    
+    @property
+    def speech_heard(self) -> bool:
+        """Whether the current utterance has any speech yet."""
+        return self._speech_end is not None
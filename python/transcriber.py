@@ -1,15 +1,394 @@
 """ASR transcription engine for SuperWhisper."""
 
+import json
+import os
+import queue
+import sys
+import threading
+import time
 import numpy as np
-import scipy.io.wavfile as wav
-import tempfile
-from typing import Optional, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Dict
 from pathlib import Path
 
-import onnx_asr
-from onnx_asr.loader import load_vad
-
 SAMPLE_RATE = 16000
+INT16_SCALE = 1.0 / 32768.0
+
+# Batching limits for transcribe_many
+MAX_BATCH_SIZE = 8
+MAX_PADDING_RATIO = 1.3  # longest clip in a batch vs. shortest
+MAX_BATCH_SAMPLES = SAMPLE_RATE * 240  # padded samples per batch (bounds memory)
+MIN_SEGMENT_SAMPLES = int(SAMPLE_RATE * 0.1)
+
+# Concurrent VAD segment runs (each on its own model replica and share of the cores)
+MAX_SEGMENT_WORKERS = 4
+MIN_THREADS_PER_SEGMENT_WORKER = 2
+
+# Warm-up clip lengths (seconds) for synthetic audio
+WARMUP_LENGTHS = (1.0, 4.0, 10.0)
+
+# Speech gate (energy pre-stage before inference)
+GATE_FRAME_SAMPLES = int(SAMPLE_RATE * 0.02)  # 20 ms analysis frames
+GATE_MIN_DB = -55.0  # Frames quieter than this are never speech
+GATE_DEFAULT_FLOOR_DB = -65.0  # Noise floor assumed for a device not seen yet
+GATE_MAX_FLOOR_DB = -35.0  # Highest floor a device can reach (e.g. a loud fan), so speech still gets through
+GATE_NOISE_PERCENTILE = 10  # Frame-level percentile taken as a recording's noise level
+GATE_FLOOR_WEIGHT = 0.2  # How fast a device's floor follows new recordings
+GATE_SAVE_DELTA_DB = 1.0  # Floors are written back once one has moved this far
+
+
+def to_waveform(audio: np.ndarray) -> np.ndarray:
+    """Convert captured PCM to the mono float32 waveform onnx_asr expects.
+    
+    float32 input is passed through untouched; int16 input costs exactly one
+    conversion (the scale is applied in place on the converted buffer).
+    """
+    audio = audio.reshape(-1)
+    if audio.dtype == np.float32:
+        return audio
+    waveform = audio.astype(np.float32)
+    if audio.dtype == np.int16:
+        waveform *= INT16_SCALE
+    return waveform
+
+
+def audio_level(audio: np.ndarray) -> float:
+    """Mean absolute amplitude in int16 units, whatever the sample dtype."""
+    level = float(np.abs(audio).mean()) if len(audio) else 0.0
+    return level * 32767 if audio.dtype.kind == "f" else level
+
+
+def frame_levels(audio: np.ndarray, frame: int = GATE_FRAME_SAMPLES) -> np.ndarray:
+    """RMS level in dBFS of each whole frame of int16 or float audio."""
+    audio = audio.reshape(-1)
+    count = len(audio) // frame
+    frames = audio[:count * frame].reshape(count, frame)
+    power = np.einsum("ij,ij->i", frames, frames, dtype=np.float64) / frame
+    full_scale = 1.0 if audio.dtype.kind == "f" else 32768.0
+    return 10 * np.log10(power / full_scale ** 2 + 1e-12)
+
+
+class SpeechGate:
+    """Energy gate run before inference.
+    
+    Frames more than ``margin_db`` above the device's noise floor count as
+    speech. Recordings with less than ``min_speech_s`` of speech are skipped
+    (no model call); otherwise leading and trailing silence is trimmed, keeping
+    ``padding_s`` around the speech. Each device's floor is re-estimated from
+    the quiet frames of every recording and, with ``path`` set, persisted
+    whenever a floor has drifted ``GATE_SAVE_DELTA_DB`` from the saved one.
+    """
+    
+    def __init__(
+        self,
+        margin_db: float = 10.0,
+        min_speech_s: float = 0.15,
+        padding_s: float = 0.25,
+        path: Optional[Path] = None
+    ):
+        self.margin_db = margin_db
+        self.min_speech_s = min_speech_s
+        self.padding_s = padding_s
+        self.path = path
+        self.noise_floors: Dict[str, float] = {}
+        self._saved_floors: Dict[str, float] = {}  # as last written to path
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        if path is not None and path.exists():
+            try:
+                self.noise_floors = {k: float(v) for k, v in json.loads(path.read_text()).items()}
+            except (ValueError, TypeError, AttributeError):
+                pass
+            self._saved_floors = dict(self.noise_floors)
+    
+    def noise_floor(self, device=None) -> float:
+        with self._lock:
+            return self.noise_floors.get(str(device), GATE_DEFAULT_FLOOR_DB)
+    
+    def detect(self, audio: np.ndarray, device=None) -> Optional[tuple]:
+        """Return the (start, end) samples to transcribe, or None if there is no speech."""
+        levels = frame_levels(audio)
+        if not len(levels):
+            return None
+        
+        floor = self._calibrate(levels, device)
+        speech = np.flatnonzero(levels > max(floor + self.margin_db, GATE_MIN_DB))
+        if len(speech) * GATE_FRAME_SAMPLES < self.min_speech_s * SAMPLE_RATE:
+            return None
+        
+        padding = int(self.padding_s * SAMPLE_RATE)
+        start = max(0, speech[0] * GATE_FRAME_SAMPLES - padding)
+        end = min(len(audio), (speech[-1] + 1) * GATE_FRAME_SAMPLES + padding)
+        return int(start), int(end)
+    
+    def _calibrate(self, levels: np.ndarray, device) -> float:
+        """Blend this recording's quiet frames into the device's noise floor.
+        
+        The floor follows the noise level up as well as down, so a noisy
+        device stops passing its own noise as speech; it stays below
+        ``GATE_MAX_FLOOR_DB`` so that wall-to-wall speech cannot raise it
+        past the speech it has to let through.
+        """
+        key = str(device)
+        estimate = min(float(np.percentile(levels, GATE_NOISE_PERCENTILE)), GATE_MAX_FLOOR_DB)
+        with self._lock:
+            floor = self.noise_floors.get(key)
+            if floor is None:
+                floor = estimate
+            else:
+                floor += GATE_FLOOR_WEIGHT * (estimate - floor)
+            self.noise_floors[key] = round(floor, 1)
+            saved = self._saved_floors.get(key)
+            changed = saved is None or abs(self.noise_floors[key] - saved) >= GATE_SAVE_DELTA_DB
+            if changed:
+                self._saved_floors = dict(self.noise_floors)
+        
+        if self.path is not None and changed:
+            self._save()
+        return floor
+    
+    def _save(self):
+        """Write the floors atomically (a crash never leaves a torn file)."""
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        with self._save_lock:
+            with self._lock:
+                floors = self._saved_floors  # the newest, even if another save came first
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path.write_text(json.dumps(floors, indent=2))
+                os.replace(tmp_path, self.path)
+            except OSError:
+                pass
+
+
+def recognize_audio(model, audio: np.ndarray, sample_rate: int = SAMPLE_RATE) -> str:
+    """Run an onnx_asr model directly on an in-memory audio buffer."""
+    return model.recognize(to_waveform(audio), sample_rate=sample_rate)
+
+
+def length_buckets(
+    lengths: List[int],
+    max_batch_size: int = MAX_BATCH_SIZE,
+    max_padding_ratio: float = MAX_PADDING_RATIO,
+    max_batch_samples: int = MAX_BATCH_SAMPLES
+) -> List[List[int]]:
+    """Group clip indices into batches of similar length.
+    
+    Clips are sorted by length and cut into batches whose longest clip is at
+    most ``max_padding_ratio`` times the shortest, so zero padding stays low.
+    """
+    batches = []
+    batch = []
+    for i in sorted(range(len(lengths)), key=lengths.__getitem__):
+        if batch:
+            shortest = max(lengths[batch[0]], 1)
+            padded = lengths[i] * (len(batch) + 1)
+            if (len(batch) >= max_batch_size
+                    or lengths[i] > shortest * max_padding_ratio
+                    or padded > max_batch_samples):
+                batches.append(batch)
+                batch = []
+        batch.append(i)
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def clip_batches(waveforms: List[np.ndarray], max_batch_size: int = MAX_BATCH_SIZE) -> List[List[int]]:
+    """Length-bucketed batches of indices into waveforms (empty clips left out)."""
+    indices = [i for i, w in enumerate(waveforms) if len(w) > 0]
+    lengths = [len(waveforms[i]) for i in indices]
+    return [[indices[j] for j in bucket] for bucket in length_buckets(lengths, max_batch_size)]
+
+
+def recognize_many(model, clips: List[np.ndarray], sample_rate: int = SAMPLE_RATE) -> List[Optional[str]]:
+    """Recognize several in-memory clips with one model call per length bucket."""
+    waveforms = [to_waveform(clip) for clip in clips]
+    results: List[Optional[str]] = [None] * len(waveforms)
+    
+    for batch in clip_batches(waveforms):
+        texts = model.recognize([waveforms[i] for i in batch], sample_rate=sample_rate)
+        for i, text in zip(batch, texts):
+            if text and text.strip():
+                results[i] = text.strip()
+    
+    return results
+
+
+def segment_partition(workers: int = 0, cores: Optional[int] = None) -> tuple:
+    """Split the CPU's cores between concurrent segment runs.
+    
+    Returns ``(runs, threads per run)``. ``workers=0`` picks the number of
+    runs from the core count (e.g. 4 runs x 2 threads on 8 cores rather than
+    1 x 8); with a single run the thread count is None, i.e. the configured
+    ONNX Runtime default.
+    """
+    cores = cores or os.cpu_count() or 1
+    if workers <= 0:
+        workers = min(MAX_SEGMENT_WORKERS, cores // MIN_THREADS_PER_SEGMENT_WORKER)
+    workers = max(1, min(workers, cores))
+    if workers == 1:
+        return 1, None
+    return workers, cores // workers
+
+
+class SegmentScheduler:
+    """Recognizes VAD segments on several model replicas at once.
+    
+    Each replica is its own ONNX Runtime session with a share of the cores,
+    so short segments run side by side instead of one intra-op thread pool
+    spreading each of them thin. Texts are returned in segment order.
+    """
+    
+    def __init__(self, models: List):
+        self.models = models
+        self._idle: "queue.Queue" = queue.Queue()
+        for model in models:
+            self._idle.put(model)
+    
+    @property
+    def workers(self) -> int:
+        return len(self.models)
+    
+    def recognize(self, clips: List[np.ndarray], sample_rate: int = SAMPLE_RATE) -> List[Optional[str]]:
+        """Recognize clips concurrently; one entry per clip, in input order."""
+        if self.workers == 1:
+            return recognize_many(self.models[0], clips, sample_rate)
+        
+        waveforms = [to_waveform(clip) for clip in clips]
+        results: List[Optional[str]] = [None] * len(waveforms)
+        
+        # Smaller batches when there are few clips, so every replica gets work;
+        # the longest batches start first and short ones fill in at the end
+        batch_size = max(1, min(MAX_BATCH_SIZE, -(-len(waveforms) // self.workers)))
+        batches = sorted(
+            clip_batches(waveforms, batch_size),
+            key=lambda batch: sum(len(waveforms[i]) for i in batch),
+            reverse=True
+        )
+        
+        def run(batch):
+            # Replicas are shared by concurrent transcriptions; wait for a free one
+            model = self._idle.get()
+            try:
+                return model.recognize([waveforms[i] for i in batch], sample_rate=sample_rate)
+            finally:
+                self._idle.put(model)
+        
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(batches) or 1),
+                                thread_name_prefix="segments") as pool:
+            for batch, texts in zip(batches, pool.map(run, batches)):
+                for i, text in zip(batch, texts):
+                    if text and text.strip():
+                        results[i] = text.strip()
+        
+        return results
+
+
+def speech_segments(vad_model, waveform: np.ndarray, sample_rate: int = SAMPLE_RATE) -> List[tuple]:
+    """Run a VAD model over one float32 waveform and return (start, end) sample pairs."""
+    waveforms = waveform.reshape(1, -1)
+    waveforms_len = np.array([waveform.shape[-1]], dtype=np.int64)
+    segments = []
+    for segment_list in vad_model.segment_batch(waveforms, waveforms_len, sample_rate=sample_rate):
+        segments.extend((int(start), int(end)) for start, end in segment_list)
+    return segments
+
+
+def find_reference_audio() -> Optional[Path]:
+    """Locate the bundled test.wav (repo root, or the PyInstaller bundle)."""
+    candidates = [Path(__file__).resolve().parent.parent / "test.wav"]
+    bundle_dir = getattr(sys, "_MEIPASS", None)
+    if bundle_dir:
+        candidates.insert(0, Path(bundle_dir) / "test.wav")
+    for path in candidates:
+        if path.is_file():
+            return path
+    return None
+
+
+def read_wav(path) -> np.ndarray:
+    """Read a WAV file as a mono 16 kHz array (int16 files at 16 kHz are returned as-is)."""
+    import scipy.io.wavfile as wav
+    
+    rate, audio = wav.read(path)
+    if audio.dtype == np.int16 and audio.ndim == 1 and rate == SAMPLE_RATE:
+        return audio
+    
+    # Normalize everything else to float32 in [-1, 1]
+    if audio.dtype == np.uint8:
+        audio = (audio.astype(np.float32) - 128.0) / 128.0
+    elif np.issubdtype(audio.dtype, np.integer):
+        audio = audio.astype(np.float32) / -float(np.iinfo(audio.dtype).min)
+    else:
+        audio = audio.astype(np.float32, copy=False)
+    if audio.ndim > 1:
+        audio = audio.mean(axis=1, dtype=np.float32)
+    return resample(audio, rate)
+
+
+def resample(audio: np.ndarray, rate: int, target_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """Resample a float32 waveform to target_rate (returned as-is when already there)."""
+    if rate == target_rate:
+        return audio
+    from math import gcd
+    from scipy.signal import resample_poly
+    g = gcd(rate, target_rate)
+    return resample_poly(audio, target_rate // g, rate // g).astype(np.float32)
+
+
+def synthetic_speech(seconds: float, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """Deterministic speech-like signal (modulated harmonics plus noise)."""
+    t = np.arange(int(seconds * sample_rate), dtype=np.float32) / sample_rate
+    pitch = 140.0 + 30.0 * np.sin(2 * np.pi * 0.7 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / sample_rate
+    voice = sum(np.sin(k * phase) / k for k in range(1, 6))
+    envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 3.0 * t) ** 2
+    noise = np.random.default_rng(0).standard_normal(len(t)).astype(np.float32) * 0.01
+    return (0.2 * envelope * voice + noise).astype(np.float32)
+
+
+def warm_up(model, lengths=WARMUP_LENGTHS, reference: Optional[Path] = None) -> dict:
+    """Run a freshly loaded model a few times so ONNX Runtime allocates its
+    arenas and kernels now rather than on the first real dictation.
+    
+    Returns cold vs warm latency (seconds) and the real-time factor on the
+    reference clip (bundled test.wav, or the longest synthetic clip).
+    """
+    runs = []
+    
+    def timed(audio, label):
+        start_time = time.time()
+        recognize_audio(model, audio)
+        elapsed = time.time() - start_time
+        duration = len(audio) / SAMPLE_RATE
+        runs.append({"input": label, "duration": duration, "latency": elapsed})
+        return elapsed, duration
+    
+    clips = [(synthetic_speech(seconds), f"synthetic_{seconds:g}s") for seconds in lengths]
+    reference = reference or find_reference_audio()
+    if reference is not None:
+        try:
+            clips.append((read_wav(reference), reference.name))
+        except (OSError, ValueError):
+            pass
+    
+    cold_latency, _ = timed(*clips[0])
+    for audio, label in clips[1:]:
+        timed(audio, label)
+    
+    # Warm latency: the first clip again, now that everything is allocated
+    warm_latency, _ = timed(*clips[0])
+    ref_audio, ref_label = clips[-1]
+    ref_latency, ref_duration = timed(ref_audio, ref_label)
+    
+    return {
+        "cold_latency": cold_latency,
+        "warm_latency": warm_latency,
+        "rtf": ref_latency / ref_duration if ref_duration else None,
+        "reference": ref_label,
+        "runs": runs
+    }
 
 
 class Transcriber:
@@ -19,123 +398,191 @@ class Transcriber:
         self,
         model_name: str = "nemo-parakeet-tdt-0.6b-v3",
         use_vad: bool = False,
-        providers: Optional[List[str]] = None
+        providers: Optional[List[str]] = None,
+        warmup: bool = False,
+        gate: Optional[SpeechGate] = None,
+        segment_workers: int = 1
     ):
         self.model_name = model_name
         self.use_vad = use_vad
         self.providers = providers or ["CPUExecutionProvider"]
+        self.warmup = warmup
+        self.gate = gate or SpeechGate()
+        self.segment_workers = segment_workers  # 0 = pick from the core count
         
         self.model = None
         self.vad_model = None
+        self.scheduler: Optional[SegmentScheduler] = None
+        self._partition = (1, None)
+        self.warmup_stats: Optional[dict] = None
         self._loaded = False
+        self._load_lock = threading.Lock()  # one load at a time
+        self._state = threading.Condition()  # guards the model swap
+        self._pending_loads = 0
     
     def load(self, on_progress: Optional[callable] = None) -> bool:
-        """Load the ASR model (and VAD if enabled)."""
+        """Load the ASR model (and VAD if enabled), warming it up if configured."""
+        return self._load(self.model_name, self.use_vad, on_progress)
+    
+    def _load(self, model_name: str, use_vad: bool, on_progress: Optional[callable] = None) -> bool:
+        """Load models next to the active ones, then swap them in atomically.
+        
+        The previous model keeps serving transcriptions while the new one
+        loads; if loading fails it stays active.
+        """
+        # onnx_asr / ONNX Runtime are only imported once a model is needed
+        from onnx_asr.loader import load_vad
+        
+        with self._state:
+            self._pending_loads += 1
         try:
-            if on_progress:
-                on_progress("loading_vad" if self.use_vad else "loading_model")
-            
-            # Load VAD model if enabled
-            if self.use_vad:
-                self.vad_model = load_vad("silero", providers=self.providers)
-            
-            if on_progress:
-                on_progress("loading_model")
-            
-            # Load ASR model
-            self.model = onnx_asr.load_model(
-                self.model_name,
-                providers=self.providers
-            )
-            
-            self._loaded = True
-            if on_progress:
-                on_progress("ready")
-            
-            return True
+            with self._load_lock:
+                if on_progress:
+                    on_progress("loading_vad" if use_vad else "loading_model")
+                
+                # Load VAD model if enabled (reuse the current one)
+                vad_model = None
+                if use_vad:
+                    vad_model = self.vad_model or load_vad("silero", providers=self.providers)
+                
+                if on_progress:
+                    on_progress("loading_model")
+                
+                # Segments only run concurrently with VAD; each run gets its
+                # own replica with a share of the cores
+                partition = segment_partition(self.segment_workers) if use_vad else (1, None)
+                
+                # Load ASR model (reuse the current one if unchanged)
+                if (model_name == self.model_name and self.model is not None
+                        and partition == self._partition):
+                    scheduler = self.scheduler
+                    warmup_stats = self.warmup_stats
+                else:
+                    scheduler = SegmentScheduler(self._load_replicas(model_name, *partition))
+                    warmup_stats = None
+                
+                if self.warmup and warmup_stats is None:
+                    if on_progress:
+                        on_progress("warming_up")
+                    # One at a time: concurrent warm-ups would contend for the
+                    # cores and report skewed timings
+                    warmup_stats = warm_up(scheduler.models[0])
+                    for replica in scheduler.models[1:]:
+                        warm_up(replica)
+                
+                with self._state:
+                    self.model_name = model_name
+                    self.use_vad = use_vad
+                    self.model = scheduler.models[0]
+                    self.scheduler = scheduler
+                    self._partition = partition
+                    self.vad_model = vad_model
+                    self.warmup_stats = warmup_stats
+                    self._loaded = True
+                
+                if on_progress:
+                    on_progress("ready")
+                
+                return True
         except Exception as e:
             if on_progress:
                 on_progress(f"error: {str(e)}")
             raise e
+        finally:
+            with self._state:
+                self._pending_loads -= 1
+                self._state.notify_all()
+    
+    def _load_replicas(self, model_name: str, runs: int, threads: Optional[int]) -> list:
+        """Load one ASR session per concurrent segment run (each a full copy of the model).
+        
+        Replicas load one after another, so memory grows a model at a time;
+        the first load builds the optimized-graph cache the others reuse.
+        """
+        from ort_session import load_asr_model
+        
+        return [
+            load_asr_model(model_name, providers=self.providers, intra_op_threads=threads)
+            for _ in range(runs)
+        ]
     
-    def transcribe(self, audio_int16: np.ndarray) -> Optional[str]:
-        """Transcribe audio data to text."""
+    def wait_until_loaded(self, timeout: Optional[float] = None) -> bool:
+        """Wait for loads in progress to finish; return whether a model is available."""
+        with self._state:
+            self._state.wait_for(lambda: self._pending_loads == 0, timeout)
+            return self._loaded
+    
+    def transcribe(self, audio_int16: np.ndarray, device=None) -> Optional[str]:
+        """Transcribe audio data to text (None when the gate finds no speech)."""
         if not self._loaded:
             raise RuntimeError("Model not loaded. Call load() first.")
         
-        # Check audio level
-        audio_level = np.abs(audio_int16).mean()
-        if audio_level < 100:
+        # Skip silence entirely; otherwise only the speech span reaches the model
+        bounds = self.gate.detect(audio_int16, device)
+        if bounds is None:
             return None
+        audio_int16 = audio_int16[bounds[0]:bounds[1]]
         
-        # Save to temp file
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as f:
-            wav.write(f.name, SAMPLE_RATE, audio_int16)
-            
-            if self.use_vad and self.vad_model is not None:
-                result = self._transcribe_with_vad(f.name, audio_int16)
-            else:
-                result = self.model.recognize(f.name)
-            
-            if result and result.strip():
-                return result.strip()
-            return None
+        # One consistent snapshot, even if a model swap happens meanwhile
+        with self._state:
+            model, scheduler, vad_model = self.model, self.scheduler, self.vad_model
+        
+        if vad_model is not None:
+            result = self._transcribe_with_vad(audio_int16, scheduler, vad_model)
+        else:
+            result = recognize_audio(model, audio_int16)
+        
+        if result and result.strip():
+            return result.strip()
+        return None
     
-    def _transcribe_with_vad(self, filepath: str, audio_int16: np.ndarray) -> str:
+    def transcribe_many(self, clips: List[np.ndarray]) -> List[Optional[str]]:
+        """Transcribe several clips, one model call per length bucket.
+        
+        Returns one entry per clip, in input order (None when a clip is
+        empty or produced no text).
+        """
+        if not self._loaded:
+            raise RuntimeError("Model not loaded. Call load() first.")
+        return self.scheduler.recognize(clips)
+    
+    def _transcribe_with_vad(self, audio_int16: np.ndarray, scheduler: SegmentScheduler, vad_model) -> str:
         """Transcribe using VAD segmentation for better accuracy on long audio."""
-        # Convert to float32 for VAD (normalized -1 to 1)
-        audio_float = audio_int16.astype(np.float32) / 32767.0
-        
-        # Prepare batch format for VAD
-        waveforms = audio_float.reshape(1, -1)
-        waveforms_len = np.array([len(audio_float)], dtype=np.int64)
-        
-        # Get speech segments with VAD
-        segments_iter = self.vad_model.segment_batch(
-            waveforms,
-            waveforms_len,
-            sample_rate=SAMPLE_RATE
-        )
+        # Single float32 conversion shared by VAD and every segment
+        audio_float = to_waveform(audio_int16)
         
-        # Collect all speech segments
-        all_texts = []
-        for segment_list in segments_iter:
-            segments = list(segment_list)
-            if not segments:
-                continue
-            
-            for start, end in segments:
-                # Extract segment audio
-                segment_audio = audio_int16[start:end]
-                if len(segment_audio) < SAMPLE_RATE * 0.1:  # Skip very short segments
-                    continue
-                
-                # Save segment to temp file and transcribe
-                with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as seg_f:
-                    wav.write(seg_f.name, SAMPLE_RATE, segment_audio)
-                    result = self.model.recognize(seg_f.name)
-                    if result and result.strip():
-                        all_texts.append(result.strip())
+        # Collect all speech segments as views into the waveform
+        clips = [
+            audio_float[start:end]
+            for start, end in speech_segments(vad_model, audio_float)
+            if end - start >= MIN_SEGMENT_SAMPLES  # Skip very short segments
+        ]
         
-        return " ".join(all_texts)
+        # Batched recognition, concurrent across replicas, reassembled in segment order
+        return " ".join(text for text in scheduler.recognize(clips) if text)
     
-    def change_model(self, model_name: str) -> bool:
-        """Change the ASR model."""
-        self.model_name = model_name
-        self._loaded = False
-        return self.load()
+    def change_model(self, model_name: str, on_progress: Optional[callable] = None) -> bool:
+        """Change the ASR model (hot-swapped once the new model is loaded)."""
+        return self._load(model_name, self.use_vad, on_progress)
     
-    def set_vad(self, enabled: bool) -> bool:
+    def set_vad(self, enabled: bool, on_progress: Optional[callable] = None) -> bool:
         """Enable or disable VAD."""
         if enabled != self.use_vad:
-            self.use_vad = enabled
-            self._loaded = False
-            return self.load()
+            return self._load(self.model_name, enabled, on_progress)
         return True
     
+    def set_segment_workers(self, workers: int, on_progress: Optional[callable] = None) -> bool:
+        """Change how many VAD segments run at once (replicas reload if needed)."""
+        self.segment_workers = workers
+        return self._load(self.model_name, self.use_vad, on_progress)
+    
     @property
     def is_loaded(self) -> bool:
         return self._loaded
+    
+    @property
+    def is_loading(self) -> bool:
+        return self._pending_loads > 0
 
 
 class TranscriptionResult:
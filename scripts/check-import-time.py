@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Start-up budget check for the Python backend's one-shot and query paths.
+
+Imports each entry module under `python -X importtime` and fails when the
+total import time exceeds the budget, or when a heavy dependency (NumPy,
+PortAudio, ONNX Runtime, ...) is imported where it should be deferred.
+
+Usage:
+    python scripts/check-import-time.py
+    python scripts/check-import-time.py --budget-ms 80 --runs 5
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+PYTHON_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "python")
+
+# Entry modules whose start-up sits on the settings window's critical path
+ENTRY_MODULES = [
+    "backend_daemon",  # --check-model / --list-devices / --download-model
+    "model_manager",   # --list / --check
+    "main",            # get_config / get_models
+    "daemon_client",   # one-shot tools talking to a running daemon
+]
+
+# Must not be imported just to answer a query
+HEAVY_MODULES = [
+    "numpy",
+    "scipy",
+    "sounddevice",
+    "onnxruntime",
+    "onnx_asr",
+    "huggingface_hub",
+    "pyautogui",
+    "pynput",
+]
+
+
+def measure(module):
+    """Import a module in a fresh interpreter; return (total µs, {package: cumulative µs})."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PYTHON_DIR,
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr.strip().splitlines()[-1]}")
+    
+    total = 0
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        total += int(self_us)
+        cumulative[name.strip()] = int(cumulative_us)
+    return total, cumulative
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check backend start-up import time')
+    parser.add_argument('--budget-ms', type=float, default=60.0, help='Import-time budget per entry module')
+    parser.add_argument('--runs', type=int, default=3, help='Runs per module (the fastest one counts)')
+    parser.add_argument('--top', type=int, default=5, help='Slowest top-level imports to show on failure')
+    
+    args = parser.parse_args()
+    
+    failed = False
+    for module in ENTRY_MODULES:
+        try:
+            total, cumulative = min(
+                (measure(module) for _ in range(max(1, args.runs))),
+                key=lambda m: m[0]
+            )
+        except RuntimeError as e:
+            print(f"✗ {module}: {e}")
+            failed = True
+            continue
+        
+        heavy = [name for name in HEAVY_MODULES if name in cumulative]
+        over = total / 1000 > args.budget_ms
+        status = "✗" if over or heavy else "✓"
+        print(f"{status} {module}: {total / 1000:.1f} ms (budget {args.budget_ms:.0f} ms)")
+        
+        if heavy:
+            print(f"    imports heavy modules: {', '.join(heavy)}")
+        if over:
+            top_level = sorted(
+                ((us, name) for name, us in cumulative.items() if "." not in name),
+                reverse=True
+            )
+            for us, name in top_level[:args.top]:
+                print(f"    {us / 1000:7.1f} ms  {name}")
+        failed = failed or over or bool(heavy)
+    
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
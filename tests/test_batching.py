@@ -0,0 +1,51 @@
+"""Length bucketing of clips for batched recognition."""
+
+import numpy as np
+
+from transcriber import MAX_BATCH_SIZE, SAMPLE_RATE, clip_batches, length_buckets
+
+
+def test_every_clip_lands_in_exactly_one_batch():
+    lengths = [int(SAMPLE_RATE * s) for s in (3.0, 0.5, 12.0, 3.1, 0.6, 2.9, 11.5, 30.0)]
+    
+    batches = length_buckets(lengths)
+    
+    assert sorted(i for batch in batches for i in batch) == list(range(len(lengths)))
+
+
+def test_batches_group_similar_lengths():
+    lengths = [100, 1000, 110, 1050, 120, 990]
+    
+    batches = length_buckets(lengths, max_padding_ratio=1.3)
+    
+    assert batches == [[0, 2, 4], [5, 1, 3]]
+
+
+def test_padding_ratio_splits_a_batch():
+    lengths = [100, 129, 131]
+    
+    assert length_buckets(lengths, max_padding_ratio=1.3) == [[0, 1], [2]]
+
+
+def test_batch_size_is_capped():
+    batches = length_buckets([100] * (2 * MAX_BATCH_SIZE + 1))
+    
+    assert [len(batch) for batch in batches] == [MAX_BATCH_SIZE, MAX_BATCH_SIZE, 1]
+
+
+def test_padded_samples_are_capped():
+    # Three clips of 100 samples pad to 300: over a 250-sample budget
+    batches = length_buckets([100, 100, 100], max_batch_samples=250)
+    
+    assert batches == [[0, 1], [2]]
+
+
+def test_empty_input_has_no_batches():
+    assert length_buckets([]) == []
+    assert clip_batches([]) == []
+
+
+def test_clip_batches_leave_out_empty_clips():
+    clips = [np.zeros(100), np.zeros(0), np.zeros(105), np.zeros(0), np.zeros(5000)]
+    
+    assert clip_batches(clips) == [[0, 2], [4]]
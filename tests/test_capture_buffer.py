@@ -0,0 +1,86 @@
+"""Capture buffer: growth ahead of the writer, dropped frames and spilling to disk."""
+
+import numpy as np
+import pytest
+
+pytest.importorskip("sounddevice")
+
+from audio import CaptureBuffer
+
+
+def frames(start, count):
+    """`count` mono frames numbered from `start`, so copies can be checked exactly."""
+    return np.arange(start, start + count, dtype=np.int16).reshape(-1, 1)
+
+
+def test_writes_past_capacity_are_dropped_and_counted():
+    buffer = CaptureBuffer(100)
+    
+    buffer.write(frames(0, 60))
+    buffer.write(frames(60, 60))
+    buffer.write(frames(120, 10))
+    
+    assert len(buffer) == 100
+    assert buffer.dropped == 30
+    np.testing.assert_array_equal(buffer.view(), frames(0, 100)[:, 0])
+
+
+def test_reserve_grows_ahead_of_the_writer():
+    buffer = CaptureBuffer(100)
+    buffer.write(frames(0, 80))
+    
+    buffer.reserve(500)
+    for start in range(80, 580, 100):
+        buffer.write(frames(start, 100))
+    
+    assert buffer.dropped == 0
+    assert len(buffer) == 580
+    assert not buffer.spilled
+    np.testing.assert_array_equal(buffer.view(), frames(0, 580)[:, 0])
+
+
+def test_views_cover_only_written_frames():
+    buffer = CaptureBuffer(100)
+    buffer.write(frames(0, 30))
+    
+    assert len(buffer.view(10)) == 20
+    assert len(buffer.view(10, 1000)) == 20
+    np.testing.assert_array_equal(buffer.view(5, 15), frames(5, 10)[:, 0])
+
+
+def test_growth_within_the_ram_limit_stays_in_memory(tmp_path):
+    buffer = CaptureBuffer(100, ram_limit=1000, spill_dir=str(tmp_path / "spill"))
+    buffer.write(frames(0, 100))
+    
+    buffer.reserve(100)
+    
+    assert not buffer.spilled
+    assert not (tmp_path / "spill").exists()
+
+
+def test_growth_past_the_ram_limit_spills_to_disk(tmp_path):
+    spill_dir = tmp_path / "spill"
+    buffer = CaptureBuffer(1000, ram_limit=200, spill_dir=str(spill_dir))
+    buffer.write(frames(0, 150))
+    
+    buffer.reserve(100)
+    assert buffer.spilled
+    buffer.write(frames(150, 100))
+    
+    # Growing a spilled buffer extends the file and keeps what was written
+    buffer.reserve(1000)
+    buffer.write(frames(250, 1000))
+    
+    assert buffer.dropped == 0
+    np.testing.assert_array_equal(buffer.view(), frames(0, 1250)[:, 0])
+    # The spill file is anonymous: nothing is left behind in the directory
+    assert list(spill_dir.iterdir()) == []
+
+
+def test_stereo_views_keep_their_channels():
+    buffer = CaptureBuffer(10, channels=2)
+    block = np.arange(8, dtype=np.int16).reshape(4, 2)
+    
+    buffer.write(block)
+    
+    np.testing.assert_array_equal(buffer.view(), block)
@@ -0,0 +1,183 @@
+"""Download engine against a local stand-in for the Hugging Face Hub."""
+
+import hashlib
+import http.server
+import json
+import os
+import threading
+
+import pytest
+
+import model_manager
+
+REPO = "test-org/test-model"
+COMMIT = "0123abcd"
+
+
+class HubHandler(http.server.SimpleHTTPRequestHandler):
+    """Serves the temp dir with Range support; can corrupt a file's first response."""
+    
+    corrupt_once = set()
+    requests = []
+    
+    def log_message(self, *args):
+        pass
+    
+    def do_GET(self):
+        path = self.translate_path(self.path)
+        if not os.path.isfile(path):
+            self.send_error(404)
+            return
+        with open(path, "rb") as f:
+            data = f.read()
+        name = os.path.basename(path)
+        if name in self.corrupt_once:
+            self.corrupt_once.discard(name)
+            data = bytes([data[0] ^ 0xFF]) + data[1:]
+        
+        range_header = self.headers.get("Range")
+        self.requests.append((name, range_header))
+        if range_header:
+            start, end = range_header.split("=")[1].split("-")
+            start, end = int(start), int(end) if end else len(data) - 1
+            body = data[start:end + 1]
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(data)}")
+        else:
+            body = data
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def _sibling(name, data):
+    if name.endswith(".onnx"):
+        return {"rfilename": name, "size": len(data),
+                "lfs": {"sha256": hashlib.sha256(data).hexdigest(), "size": len(data)}}
+    blob_id = hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+    return {"rfilename": name, "size": len(data), "blobId": blob_id}
+
+
+@pytest.fixture
+def hub(tmp_path, monkeypatch):
+    """A hub serving REPO from a temp dir; HOME (and so the HF cache) is another temp dir."""
+    files = {
+        "encoder.onnx": os.urandom(300_000),
+        "encoder.int8.onnx": os.urandom(1000),
+        "config.json": b'{"model": "test"}',
+        "vocab.txt": b"a\nb\nc\n" * 100,
+        "README.md": b"# test",
+    }
+    root = tmp_path / "hub"
+    manifest = root / "api" / "models" / REPO / "revision" / "main"
+    manifest.parent.mkdir(parents=True)
+    manifest.write_text(json.dumps({
+        "sha": COMMIT,
+        "siblings": [_sibling(name, data) for name, data in files.items()],
+    }))
+    resolve = root / REPO / "resolve" / COMMIT
+    resolve.mkdir(parents=True)
+    for name, data in files.items():
+        (resolve / name).write_bytes(data)
+    
+    home = tmp_path / "home"
+    home.mkdir()
+    monkeypatch.setenv("HOME", str(home))
+    monkeypatch.setattr(model_manager.time, "sleep", lambda seconds: None)
+    HubHandler.corrupt_once = set()
+    HubHandler.requests = []
+    
+    handler = lambda *args, **kwargs: HubHandler(*args, directory=str(root), **kwargs)
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setenv("HF_ENDPOINT", f"http://127.0.0.1:{server.server_address[1]}")
+    yield files
+    server.shutdown()
+    server.server_close()
+
+
+def _blob_path(files, name):
+    sibling = _sibling(name, files[name])
+    blob = sibling["lfs"]["sha256"] if "lfs" in sibling else sibling["blobId"]
+    return os.path.join(model_manager.get_hf_cache_path(REPO), "blobs", blob)
+
+
+def test_manifest_file_selection(hub):
+    snapshot = model_manager.fetch_model_files(REPO)
+    
+    assert os.path.basename(snapshot) == COMMIT
+    assert sorted(os.listdir(snapshot)) == ["config.json", "encoder.onnx", "vocab.txt"]
+    for name in os.listdir(snapshot):
+        with open(os.path.join(snapshot, name), "rb") as f:
+            assert f.read() == hub[name]
+    with open(os.path.join(model_manager.get_hf_cache_path(REPO), "refs", "main")) as f:
+        assert f.read() == COMMIT
+
+
+def test_select_files_uses_repo_patterns():
+    files = [{"name": n} for n in (
+        "onnx/encoder_model.onnx", "onnx/encoder_model_fp16.onnx", "onnx/decoder_model.onnx",
+        "onnx/decoder_model_merged.onnx", "onnx/decoder_model_merged_q4.onnx", "config.json",
+    )]
+    selected = model_manager.select_files("onnx-community/whisper-large-v3-turbo", files)
+    assert [f["name"] for f in selected] == [
+        "onnx/encoder_model.onnx", "onnx/decoder_model_merged.onnx", "config.json",
+    ]
+
+
+def test_resume_sequential_partial(hub):
+    data = hub["encoder.onnx"]
+    partial = _blob_path(hub, "encoder.onnx") + ".incomplete"
+    os.makedirs(os.path.dirname(partial))
+    with open(partial, "wb") as f:
+        f.write(data[:100_000])
+    
+    events = []
+    snapshot = model_manager.fetch_model_files(REPO, on_progress=events.append)
+    
+    assert ("encoder.onnx", "bytes=100000-") in HubHandler.requests
+    with open(os.path.join(snapshot, "encoder.onnx"), "rb") as f:
+        assert f.read() == data
+    assert events[-1]["downloaded"] == events[-1]["total"]
+
+
+def test_resume_parts_from_truncated_partial(hub, monkeypatch):
+    monkeypatch.setattr(model_manager, "PARALLEL_MIN_BYTES", 1024)
+    monkeypatch.setattr(model_manager, "PART_BYTES", 64 * 1024)
+    data = hub["encoder.onnx"]
+    partial = _blob_path(hub, "encoder.onnx") + ".incomplete"
+    os.makedirs(os.path.dirname(partial))
+    with open(partial, "wb") as f:
+        f.write(data[:150_000])  # two whole parts and a bit, no .parts record
+    
+    snapshot = model_manager.fetch_model_files(REPO)
+    
+    ranges = [r for name, r in HubHandler.requests if name == "encoder.onnx"]
+    assert sorted(ranges) == ["bytes=131072-196607", "bytes=196608-262143", "bytes=262144-299999"]
+    with open(os.path.join(snapshot, "encoder.onnx"), "rb") as f:
+        assert f.read() == data
+    assert not os.path.exists(partial + ".parts")
+
+
+def test_digest_mismatch_is_downloaded_again(hub):
+    HubHandler.corrupt_once = {"vocab.txt"}
+    
+    snapshot = model_manager.fetch_model_files(REPO)
+    
+    assert [name for name, _ in HubHandler.requests].count("vocab.txt") == 2
+    with open(os.path.join(snapshot, "vocab.txt"), "rb") as f:
+        assert f.read() == hub["vocab.txt"]
+
+
+def test_persistent_digest_mismatch_fails(hub, monkeypatch):
+    original = HubHandler.do_GET
+    
+    def always_corrupt(self):
+        HubHandler.corrupt_once.add("vocab.txt")
+        original(self)
+    
+    monkeypatch.setattr(HubHandler, "do_GET", always_corrupt)
+    with pytest.raises(ValueError, match="Checksum mismatch for vocab.txt"):
+        model_manager.fetch_model_files(REPO)
+    assert not os.path.exists(_blob_path(hub, "vocab.txt"))
@@ -0,0 +1,48 @@
+"""Start-up budget of the backend entry modules (see scripts/check-import-time.py)."""
+
+import asyncio
+import importlib.util
+import os
+import time
+
+import pytest
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts", "check-import-time.py")
+spec = importlib.util.spec_from_file_location("check_import_time", SCRIPT)
+check_import_time = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(check_import_time)
+
+BUDGET_MS = 60.0
+MAX_RUNS = 10  # the fastest run counts
+RETRY_DELAY_S = 0.3  # a busy host slows imports for seconds at a time, so spread the retries
+
+
+@pytest.mark.parametrize("module", check_import_time.ENTRY_MODULES)
+def test_entry_module_start_up(module):
+    total, cumulative = check_import_time.measure(module)
+    for _ in range(MAX_RUNS - 1):
+        if total / 1000 <= BUDGET_MS:
+            break
+        time.sleep(RETRY_DELAY_S)
+        total, cumulative = min((total, cumulative), check_import_time.measure(module), key=lambda m: m[0])
+    
+    heavy = [name for name in check_import_time.HEAVY_MODULES if name in cumulative]
+    assert not heavy, f"{module} imports {', '.join(heavy)} at start-up"
+    assert total / 1000 <= BUDGET_MS, f"{module} takes {total / 1000:.1f} ms to import"
+
+
+def test_daemon_tasks_run_without_main():
+    """Deferring asyncio must not leave the daemon's task helpers depending on main()."""
+    import backend_daemon
+    
+    ran = []
+    
+    async def work(op):
+        ran.append(op.kind)
+    
+    async def run():
+        op = backend_daemon.spawn("test", work)
+        await op.task
+    
+    asyncio.run(run())
+    assert ran == ["test"]
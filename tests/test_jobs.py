@@ -0,0 +1,135 @@
+"""Transcription queue: delivery in submission order and cancellation."""
+
+import threading
+import time
+
+import pytest
+
+from jobs import TranscriptionQueue
+
+
+class Recorder:
+    """Collects delivered jobs; `wait` blocks until `count` have arrived."""
+    
+    def __init__(self):
+        self.jobs = []
+        self._done = threading.Condition()
+    
+    def __call__(self, job):
+        with self._done:
+            self.jobs.append(job)
+            self._done.notify_all()
+    
+    def wait(self, count, timeout=5.0):
+        with self._done:
+            assert self._done.wait_for(lambda: len(self.jobs) >= count, timeout)
+        return self.jobs
+
+
+@pytest.fixture
+def delivered():
+    return Recorder()
+
+
+def test_results_are_delivered_in_submission_order(delivered):
+    # Later recordings finish first: each clip sleeps for its own length
+    queue = TranscriptionQueue(lambda delay: time.sleep(delay) or delay, delivered, workers=4)
+    delays = [0.2, 0.15, 0.1, 0.05, 0.0]
+    
+    ids = [queue.submit(delay) for delay in delays]
+    jobs = delivered.wait(len(delays))
+    queue.shutdown()
+    
+    assert ids == [1, 2, 3, 4, 5]
+    assert [job.id for job in jobs] == ids
+    assert [job.result for job in jobs] == delays
+    assert queue.pending == 0
+
+
+def test_errors_are_delivered_in_place(delivered):
+    def transcribe(audio):
+        if audio == "bad":
+            raise ValueError("decoder failed")
+        return audio.upper()
+    
+    queue = TranscriptionQueue(transcribe, delivered)
+    
+    for audio in ("one", "bad", "three"):
+        queue.submit(audio)
+    jobs = delivered.wait(3)
+    queue.shutdown()
+    
+    assert [job.result for job in jobs] == ["ONE", None, "THREE"]
+    assert isinstance(jobs[1].error, ValueError)
+
+
+def test_cancelled_queued_job_is_skipped_but_delivered(delivered):
+    release = threading.Event()
+    transcribed = []
+    
+    def transcribe(audio):
+        release.wait()
+        transcribed.append(audio)
+        return audio
+    
+    queue = TranscriptionQueue(transcribe, delivered)
+    first = queue.submit("first")
+    second = queue.submit("second")
+    queue.submit("third")
+    
+    assert queue.cancel(second)
+    release.set()
+    jobs = delivered.wait(3)
+    queue.shutdown()
+    
+    assert transcribed == ["first", "third"]
+    assert [job.id for job in jobs] == [first, second, 3]
+    assert jobs[1].cancelled and jobs[1].result is None
+    assert jobs[1].started_at is None
+
+
+def test_cancelled_running_job_drops_its_result(delivered):
+    started = threading.Event()
+    release = threading.Event()
+    
+    def transcribe(audio):
+        started.set()
+        release.wait()
+        return audio
+    
+    queue = TranscriptionQueue(transcribe, delivered)
+    job_id = queue.submit("running")
+    assert started.wait(5.0)
+    
+    assert queue.cancel(job_id)
+    release.set()
+    job, = delivered.wait(1)
+    queue.shutdown()
+    
+    assert job.cancelled
+    assert job.result is None and job.error is None
+    assert job.transcription_time is not None
+
+
+def test_delivered_jobs_cannot_be_cancelled(delivered):
+    queue = TranscriptionQueue(lambda audio: audio, delivered)
+    job_id = queue.submit("done")
+    delivered.wait(1)
+    queue.shutdown()
+    
+    assert not queue.cancel(job_id)
+    assert not queue.cancel(job_id + 1)
+
+
+def test_pending_counts_undelivered_jobs(delivered):
+    release = threading.Event()
+    queue = TranscriptionQueue(lambda audio: release.wait(), delivered)
+    
+    for _ in range(3):
+        queue.submit(None)
+    assert queue.pending == 3
+    
+    release.set()
+    delivered.wait(3)
+    queue.shutdown()
+    assert queue.pending == 0
@@ -0,0 +1,110 @@
+"""Speech gate: per-device noise floors and the decision to run inference at all."""
+
+import json
+
+import numpy as np
+import pytest
+
+from transcriber import GATE_MAX_FLOOR_DB, SAMPLE_RATE, SpeechGate
+
+rng = np.random.default_rng(0)
+
+
+def noise(seconds, dbfs):
+    """White noise with an RMS level of `dbfs`, as int16."""
+    rms = 32768 * 10 ** (dbfs / 20)
+    return np.clip(rng.normal(0, rms, int(seconds * SAMPLE_RATE)), -32768, 32767).astype(np.int16)
+
+
+def with_speech(background, start_s, end_s, dbfs=-15.0):
+    """`background` with a tone at `dbfs` (RMS) mixed in from start_s to end_s."""
+    audio = background.astype(np.float64)
+    start, end = int(start_s * SAMPLE_RATE), int(end_s * SAMPLE_RATE)
+    t = np.arange(end - start) / SAMPLE_RATE
+    audio[start:end] += np.sqrt(2) * 32768 * 10 ** (dbfs / 20) * np.sin(2 * np.pi * 220 * t)
+    return np.clip(audio, -32768, 32767).astype(np.int16)
+
+
+@pytest.fixture
+def gate():
+    return SpeechGate(margin_db=10.0, padding_s=0.25)
+
+
+def test_silence_is_skipped(gate):
+    assert gate.detect(noise(3, -70), device=1) is None
+
+
+def test_noise_only_on_noisy_device_is_skipped(gate):
+    # A fan at -40 dBFS: the first recording calibrates the floor to it
+    assert gate.detect(noise(3, -40), device="fan") is None
+    assert gate.noise_floor("fan") == pytest.approx(-40, abs=1.5)
+    for _ in range(5):
+        assert gate.detect(noise(3, -40), device="fan") is None
+
+
+def test_speech_on_noisy_device_is_trimmed(gate):
+    gate.detect(noise(3, -40), device="fan")
+    audio = with_speech(noise(3, -40), 1.0, 2.0)
+    
+    start, end = gate.detect(audio, device="fan")
+    
+    assert start == pytest.approx(0.75 * SAMPLE_RATE, abs=0.03 * SAMPLE_RATE)
+    assert end == pytest.approx(2.25 * SAMPLE_RATE, abs=0.03 * SAMPLE_RATE)
+
+
+def test_quiet_speech_on_quiet_device_passes(gate):
+    for _ in range(3):
+        gate.detect(noise(2, -75), device="quiet")
+    audio = with_speech(noise(3, -75), 1.0, 2.0, dbfs=-48.0)
+    
+    assert gate.detect(audio, device="quiet") is not None
+
+
+def test_floor_follows_the_device_up_and_down(gate):
+    gate.detect(noise(3, -70), device=1)
+    quiet_floor = gate.noise_floor(1)
+    
+    for _ in range(20):
+        gate.detect(noise(3, -45), device=1)
+    assert gate.noise_floor(1) == pytest.approx(-45, abs=1.5)
+    
+    for _ in range(20):
+        gate.detect(noise(3, -70), device=1)
+    assert gate.noise_floor(1) == pytest.approx(quiet_floor, abs=1.5)
+
+
+def test_floors_are_per_device(gate):
+    gate.detect(noise(3, -40), device="fan")
+    gate.detect(noise(3, -70), device="quiet")
+    audio = with_speech(noise(3, -70), 1.0, 2.0, dbfs=-45.0)
+    
+    assert gate.detect(audio, device="quiet") is not None
+    assert gate.noise_floor("fan") > gate.noise_floor("quiet") + 20
+
+
+def test_wall_to_wall_speech_keeps_the_floor_below_speech(gate):
+    gate.detect(with_speech(noise(3, -70), 0.0, 3.0), device=1)
+    
+    assert gate.noise_floor(1) <= GATE_MAX_FLOOR_DB
+    assert gate.detect(with_speech(noise(3, -70), 1.0, 2.0), device=1) is not None
+
+
+def test_floors_persist_only_when_they_move(tmp_path):
+    path = tmp_path / "noise-floors.json"
+    gate = SpeechGate(path=path)
+    
+    gate.detect(noise(3, -60), device=1)
+    saved = path.stat().st_mtime_ns
+    assert json.loads(path.read_text()) == {"1": gate.noise_floor(1)}
+    
+    path.write_text(json.dumps({"1": -999}))  # would be overwritten by any save
+    for _ in range(5):
+        gate.detect(noise(3, -60), device=1)
+    assert json.loads(path.read_text()) == {"1": -999}
+    
+    gate.detect(noise(3, -40), device=1)
+    assert json.loads(path.read_text()) == {"1": gate.noise_floor(1)}
+    assert path.stat().st_mtime_ns != saved
+    assert [p.name for p in tmp_path.iterdir()] == ["noise-floors.json"]
+    
+    assert SpeechGate(path=path).noise_floor(1) == gate.noise_floor(1)